@@ -0,0 +1,173 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from employee_management.routers import set_routing_user
+from utils.metrics import record_cache_lookup
+from utils.request_timing import timed
+
+
+def user_cache_key(user_id):
+    return f"auth-user-fields:{user_id}"
+
+
+def user_version_key(user_id):
+    return f"auth-user-version:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    # A new version also retires an entry stored after this by a request that
+    # read the user before the write
+    cache.set(user_version_key(user_id), uuid.uuid4().hex, None)
+    cache.delete(user_cache_key(user_id))
+
+
+def current_entry(values, key, version):
+    """The cached entry in `values` if it was stored under `version`, else None."""
+    entry = values.get(key)
+    if entry is not None and entry["version"] == version:
+        return entry
+    return None
+
+
+def cached_user_lookup(user_id):
+    """(entry or None, version) for a user; a fill must store the returned version."""
+    key,version_key = user_cache_key(user_id),user_version_key(user_id)
+    values = cache.get_many([key, version_key])
+    version = values.get(version_key)
+    if version is None:
+        # A lost version key gets a fresh one, so no entry stored before it matches
+        version = uuid.uuid4().hex
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key)
+    return current_entry(values, key, version),version
+
+
+async def acached_user_lookup(user_id):
+    key,version_key = user_cache_key(user_id),user_version_key(user_id)
+    values = await cache.aget_many([key, version_key])
+    version = values.get(version_key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(version_key, version, None):
+            version = await cache.aget(version_key)
+    return current_entry(values, key, version),version
+
+
+def cached_user_entry(user, version):
+    """
+    What the cache keeps of a user: every column except the password hash,
+    plus the md5 digest that the password-change claim is compared with.
+    """
+    fields = {field.attname:getattr(user,field.attname) for field in user._meta.concrete_fields if field.attname != "password"}
+    return {
+        "db":user._state.db,
+        "fields":fields,
+        "password_digest":get_md5_hash_password(user.password),
+        "version":version,
+    }
+
+
+def cached_user(user_model, entry):
+    # The password stays deferred, so code that needs it loads it from the database
+    fields = entry["fields"]
+    return user_model.from_db(entry["db"], list(fields), list(fields.values()))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the authenticated user in the cache for
+    AUTH_USER_CACHE_TIMEOUT seconds, so most requests authenticate without a
+    user query. The cached entry leaves out the password hash (see
+    cached_user_entry). Only active users are cached, and saving or deleting a user
+    (password change, deactivation) evicts the entry by moving the user's
+    version, which also retires a fill that raced the write. A timeout of 0
+    restores the per-request lookup; it is the default without a shared cache,
+    where an eviction would only reach one worker.
+
+    aauthenticate() is the same check for async views, loading users with the
+    async ORM and cache API.
+    """
+
+    def authenticate(self, request):
+        with timed("auth"):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            # Before the lookup, so a user who just wrote is loaded from the primary
+            set_routing_user(user_id)
+        if not timeout or user_id is None:
+            return super().get_user(validated_token)
+
+        entry,version = cached_user_lookup(user_id)
+        record_cache_lookup("auth_user", entry is not None)
+        if entry is None:
+            user = super().get_user(validated_token)
+            cache.set(user_cache_key(user_id), cached_user_entry(user, version), timeout)
+            return user
+
+        self.check_password_changed(entry["password_digest"], validated_token)
+        return cached_user(self.user_model, entry)
+
+    def check_password_changed(self, password_digest, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    async def aauthenticate(self, request):
+        with timed("auth"):
+            header = self.get_header(request)
+            if header is None:
+                return None
+
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+
+            validated_token = self.get_validated_token(raw_token)
+            return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            set_routing_user(user_id)
+        if not timeout or user_id is None:
+            return await self.aload_user(validated_token)
+
+        entry,version = await acached_user_lookup(user_id)
+        record_cache_lookup("auth_user", entry is not None)
+        if entry is None:
+            user = await self.aload_user(validated_token)
+            await cache.aset(user_cache_key(user_id), cached_user_entry(user, version), timeout)
+            return user
+
+        self.check_password_changed(entry["password_digest"], validated_token)
+        return cached_user(self.user_model, entry)
+
+    async def aload_user(self, validated_token):
+        # JWTAuthentication.get_user on the async ORM
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        self.check_password_changed(get_md5_hash_password(user.password), validated_token)
+        return user
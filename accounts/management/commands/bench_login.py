@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Measure /accounts/login/ requests per second for each password hasher profile, with and without sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20)
+        parser.add_argument('--profile', action='append', choices=sorted(settings.PASSWORD_HASHER_PROFILES),
+                            help='Profiles to measure (default: all installed)')
+
+    def handle(self, *args, **options):
+        profiles = options['profile'] or list(settings.PASSWORD_HASHER_PROFILES)
+        for profile in profiles:
+            preferred = settings.PASSWORD_HASHER_PROFILES[profile]
+            hashers = [preferred] + [hasher for hasher in settings.PASSWORD_HASHERS if hasher != preferred]
+            with override_settings(PASSWORD_HASHERS=hashers):
+                try:
+                    get_hasher().encode("probe", get_hasher().salt())
+                except ValueError as e:
+                    self.stdout.write(f"{profile:<8} skipped: {e}")
+                    continue
+                results = [self.measure(sessions, options['logins']) for sessions in (True, False)]
+            self.stdout.write(
+                f"{profile:<8} with session {results[0]:7.1f} logins/s   token-only {results[1]:7.1f} logins/s"
+            )
+
+    def measure(self, sessions, logins):
+        # Users, sessions and rehashes are rolled back after each run
+        with transaction.atomic(), override_settings(LOGIN_SESSIONS=sessions):
+            stamp = time.time_ns()
+            username = f"bench-login-{stamp}"
+            CustomUser.objects.create_user(username, f"{username}@example.com", None, "bench-password")
+            client = Client()
+            payload = {"username": username, "password": "bench-password"}
+            started = time.perf_counter()
+            for _ in range(logins):
+                response = client.post("/accounts/login/", payload, content_type="application/json")
+                if response.status_code != 200:
+                    raise RuntimeError(f"Login failed with {response.status_code}: {response.content!r}")
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return logins / elapsed
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employee_management.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema served at /openapi.json (plus a gzipped copy); run on every deploy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Where to write the schema (default: OPENAPI_SCHEMA_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.OPENAPI_SCHEMA_PATH
+        body = write_schema(path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(body)} bytes to {path} and {path}.gz"))
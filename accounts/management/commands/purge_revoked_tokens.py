@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import purge_expired_revocations
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have expired; with --interval keep running in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='Seconds between purges (0 runs once)')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                deleted = purge_expired_revocations()
+                self.stdout.write(f"Purged {deleted} expired revoked tokens")
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Stopped purging revoked tokens"))
@@ -1,23 +1,284 @@
+import itertools
+import json
+import random
+import threading
 import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
 import requests
-from django.core.management.base import BaseCommand
 from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+from requests.adapters import HTTPAdapter
+
+BACKEND_URL = config("BACKEND_URL",default="http://127.0.0.1:8000")
+PASSWORD = "load-test-password"
+
+# Steps a virtual user runs once, then in a loop until the run ends
+SCENARIOS = {
+    "auth":((),("register","login")),
+    "crud":(("register","login"),("create","list","detail","update","delete")),
+    "browse":(("register","login","seed"),("list","detail")),
+}
+
+# Keys EmployeeList filters on (utils.FILTRATION_KEYS); names are "load-<hex>"
+LIST_FILTERS = [
+    {},
+    {"name":"load-a"},
+    {"search":"load"},
+    {"custom_fields":{"level":{"gte":5}}},
+    {"custom_fields":{"team":"load"}},
+]
+
+
+def list_filters():
+    # created_at is a day in the server's time zone; the local date is close enough here
+    return [*LIST_FILTERS,{"created_at":date.today().isoformat()}]
+
+
+def percentile(ordered,fraction):
+    # Nearest rank on an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1,max(0,int(round(fraction * len(ordered))) - 1))]
+
+
+def employee_payload(name):
+    return {
+        "name":name,
+        "email":f"{name}@example.com",
+        "position":random.choice(["Engineer","Designer","Manager"]),
+        "custom_fields":{"level":random.randint(1,10),"team":"load"},
+    }
+
+
+class LoadTest:
+    """
+    Drives `concurrency` virtual users through a scenario over one pooled
+    session. With a target rate, requests are sent on a fixed schedule and
+    latency counts from the scheduled send time, so a slow server shows up as
+    latency instead of quietly lowering the offered load.
+    """
+
+    def __init__(self,base_url,concurrency,rate=0):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1,pool_maxsize=concurrency,pool_block=True)
+        self.session.mount("http://",adapter)
+        self.session.mount("https://",adapter)
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = None
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def scheduled_start(self):
+        now = time.perf_counter()
+        if not self.interval:
+            return now
+        with self.lock:
+            slot = now if self.next_slot is None else max(now,self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return slot
+
+    def request(self,endpoint,method,path,token=None,**kwargs):
+        headers = {"Authorization":f"Bearer {token}"} if token else {}
+        started = self.scheduled_start()
+        try:
+            response = self.session.request(method,f"{self.base_url}{path}",headers=headers,timeout=30,**kwargs)
+            status = response.status_code
+        except requests.RequestException as e:
+            response,status = None,type(e).__name__
+        latency = time.perf_counter() - started
+        with self.lock:
+            self.latencies[endpoint].append(latency)
+            self.statuses[endpoint][status] += 1
+        return response if response is not None and response.ok else None
+
+    def run(self,scenario,duration):
+        setup,loop = SCENARIOS[scenario]
+        deadline = time.perf_counter() + duration
+        run_id = uuid.uuid4().hex[:8]
+
+        def virtual_user(index):
+            user = VirtualUser(self,f"load-{run_id}-{index}")
+            for step in setup:
+                getattr(user,step)()
+            while time.perf_counter() < deadline:
+                for step in loop:
+                    if time.perf_counter() >= deadline:
+                        break
+                    getattr(user,step)()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for future in [executor.submit(virtual_user,index) for index in range(self.concurrency)]:
+                future.result()
+        return time.perf_counter() - started
+
+    def summary(self,elapsed):
+        endpoints = {}
+        for endpoint,latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            statuses = self.statuses[endpoint]
+            endpoints[endpoint] = {
+                "requests":len(ordered),
+                "throughput":len(ordered) / elapsed,
+                "errors":sum(count for status,count in statuses.items() if not (isinstance(status,int) and status < 400)),
+                "p50_ms":percentile(ordered,0.50) * 1000,
+                "p95_ms":percentile(ordered,0.95) * 1000,
+                "p99_ms":percentile(ordered,0.99) * 1000,
+                "max_ms":ordered[-1] * 1000,
+                "statuses":{str(status):count for status,count in statuses.items()},
+            }
+        total = sorted(latency for latencies in self.latencies.values() for latency in latencies)
+        return {
+            "elapsed_s":elapsed,
+            "requests":len(total),
+            "errors":sum(stats["errors"] for stats in endpoints.values()),
+            "throughput":len(total) / elapsed if elapsed else 0.0,
+            "p50_ms":percentile(total,0.50) * 1000,
+            "p95_ms":percentile(total,0.95) * 1000,
+            "p99_ms":percentile(total,0.99) * 1000,
+            "endpoints":endpoints,
+        }
+
+
+class VirtualUser:
+    """One API user: its credentials and the employees it created."""
+
+    def __init__(self,load,prefix):
+        self.load = load
+        self.prefix = prefix
+        self.serial = itertools.count()
+        self.username = None
+        self.token = None
+        self.employees = []
+
+    def register(self):
+        # A fresh user each time, for scenarios that keep registering
+        self.username = f"{self.prefix}-{next(self.serial)}"
+        self.load.request("POST /accounts/create/","POST","/accounts/create/",json={
+            "username":self.username,"email":f"{self.username}@example.com","password":PASSWORD,
+        })
+
+    def login(self):
+        response = self.load.request("POST /accounts/login/","POST","/accounts/login/",json={
+            "username":self.username,"password":PASSWORD,
+        })
+        if response is not None:
+            self.token = response.json()["data"]["access_token"]
+
+    def create(self):
+        response = self.load.request(
+            "POST /employees/create/","POST","/employees/create/",self.token,
+            json=employee_payload(f"load-{uuid.uuid4().hex[:12]}")
+        )
+        if response is not None:
+            self.employees.append(response.json()["data"]["id"])
+
+    def seed(self):
+        for _ in range(20):
+            self.create()
+
+    def list(self):
+        self.load.request("POST /employees/list/","POST","/employees/list/",self.token,json={
+            "filtration_data":random.choice(list_filters()),
+            "pagination":{"page":1,"row_count":30},
+        })
+
+    def detail(self):
+        if self.employees:
+            self.load.request(
+                "GET /employees/single-employee/","GET",
+                f"/employees/single-employee/?id={random.choice(self.employees)}",self.token
+            )
+
+    def update(self):
+        if self.employees:
+            self.load.request(
+                "PATCH /employees/update/","PATCH",f"/employees/update/?id={self.employees[-1]}",self.token,
+                json=employee_payload(f"load-{uuid.uuid4().hex[:12]}")
+            )
+
+    def delete(self):
+        if self.employees:
+            self.load.request(
+                "DELETE /employees/delete/","DELETE",f"/employees/delete/?id={self.employees.pop()}",self.token
+            )
 
-BACKEND_URL = config("BACKEND_URL")
 
 class Command(BaseCommand):
-    help = 'Trigger an API call every 20 seconds'
+    help = (
+        'Without --scenario, call /accounts/check/ every --interval seconds (keep-alive heartbeat). '
+        'With --scenario, load test a running server with --concurrency virtual users and report '
+        'p50/p95/p99 latency and throughput per endpoint. Scenarios register their own users.'
+    )
 
-    def handle(self, *args, **kwargs):
-        api_url = f'{BACKEND_URL}/accounts/check/'  # Replace with your API URL
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=BACKEND_URL, help='Server to call (default: BACKEND_URL)')
+        parser.add_argument('--interval', type=float, default=20, help='Heartbeat interval in seconds')
+        parser.add_argument('--scenario', choices=sorted(SCENARIOS))
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run the scenario')
+        parser.add_argument('--rate', type=float, default=0, help='Target requests per second overall (0: unthrottled)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Results JSON of an earlier run to compare against')
 
+    def handle(self, *args, **options):
+        if not options['scenario']:
+            return self.heartbeat(options['url'], options['interval'])
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        load = LoadTest(options['url'], options['concurrency'], options['rate'])
+        elapsed = load.run(options['scenario'], options['duration'])
+        results = {
+            "url":options['url'],
+            "scenario":options['scenario'],
+            "concurrency":options['concurrency'],
+            "rate":options['rate'],
+            "finished_at":datetime.now(timezone.utc).isoformat(),
+            **load.summary(elapsed),
+        }
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+        self.report(results, baseline)
+        if options['output']:
+            with open(options['output'], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def heartbeat(self, url, interval):
+        api_url = f"{url.rstrip('/')}/accounts/check/"
+        session = requests.Session()
         try:
             while True:
-                # Make the API call
-                response = requests.get(api_url)
+                response = session.get(api_url)
                 self.stdout.write(f"API response: {response.status_code}")
-
-                # Sleep for 30 seconds before the next request
-                time.sleep(20)
+                time.sleep(interval)
         except KeyboardInterrupt:
             self.stdout.write(self.style.WARNING("Stopped API trigger manually"))
+
+    def report(self, results, baseline=None):
+        previous = (baseline or {}).get("endpoints", {})
+        self.stdout.write(
+            f"{'endpoint':<34} {'requests':>8} {'req/s':>8} {'errors':>6} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}" + (f" {'p95 vs baseline':>16}" if baseline else "")
+        )
+        for endpoint, stats in [*results["endpoints"].items(), ("total", results)]:
+            line = (
+                f"{endpoint:<34} {stats['requests']:>8} {stats['throughput']:>8.1f} {stats['errors']:>6} "
+                f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+            )
+            before = baseline if endpoint == "total" else previous.get(endpoint)
+            if baseline and before and before.get("p95_ms"):
+                line += f" {(stats['p95_ms'] / before['p95_ms'] - 1) * 100:>+15.1f}%"
+            self.stdout.write(line)
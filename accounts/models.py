@@ -44,4 +44,13 @@ class CustomUser(AbstractUser,PermissionsMixin):
 
     def __str__(self):  
         return f'{self.username}' 
-    
\ No newline at end of file
+    
+
+class RevokedToken(models.Model):
+    """
+    Refresh token JTIs that may no longer be used. Rows only matter until the
+    token itself expires; purge_revoked_tokens deletes them after that.
+    """
+    jti = models.CharField(max_length=255,unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
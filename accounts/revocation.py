@@ -0,0 +1,138 @@
+import hashlib
+import math
+import threading
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+# Highest RevokedToken id any worker has published; workers holding an older
+# filter load the rows above their own mark
+HIGH_WATER_KEY = "revoked-tokens:high-water"
+MIN_FILTER_CAPACITY = 10000
+FILTER_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self,capacity,error_rate=FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(64,int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1,round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self,value):
+        digest = hashlib.blake2b(value.encode(),digest_size=16).digest()
+        first = int.from_bytes(digest[:8],"little")
+        step = int.from_bytes(digest[8:],"little") | 1
+        return [(first + index * step) % self.size for index in range(self.hashes)]
+
+    def add(self,value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self,value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+class RevocationFilter:
+    """
+    Per-process bloom filter of revoked JTIs in front of the RevokedToken table.
+
+    A JTI the filter doesn't contain is definitely not revoked, which answers
+    the common case with one cache read and no query. Workers stay in sync
+    through the shared high-water id: when another worker has revoked tokens
+    since the last sync, only the rows above the local mark are loaded. This
+    relies on RevokedToken ids becoming visible in order, as they do with
+    SQLite's single writer. Without a shared cache backend, workers don't see
+    each other's revocations until their filter is rebuilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bloom = None
+        self.loaded_id = 0
+
+    def sync(self):
+        shared = cache.get(HIGH_WATER_KEY)
+        with self._lock:
+            if self.bloom is None or shared is None or shared < self.loaded_id:
+                # First use, evicted mark or a restored database: start over
+                self.rebuild()
+                cache.add(HIGH_WATER_KEY,self.loaded_id,None)
+            elif shared > self.loaded_id:
+                self.load(RevokedToken.objects.filter(id__gt=self.loaded_id))
+                if self.bloom.count > self.bloom.capacity:
+                    self.rebuild()
+
+    def rebuild(self):
+        live = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        self.loaded_id = RevokedToken.objects.aggregate(last=Max('id'))['last'] or 0
+        self.bloom = BloomFilter(max(MIN_FILTER_CAPACITY,live.count() * 2))
+        self.load(live.filter(id__lte=self.loaded_id))
+
+    def load(self,queryset):
+        for pk,jti in queryset.values_list('id','jti').iterator():
+            self.bloom.add(jti)
+            self.loaded_id = max(self.loaded_id,pk)
+
+    def add(self,pk,jti):
+        with self._lock:
+            if self.bloom is None:
+                return
+            self.bloom.add(jti)
+            # Next in sequence: nothing to load for it on the next sync
+            if pk == self.loaded_id + 1:
+                self.loaded_id = pk
+
+    def __contains__(self,jti):
+        self.sync()
+        return jti in self.bloom
+
+    def reset(self):
+        with self._lock:
+            self.bloom = None
+            self.loaded_id = 0
+
+
+revocations = RevocationFilter()
+
+
+def is_revoked(jti):
+    if jti not in revocations:
+        return False
+    # Possibly a false positive; the indexed table has the final say
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke_token(token):
+    """
+    Revoke a refresh token until it expires. Returns False when it already was
+    revoked, e.g. by a concurrent refresh presenting the same token.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    try:
+        with transaction.atomic():
+            revoked = RevokedToken.objects.create(jti=jti,expires_at=datetime_from_epoch(token["exp"]))
+    except IntegrityError:
+        return False
+
+    def publish():
+        revocations.add(revoked.pk,jti)
+        cache.set(HIGH_WATER_KEY,revoked.pk,None)
+    transaction.on_commit(publish)
+    return True
+
+
+def purge_expired_revocations():
+    """Delete revocations of tokens that have expired anyway. Returns the number deleted."""
+    deleted,_ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -1,8 +1,14 @@
 from rest_framework import serializers
 from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as JWTTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 
 from accounts.models import CustomUser
-class UserWriteSerializer(serializers.ModelSerializer):
+from utils.request_timing import TimedSerializerMixin
+from accounts.revocation import is_revoked, revoke_token
+class UserWriteSerializer(TimedSerializerMixin,serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     class Meta:
         model = CustomUser
@@ -23,11 +29,8 @@ class UserWriteSerializer(serializers.ModelSerializer):
 
         try:
             with transaction.atomic():
-                user = CustomUser.objects.create(
-                        username=username,
-                        email=email,
-                        phone=phone
-                        ) 
+                # Hash before saving so the user is written with one INSERT
+                user = CustomUser(username=username,email=email,phone=phone)
                 user.set_password(validated_data["password"])
                 user.save()
                 return user
@@ -35,7 +38,7 @@ class UserWriteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Error Creating User: {str(e)}")
 
 
-class UserReadSerializer(serializers.ModelSerializer):
+class UserReadSerializer(TimedSerializerMixin,serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['id','username','email','phone','created_at','updated_at']
@@ -49,6 +52,34 @@ class TokenRefreshSerializer(serializers.Serializer):
     refresh = serializers.CharField(write_only=True, required=True)
 
 
+class RevocableTokenRefreshSerializer(JWTTokenRefreshSerializer):
+    """
+    simplejwt's refresh with BLACKLIST_AFTER_ROTATION enforced through
+    accounts.revocation instead of the token_blacklist app: one insert per
+    rotation and, for tokens that were never revoked, no lookup query.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken(_("Token is blacklisted"))
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Losing the insert race means another request already rotated this token
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoke_token(refresh):
+                raise InvalidToken(_("Token is blacklisted"))
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data["refresh"] = str(refresh)
+
+        return data
+
+
 class ChangePasswordSerializer(serializers.Serializer):
     current_password = serializers.CharField(write_only=True, required=True)
     new_password = serializers.CharField(write_only=True, required=True)
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def evict_cached_user(sender, instance, **kwargs):
+    # Covers password changes and deactivation; QuerySet.update() bypasses this
+    invalidate_cached_user(instance.pk)
@@ -1,3 +1,258 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from utils import FILTRATION_KEYS
+from utils.query_budget import QueryBudgetExceeded, repeated_queries
+from utils.testing import enforce_query_budgets
+from .authentication import user_cache_key
+from .management.commands.trigger_api import list_filters
+from .models import CustomUser, RevokedToken
+from .revocation import HIGH_WATER_KEY, is_revoked, revocations
+from .views import UserProfileData
+
+
+@enforce_query_budgets
+class AccountsAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("member","member@example.com",9100000001,"secret1")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+class CachedAuthenticationTests(AccountsAPITestCase):
+    def test_warm_cache_skips_user_query(self):
+        self.assertEqual(self.client.get("/accounts/profile/").status_code,200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/accounts/profile/")
+        self.assertEqual(response.json()["data"]["username"],"member")
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.get("/accounts/profile/")
+        entry = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn("password",entry["fields"])
+        self.assertNotIn(self.user.password,repr(entry))
+        self.assertEqual(entry["password_digest"],get_md5_hash_password(self.user.password))
+
+    def test_password_change_evicts_cached_user(self):
+        self.client.get("/accounts/profile/")
+        response = self.client.post(
+            "/accounts/change-password/",{"current_password":"secret1","new_password":"secret9"},format="json"
+        )
+        self.assertEqual(response.status_code,200)
+        with self.assertNumQueries(1):
+            self.client.get("/accounts/profile/")
+        self.assertTrue(CustomUser.objects.get(pk=self.user.pk).check_password("secret9"))
+
+    def test_deactivation_takes_effect_immediately(self):
+        self.client.get("/accounts/profile/")
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/accounts/profile/").status_code,401)
+
+    def test_fill_that_raced_an_eviction_is_ignored(self):
+        self.client.get("/accounts/profile/")
+        stale = cache.get(user_cache_key(self.user.pk))
+        self.user.is_active = False
+        self.user.save()
+        # Stored by a request that read the user before the save
+        cache.set(user_cache_key(self.user.pk),stale)
+        self.assertEqual(self.client.get("/accounts/profile/").status_code,401)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_unsignalled_deactivation_is_seen_without_cache(self):
+        # Another worker's eviction never reaches a process-local cache
+        self.client.get("/accounts/profile/")
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get("/accounts/profile/").status_code,401)
+
+    def test_off_by_default_without_shared_cache(self):
+        script = "from django.conf import settings; settings._setup(); print(settings.AUTH_USER_CACHE_TIMEOUT)"
+        for backend,timeout in (
+            ("django.core.cache.backends.locmem.LocMemCache","0"),
+            ("django.core.cache.backends.redis.RedisCache","60"),
+        ):
+            env = {**os.environ,"SECRET_KEY":"x","DJANGO_SETTINGS_MODULE":"employee_management.settings","CACHE_BACKEND":backend}
+            env.pop("AUTH_USER_CACHE_TIMEOUT",None)
+            result = subprocess.run([sys.executable,"-c",script],env=env,capture_output=True,text=True)
+            self.assertEqual(result.stdout.strip(),timeout,result.stderr)
+
+
+class LoginTests(AccountsAPITestCase):
+    def login(self):
+        return APIClient().post("/accounts/login/",{"username":"member","password":"secret1"},format="json")
+
+    def test_token_only_login_skips_session(self):
+        response = self.login()
+        self.assertEqual(response.status_code,200)
+        self.assertIn("access_token",response.json()["data"])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME,response.cookies)
+        self.assertFalse(Session.objects.exists())
+        self.assertIsNotNone(CustomUser.objects.get(pk=self.user.pk).last_login)
+
+    @override_settings(LOGIN_SESSIONS=True)
+    def test_session_login_when_enabled(self):
+        response = self.login()
+        self.assertEqual(response.status_code,200)
+        self.assertIn(settings.SESSION_COOKIE_NAME,response.cookies)
+        self.assertEqual(Session.objects.count(),1)
+        self.assertIsNotNone(CustomUser.objects.get(pk=self.user.pk).last_login)
+
+
+class PasswordHasherProfileTests(TestCase):
+    def test_unknown_profile_is_rejected(self):
+        env = {**os.environ,"SECRET_KEY":"x","PASSWORD_HASHER_PROFILE":"argon"}
+        result = subprocess.run(
+            [sys.executable,"-c","import employee_management.settings"],env=env,capture_output=True,text=True
+        )
+        self.assertNotEqual(result.returncode,0)
+        self.assertIn("ImproperlyConfigured: PASSWORD_HASHER_PROFILE must be one of pbkdf2, argon2, bcrypt, scrypt",result.stderr)
+
+
+class LoadTestScenarioTests(AccountsAPITestCase):
+    def test_list_filters_are_supported(self):
+        for filtration_data in list_filters():
+            self.assertLessEqual(set(filtration_data),set(FILTRATION_KEYS))
+            response = self.client.post("/employees/list/",{"filtration_data":filtration_data},format="json")
+            self.assertEqual(response.status_code,200,filtration_data)
+
+
+class TokenRotationTests(AccountsAPITestCase):
+    def setUp(self):
+        super().setUp()
+        revocations.reset()
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def rotate(self,token):
+        return APIClient().post("/accounts/token/refresh/",{"refresh":token},format="json")
+
+    def test_rotated_token_is_revoked(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.rotate(self.refresh)
+        self.assertEqual(response.status_code,200)
+        rotated = response.json()["data"]["refresh_token"]
+        self.assertNotEqual(rotated,self.refresh)
+
+        self.assertEqual(self.rotate(self.refresh).status_code,400)
+        self.assertEqual(self.rotate(rotated).status_code,200)
+
+    def test_unrevoked_token_check_skips_database(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rotate(str(RefreshToken.for_user(self.user)))
+        jti = RefreshToken(self.refresh)["jti"]
+        with self.assertNumQueries(0):
+            self.assertFalse(is_revoked(jti))
+
+    def test_other_workers_revocations_are_loaded(self):
+        self.assertFalse(is_revoked(RefreshToken(self.refresh)["jti"]))
+        # Written by another process: only the shared high-water mark moves
+        revoked = RevokedToken.objects.create(jti=RefreshToken(self.refresh)["jti"],expires_at=timezone.now() + timedelta(days=1))
+        cache.set(HIGH_WATER_KEY,revoked.pk,None)
+        self.assertEqual(self.rotate(self.refresh).status_code,400)
+
+    def test_purge_deletes_only_expired(self):
+        RevokedToken.objects.create(jti="expired",expires_at=timezone.now() - timedelta(seconds=1))
+        RevokedToken.objects.create(jti="live",expires_at=timezone.now() + timedelta(days=1))
+        call_command("purge_revoked_tokens",stdout=io.StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list("jti",flat=True)),["live"])
+
+
+class QueryBudgetTests(AccountsAPITestCase):
+    def register(self,username):
+        return APIClient().post("/accounts/create/",{
+            "username":username,"email":f"{username}@example.com","phone":9100000002,"password":"secret1"
+        },format="json")
+
+    def test_registration_within_budget(self):
+        with self.assertNumQueries(6):
+            self.assertEqual(self.register("newcomer").status_code,201)
+        self.assertTrue(CustomUser.objects.get(username="newcomer").check_password("secret1"))
+
+    def test_over_budget_raises(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded,"1 queries over a budget of 0"):
+            with mock.patch.object(UserProfileData,"query_budget",0):
+                self.client.get("/accounts/profile/")
+
+    @override_settings(QUERY_BUDGET_MODE="log")
+    def test_over_budget_logs(self):
+        with self.assertLogs("query_budget","WARNING") as logs:
+            with mock.patch.object(UserProfileData,"query_budget",0):
+                self.assertEqual(self.client.get("/accounts/profile/").status_code,200)
+        self.assertIn("GET /accounts/profile/ (UserProfileData)",logs.output[0])
+
+    def test_repeated_selects_flagged(self):
+        select = 'SELECT "name" FROM "employees_employee" WHERE "id" = %s'
+        self.assertEqual(repeated_queries([select] * 3 + ["INSERT INTO x VALUES (%s)"] * 5,limit=2),{select:3})
+        self.assertEqual(repeated_queries([select] * 2,limit=2),{})
+
+    def test_every_api_view_declares_budget(self):
+        def views(patterns):
+            for pattern in patterns:
+                if isinstance(pattern,URLPattern):
+                    yield getattr(pattern.callback,"view_class",None)
+                else:
+                    yield from views(pattern.url_patterns)
+
+        ours = {view for view in views(get_resolver().url_patterns) if view and view.__module__.split(".")[0] in ("accounts","employees")}
+        self.assertTrue(ours)
+        self.assertEqual([view.__name__ for view in ours if not hasattr(view,"query_budget")],[])
+
+
+class OpenAPISchemaTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name,"openapi.json")
+
+    def test_serves_built_schema_compressed_and_cacheable(self):
+        with override_settings(OPENAPI_SCHEMA_PATH=self.path):
+            call_command("build_openapi_schema",stdout=io.StringIO())
+            response = self.client.get("/openapi.json",HTTP_ACCEPT_ENCODING="gzip, br")
+            self.assertEqual(response.status_code,200)
+            self.assertEqual(response["Content-Encoding"],"gzip")
+            self.assertIn("max-age=",response["Cache-Control"])
+            self.assertIn("Accept-Encoding",response["Vary"])
+            schema = json.loads(gzip.decompress(response.content))
+            self.assertIn("/employees/list/",schema["paths"])
+
+            plain = self.client.get("/openapi.json")
+            self.assertFalse(plain.has_header("Content-Encoding"))
+            self.assertEqual(json.loads(plain.content),schema)
+            self.assertEqual(self.client.get("/openapi.json",HTTP_IF_NONE_MATCH=response["ETag"]).status_code,304)
+
+    def test_ui_pages_never_generate_the_schema(self):
+        with mock.patch("drf_yasg.generators.OpenAPISchemaGenerator.get_schema",side_effect=AssertionError):
+            for url in ("/","/redoc/"):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code,200)
+                self.assertIn(b"/openapi.json",response.content)
+
+    def test_unbuilt_schema_is_generated_only_in_debug(self):
+        with override_settings(OPENAPI_SCHEMA_PATH=self.path):
+            self.assertEqual(self.client.get("/openapi.json").status_code,404)
+            with override_settings(DEBUG=True):
+                response = self.client.get("/openapi.json")
+        self.assertEqual(response.status_code,200)
+        self.assertIn("/accounts/login/",json.loads(response.content)["paths"])
@@ -1,8 +1,9 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth import authenticate, login
+from django.contrib.auth.models import update_last_login
 from rest_framework_simplejwt.tokens import RefreshToken
-from  rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
@@ -14,6 +15,7 @@ from .serializers import (
     UserReadSerializer,
     LoginSerializer,
     TokenRefreshSerializer,
+    RevocableTokenRefreshSerializer,
     ChangePasswordSerializer
     )
 from utils import (
@@ -35,9 +37,12 @@ from .helpers import (
     user_password_same_as_previous,
     user_detail_success
 )
-from .models import CustomUser
+from .authentication import CachedJWTAuthentication
 
 class RegisterView(APIView):
+    # Username, email and phone lookups, then one INSERT in a transaction
+    query_budget = 6
+
     @swagger_auto_schema(
     operation_description="Register",
     operation_id='register',
@@ -69,6 +74,8 @@ class RegisterView(APIView):
 
 
 class Login(APIView):
+    # Token-only logins take two queries (lookup, last_login); sessions and password rehashes add the rest
+    query_budget = 9
 
     # function for login
     @swagger_auto_schema(
@@ -82,7 +89,12 @@ class Login(APIView):
             password = request.data['password']
             user = authenticate(request,username=username,password=str(password))
             if user is not None:
-                login(request,user)
+                if settings.LOGIN_SESSIONS:
+                    # Only needed for session-based clients; the API itself authenticates with the tokens
+                    login(request,user)
+                else:
+                    # What login() would record, without the session write
+                    update_last_login(None,user)
                 refresh = RefreshToken.for_user(user)
                 data = {
                     'access_token':str(refresh.access_token),
@@ -97,6 +109,9 @@ class Login(APIView):
 
 
 class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = RevocableTokenRefreshSerializer
+    query_budget = 6
+
     # function for getting new acces and refresh token
     @swagger_auto_schema(
     operation_description="New Token",
@@ -117,8 +132,9 @@ class MyTokenRefreshView(TokenRefreshView):
 
 
 class ChangePassword(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 2
 
     # function for changing password
     @swagger_auto_schema(
@@ -140,9 +156,10 @@ class ChangePassword(APIView):
             if check_password(new_password,request.user.password):
                 return Response(user_password_same_as_previous(),status=status.HTTP_400_BAD_REQUEST)
             
-            user = CustomUser.objects.get(id=request.user.id)
+            # A cached request.user loads its password on first access; saving it evicts the cached copy
+            user = request.user
             user.set_password(str(new_password))
-            user.save()
+            user.save(update_fields=['password','updated_at'])
             return Response(user_password_change_success(),status=status.HTTP_200_OK)
         
         except Exception as e:
@@ -151,8 +168,9 @@ class ChangePassword(APIView):
 
 
 class UserProfileData(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 1
 
     # function for  user profile data 
     @swagger_auto_schema(
@@ -161,14 +179,15 @@ class UserProfileData(APIView):
     )       
     def get(self,request):
         try:
-            user = CustomUser.objects.get(id=request.user.id)
-            serializer = UserReadSerializer(user)
+            serializer = UserReadSerializer(request.user)
             return Response(user_detail_success(serializer.data),status=status.HTTP_200_OK)
         
         except Exception as e:
             return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 class Check(APIView):
+    query_budget = 0
+
     def get(self,request):
         try:
             return Response({"message":"checking","status":status.HTTP_200_OK},status=status.HTTP_200_OK)
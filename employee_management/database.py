@@ -0,0 +1,70 @@
+"""
+SQLite connection profiles for DATABASES.
+
+"default" keeps Django's stock connection: rollback journal, synchronous=FULL,
+a 5 second busy timeout and deferred transactions. "performance" is meant for
+several workers sharing one database file:
+
+- WAL lets readers run alongside the single writer instead of blocking on it;
+- synchronous=NORMAL only syncs at checkpoints, which is still crash-safe in WAL;
+- mmap and a larger page cache keep hot pages in memory;
+- BEGIN IMMEDIATE takes the write lock when an atomic block starts, so two
+  writers wait on the busy timeout instead of failing with "database is
+  locked" when a read transaction tries to upgrade to a write;
+- persistent connections skip reconnecting and re-running the pragmas.
+"""
+
+SQLITE_PROFILES = {
+    "default":{},
+    "performance":{
+        "pragmas":{
+            "journal_mode":"WAL",
+            "synchronous":"NORMAL",
+            "mmap_size":256 * 1024 * 1024,
+            # Negative values are KiB
+            "cache_size":-64 * 1024,
+            "temp_store":"MEMORY",
+        },
+        "transaction_mode":"IMMEDIATE",
+        "busy_timeout":20,
+        "conn_max_age":600,
+    },
+}
+
+
+def optional(cast):
+    """decouple cast for settings that fall back to the profile when unset."""
+    return lambda value: None if value in (None,"") else cast(value)
+
+
+def sqlite_database(name,profile="performance",busy_timeout=None,conn_max_age=None,**pragmas):
+    """
+    A DATABASES entry for the SQLite file `name` using one of SQLITE_PROFILES.
+    Keyword arguments set pragmas, the busy timeout in seconds and
+    CONN_MAX_AGE; the ones left as None keep the profile's value.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}; use one of {', '.join(SQLITE_PROFILES)}")
+    config = SQLITE_PROFILES[profile]
+
+    options = {}
+    merged = {**config.get("pragmas",{}),**{pragma:value for pragma,value in pragmas.items() if value is not None}}
+    commands = [f"PRAGMA {pragma}={value}" for pragma,value in merged.items()]
+    if commands:
+        options["init_command"] = ";".join(commands)
+    if config.get("transaction_mode"):
+        options["transaction_mode"] = config["transaction_mode"]
+    busy_timeout = config.get("busy_timeout") if busy_timeout is None else busy_timeout
+    if busy_timeout is not None:
+        options["timeout"] = busy_timeout
+
+    database = {
+        "ENGINE":"django.db.backends.sqlite3",
+        "NAME":name,
+        "OPTIONS":options,
+    }
+    conn_max_age = config.get("conn_max_age",0) if conn_max_age is None else conn_max_age
+    if conn_max_age:
+        database["CONN_MAX_AGE"] = conn_max_age
+        database["CONN_HEALTH_CHECKS"] = True
+    return database
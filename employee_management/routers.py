@@ -0,0 +1,128 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+class RoutingState:
+    """What the routers know about the request being served."""
+
+    def __init__(self):
+        self.user_id = None
+        self.wrote = False
+        self.pinned = None
+        # Tenant shard placements resolved while serving this request
+        self.shards = {}
+
+    def set_user(self,user_id):
+        if user_id != self.user_id:
+            self.user_id = user_id
+            self.pinned = None
+
+    def record_write(self):
+        if self.wrote:
+            return
+        self.wrote = True
+        if self.user_id is not None:
+            # Later requests of this user read their own write from the primary
+            cache.set(pin_key(self.user_id),True,settings.READ_YOUR_WRITES_WINDOW)
+
+    def read_primary(self):
+        if self.wrote:
+            return True
+        if self.user_id is None:
+            return False
+        if self.pinned is None:
+            self.pinned = bool(cache.get(pin_key(self.user_id)))
+        return self.pinned
+
+
+_routing_state = ContextVar("database_routing_state",default=None)
+
+
+def routing_state():
+    return _routing_state.get()
+
+
+def set_routing_user(user_id):
+    """Called by authentication once the request's user id is known."""
+    state = _routing_state.get()
+    if state is not None:
+        state.set_user(str(user_id))
+
+
+@contextmanager
+def routing_context(user_id=None):
+    """
+    A fresh RoutingState for one request, or for work done on behalf of
+    `user_id` outside of requests (commands, background jobs).
+    """
+    state = RoutingState()
+    if user_id is not None:
+        state.set_user(str(user_id))
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+class DatabaseRoutingMiddleware:
+    """Gives every request its own RoutingState for the database routers."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self,get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self,request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_context():
+            return self.get_response(request)
+
+    async def __acall__(self,request):
+        with routing_context():
+            return await self.get_response(request)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to default, reads to a random DATABASE_REPLICA_ALIASES entry.
+
+    Reads stay on the primary inside transactions, once the current request
+    has written, and for READ_YOUR_WRITES_WINDOW seconds after its user last
+    wrote, so users always read their own writes. Without replicas configured
+    everything uses default. It is the last router, so it always answers:
+    models the tenant shard router passes on never follow a related
+    instance onto a shard.
+    """
+
+    def db_for_read(self,model,**hints):
+        replicas = settings.DATABASE_REPLICA_ALIASES
+        if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        state = _routing_state.get()
+        if state is not None and state.read_primary():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self,model,**hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self,obj1,obj2,**hints):
+        # Replicas hold the same data as the primary
+        return True
@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+API_VERSION = 'v1'
+
+API_INFO = openapi.Info(
+   title="Employee Management APIs",
+   default_version=API_VERSION,
+   description="Test description",
+   terms_of_service="https://www.google.com/policies/terms/",
+   contact=openapi.Contact(email="contact@snippets.local"),
+   license=openapi.License(name="BSD License"),
+)
+
+
+
+def generate_schema():
+    """The public schema as JSON bytes."""
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None,public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(path):
+    """Writes the schema to `path` and a gzipped copy to `path`.gz. Returns the JSON bytes."""
+    body = generate_schema()
+    os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+    # mtime=0 keeps the archive byte-identical between builds of the same schema
+    for target,content in ((path,body),(f"{path}.gz",gzip.compress(body,compresslevel=9,mtime=0))):
+        with open(f"{target}.tmp","wb") as f:
+            f.write(content)
+        os.replace(f"{target}.tmp",target)
+    return body
+
+
+class PrebuiltSchema:
+    """The built schema files, read once per build and kept in memory."""
+
+    def __init__(self,path):
+        stat = os.stat(path)
+        self.key = (path,stat.st_mtime_ns,stat.st_size)
+        with open(path,"rb") as f:
+            self.body = f.read()
+        try:
+            with open(f"{path}.gz","rb") as f:
+                self.compressed = f.read()
+        except FileNotFoundError:
+            self.compressed = gzip.compress(self.body,compresslevel=9,mtime=0)
+        self.etag = quote_etag(hashlib.sha256(self.body).hexdigest()[:32])
+
+
+_prebuilt = None
+_prebuilt_lock = threading.Lock()
+
+
+def prebuilt_schema():
+    # One stat per request, so a rebuilt schema is picked up without a restart
+    global _prebuilt
+    path = settings.OPENAPI_SCHEMA_PATH
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    with _prebuilt_lock:
+        if _prebuilt is None or _prebuilt.key != (path,stat.st_mtime_ns,stat.st_size):
+            _prebuilt = PrebuiltSchema(path)
+        return _prebuilt
+
+
+def openapi_schema(request):
+    """
+    Serves the schema built by `manage.py build_openapi_schema`, gzipped for
+    clients that accept it and cacheable for OPENAPI_SCHEMA_MAX_AGE seconds.
+    Without a built schema, DEBUG generates it on every request and
+    production answers 404.
+    """
+    schema = prebuilt_schema()
+    if schema is None:
+        if not settings.DEBUG:
+            raise Http404("OpenAPI schema not built, run manage.py build_openapi_schema")
+        response = HttpResponse(generate_schema(),content_type="application/json")
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    response = get_conditional_response(request,etag=schema.etag)
+    if response is None:
+        if "gzip" in request.headers.get("Accept-Encoding",""):
+            response = HttpResponse(schema.compressed,content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(schema.body,content_type="application/json")
+    response["ETag"] = schema.etag
+    response["Cache-Control"] = f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+    patch_vary_headers(response,("Accept-Encoding",))
+    return response
+
+
+def schema_ui(renderer_class):
+    """
+    A drf_yasg UI page that loads its schema from SPEC_URL (/openapi.json).
+    Unlike drf_yasg's schema view it never runs the generator, so probing the
+    page costs one template render.
+    """
+    def view(request):
+        renderer = renderer_class()
+        context = {"request":request}
+        renderer.set_context(context)
+        context.update(title=API_INFO.title,version=API_VERSION)
+        response = HttpResponse(render_to_string(renderer.template,context,request))
+        response["Cache-Control"] = f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+        return response
+    return view
+
+
+swagger_ui = schema_ui(SwaggerUIRenderer)
+redoc_ui = schema_ui(ReDocRenderer)
@@ -12,9 +12,12 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
 import os
 
+from .database import optional, sqlite_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,7 +56,17 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         #jwt
-        'rest_framework_simplejwt.authentication.JWTAuthentication'    
+        'accounts.authentication.CachedJWTAuthentication'
+    ],
+    # orjson-backed; fall back to the stdlib json module when orjson is missing
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.json_renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'utils.json_renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -98,6 +111,10 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'utils.request_timing.ServerTimingMiddleware',
+    'utils.query_budget.QueryBudgetMiddleware',
+    'utils.metrics.MetricsMiddleware',
+    'employee_management.routers.DatabaseRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -132,12 +149,144 @@ WSGI_APPLICATION = 'employee_management.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# SQLITE_PROFILE is "performance" (WAL, tuned pragmas, BEGIN IMMEDIATE, persistent
+# connections) or "default" (Django's stock SQLite connection); see database.py.
+# Use DB_CONN_MAX_AGE=0 under ASGI, where persistent connections are not reused.
 DATABASES = {
+    'default': sqlite_database(
+        BASE_DIR / 'db.sqlite3',
+        profile=config('SQLITE_PROFILE',default='performance'),
+        # Unset values keep the profile's own
+        busy_timeout=config('SQLITE_BUSY_TIMEOUT',default=None,cast=optional(float)),
+        conn_max_age=config('DB_CONN_MAX_AGE',default=None,cast=optional(int)),
+        synchronous=config('SQLITE_SYNCHRONOUS',default=None),
+        mmap_size=config('SQLITE_MMAP_SIZE',default=None,cast=optional(int)),
+        cache_size=config('SQLITE_CACHE_SIZE',default=None,cast=optional(int)),
+    )
+}
+
+# Read replicas: comma separated SQLite files kept in sync with db.sqlite3 by an
+# external replication tool. Reads go to a replica unless they run in a
+# transaction, the request already wrote, or its user wrote within the last
+# READ_YOUR_WRITES_WINDOW seconds; writes always go to default. The window is kept in
+# the cache, so replicas require a shared CACHE_BACKEND.
+DATABASE_REPLICAS = config('DATABASE_REPLICAS',default='',cast=Csv())
+DATABASE_REPLICA_ALIASES = []
+for index,replica in enumerate(DATABASE_REPLICAS):
+    alias = f'replica_{index}'
+    DATABASES[alias] = sqlite_database(replica,profile=config('SQLITE_PROFILE',default='performance'))
+    # Tests read replicas through the test database
+    DATABASES[alias]['TEST'] = {'MIRROR':'default'}
+    DATABASE_REPLICA_ALIASES.append(alias)
+
+# Employee shards: comma separated SQLite files that, with default, hold the
+# employees tables of disjoint sets of tenants (employees/sharding.py). Moves
+# between shards wait EMPLOYEE_SHARD_CACHE_TIMEOUT for cached placements to expire.
+EMPLOYEE_SHARDS = config('EMPLOYEE_SHARDS',default='',cast=Csv())
+EMPLOYEE_SHARD_ALIASES = ['default']
+for index,shard in enumerate(EMPLOYEE_SHARDS):
+    alias = f'shard_{index}'
+    DATABASES[alias] = sqlite_database(shard,profile=config('SQLITE_PROFILE',default='performance'))
+    EMPLOYEE_SHARD_ALIASES.append(alias)
+EMPLOYEE_SHARD_CACHE_TIMEOUT = config('EMPLOYEE_SHARD_CACHE_TIMEOUT',default=10,cast=int)
+
+DATABASE_ROUTERS = ['employees.sharding.TenantShardRouter','employee_management.routers.PrimaryReplicaRouter']
+READ_YOUR_WRITES_WINDOW = config('READ_YOUR_WRITES_WINDOW',default=5,cast=int)
+
+
+# Cache
+# Use a shared backend (e.g. Redis or Memcached) when running several workers, so
+# evictions triggered in one worker are seen by the others
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND',default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION',default='employee-management'),
     }
 }
+# Backends private to each process: what one worker stores, the others never see
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SHARED_CACHE = CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+# Read-your-writes pins live in the cache; every worker must see them
+if DATABASE_REPLICAS and not SHARED_CACHE:
+    raise ImproperlyConfigured("DATABASE_REPLICAS needs a shared CACHE_BACKEND (e.g. Redis or Memcached)")
+
+# Versioned result cache for EmployeeList pages. Backends: utils.result_cache.LocalResultCache
+# (in-process LRU), SharedResultCache (the Django cache below) or TieredResultCache (both).
+# Off by default without a shared cache: invalidations would only reach one worker.
+EMPLOYEE_LIST_CACHE = config('EMPLOYEE_LIST_CACHE',default=SHARED_CACHE,cast=bool)
+RESULT_CACHE = {
+    'BACKEND': config('RESULT_CACHE_BACKEND',default='utils.result_cache.TieredResultCache'),
+    'OPTIONS': {
+        'cache_alias': 'default',
+        'timeout': config('RESULT_CACHE_TIMEOUT',default=300,cast=int),
+        'max_entries': config('RESULT_CACHE_MAX_ENTRIES',default=1024,cast=int),
+    },
+}
+
+# Seconds an authenticated user is served from the cache instead of the database (0 disables).
+# Off by default without a shared cache: a deactivation or password change would only be
+# seen by the worker that made it.
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT',default=60 if SHARED_CACHE else 0,cast=int)
+
+# Time auth, parsing, queries, serialization and rendering of each request and
+# report them in a Server-Timing header and a JSON line on the request_timing logger
+SERVER_TIMING = config('SERVER_TIMING',default=False,cast=bool)
+
+# Check requests against their view's query_budget and for repeated identical
+# SELECTs (likely N+1): "off", "log" (query_budget logger) or "raise"
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE',default='off')
+QUERY_REPEAT_LIMIT = config('QUERY_REPEAT_LIMIT',default=2,cast=int)
+
+# Request, query and cache metrics per view, served in Prometheus text format at
+# /metrics/. Outside DEBUG, enabling them requires both of:
+# - METRICS_TOKEN: scrapes must send "Authorization: Bearer <token>";
+# - METRICS_DIR: a directory every worker process shares, emptied on deploy. Each
+#   worker writes its totals there at most every METRICS_FLUSH_INTERVAL seconds
+#   and a scrape of any worker sums them all.
+METRICS_ENABLED = config('METRICS_ENABLED',default=False,cast=bool)
+METRICS_DIR = config('METRICS_DIR',default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL',default=5.0,cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN',default='')
+
+LOGGING = {
+    'version':1,
+    'disable_existing_loggers':False,
+    'handlers':{
+        'console':{'class':'logging.StreamHandler'},
+    },
+    'loggers':{
+        'request_timing':{'handlers':['console'],'level':config('REQUEST_TIMING_LOG_LEVEL',default='INFO'),'propagate':False},
+        'query_budget':{'handlers':['console'],'level':'WARNING','propagate':False},
+    },
+}
+
+# Login only issues JWTs; set True to also start a Django session (django_session row + cookie)
+LOGIN_SESSIONS = config('LOGIN_SESSIONS',default=False,cast=bool)
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+# The profile's hasher hashes new passwords; the others keep verifying existing
+# hashes, which are rehashed with the profile's hasher on the next login.
+# argon2 needs argon2-cffi and bcrypt needs bcrypt installed.
+
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2':'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2':'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt':'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt':'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = config('PASSWORD_HASHER_PROFILE',default='pbkdf2')
+if PASSWORD_HASHER_PROFILE not in PASSWORD_HASHER_PROFILES:
+    raise ImproperlyConfigured(f"PASSWORD_HASHER_PROFILE must be one of {', '.join(PASSWORD_HASHER_PROFILES)}")
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile,hasher in PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
 
 
 # Password validation
@@ -183,7 +332,49 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
 
+# OpenAPI schema
+# Built once per deploy with `manage.py build_openapi_schema` and served from
+# /openapi.json (gzipped, cacheable for OPENAPI_SCHEMA_MAX_AGE seconds); the Swagger
+# UI (/) and ReDoc (/redoc/) pages only load that URL. Without a built file only
+# DEBUG generates the schema per request.
+
+OPENAPI_SCHEMA_PATH = config('OPENAPI_SCHEMA_PATH',default=os.path.join(STATIC_ROOT,'openapi.json'))
+OPENAPI_SCHEMA_MAX_AGE = config('OPENAPI_SCHEMA_MAX_AGE',default=3600,cast=int)
+# The API authenticates with JWTs only; without session auth the UI pages are the same for everyone
+SWAGGER_SETTINGS = {'SPEC_URL':'openapi-schema','USE_SESSION_AUTH':False}
+REDOC_SETTINGS = {'SPEC_URL':'openapi-schema'}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Employees
+
+# Maximum custom_fields keys a single user may declare as hot, and distinct hot keys
+# across all tenants of a shard (each one adds an index every write maintains).
+# Declarations are only recorded by the API; `manage.py sync_custom_field_indexes`
+# builds and drops the indexes, off the request path.
+CUSTOM_FIELD_INDEX_LIMIT = config('CUSTOM_FIELD_INDEX_LIMIT',default=10,cast=int)
+CUSTOM_FIELD_INDEX_TOTAL_LIMIT = config('CUSTOM_FIELD_INDEX_TOTAL_LIMIT',default=20,cast=int)
+
+# Bulk employee writes: rows per INSERT batch and maximum records per request
+EMPLOYEE_BULK_BATCH_SIZE = config('EMPLOYEE_BULK_BATCH_SIZE',default=500,cast=int)
+EMPLOYEE_BULK_MAX_ITEMS = config('EMPLOYEE_BULK_MAX_ITEMS',default=10000,cast=int)
+
+# Rows fetched per database round trip while streaming exports
+EMPLOYEE_EXPORT_CHUNK_SIZE = config('EMPLOYEE_EXPORT_CHUNK_SIZE',default=2000,cast=int)
+
+# Streamed imports: rows committed per transaction and where rejected rows are written
+EMPLOYEE_IMPORT_CHUNK_SIZE = config('EMPLOYEE_IMPORT_CHUNK_SIZE',default=1000,cast=int)
+EMPLOYEE_IMPORT_DIR = config('EMPLOYEE_IMPORT_DIR',default=os.path.join(BASE_DIR,'imports'))
+# Seconds without a committed chunk after which a running import counts as dead and may be resumed
+EMPLOYEE_IMPORT_STALE_AFTER = config('EMPLOYEE_IMPORT_STALE_AFTER',default=300,cast=int)
+
+# Seconds a rendered single-employee response is kept, keyed by id and updated_at
+EMPLOYEE_DETAIL_CACHE_TIMEOUT = config('EMPLOYEE_DETAIL_CACHE_TIMEOUT',default=300,cast=int)
+
+# Build EmployeeList rows from values() dicts with precompiled converters instead of EmployeeReadSerializer
+EMPLOYEE_FAST_SERIALIZATION = config('EMPLOYEE_FAST_SERIALIZATION',default=True,cast=bool)
@@ -2,33 +2,20 @@ from django.contrib import admin
 from django.urls import path,include,re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
 from django.views.static import serve
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Employee Management APIs",
-      default_version='v1',
-      description="Test description",
-      terms_of_service="https://www.google.com/policies/terms/",
-      contact=openapi.Contact(email="contact@snippets.local"),
-      license=openapi.License(name="BSD License"),
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
-
+from employee_management.schema import openapi_schema, redoc_ui, swagger_ui
+from utils.metrics import metrics_view
 
 urlpatterns = [
    #  path('admin/', admin.site.urls),
-   path('', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-   path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+   path('', swagger_ui, name='schema-swagger-ui'),
+   path('redoc/', redoc_ui, name='schema-redoc'),
+   path('openapi.json', openapi_schema, name='openapi-schema'),
    re_path(r'^media/(?P<path>.*)$', serve,{'document_root': settings.MEDIA_ROOT}),
    re_path(r'^static/(?P<path>.*)$', serve,{'document_root': settings.STATIC_ROOT}),
    path('accounts/', include('accounts.urls')),
-   path('employees/', include('employees.urls'))
+   path('employees/', include('employees.urls')),
+   path('metrics/', metrics_view, name='metrics'),
     
 ]
 
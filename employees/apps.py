@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_save, pre_delete
 
 
 class EmployeesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employees'
+
+    def ready(self):
+        from .sharding import delete_tenant_rows, place_new_tenant
+
+        post_save.connect(place_new_tenant,sender=settings.AUTH_USER_MODEL,dispatch_uid="employees.place_new_tenant")
+        pre_delete.connect(delete_tenant_rows,sender=settings.AUTH_USER_MODEL,dispatch_uid="employees.delete_tenant_rows")
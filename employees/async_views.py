@@ -0,0 +1,237 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+
+from accounts.authentication import CachedJWTAuthentication
+from utils import (
+    internal_server_error_response,
+    invalid_inputs,
+    apagination_processing,
+    acursor_pagination_processing,
+    InvalidFiltration
+)
+from utils.async_views import AsyncAPIView
+from utils.result_cache import get_result_cache
+from .serializers import (
+    EmployeeWriteSerializer,
+    EmployeeReadSerializer,
+    EmployeeListSerializer,
+    EMPLOYEE_READ_FIELDS,
+    serialize_employee_rows
+)
+from .helpers import (
+    employee_create_success,
+    employee_update_success,
+    employee_not_found,
+    employee_success_list,
+    employee_delete_success,
+    employee_detail_success,
+    employee_tenant_moving,
+    tenant_moving_headers
+)
+from .models import Employee
+from .counters import adjust_employee_count, aget_employee_count
+from .sharding import TenantMoving, tenant_atomic
+from .queries import employee_list_query
+from .caching import (
+    employee_validators,
+    get_cached_detail,
+    set_cached_detail,
+    employee_list_cache_key,
+    invalidate_employee_lists
+)
+
+# Reads use the async ORM directly. Writes that must share a transaction with
+# the counter and list-cache invalidation run as one sync unit, since
+# transactions aren't available to async code.
+
+
+def create_employee(serializer,user):
+    with tenant_atomic(user):
+        serializer.save()
+        adjust_employee_count(user,1)
+        invalidate_employee_lists(user)
+
+
+def update_employee(serializer):
+    with tenant_atomic(serializer.instance.user_id):
+        serializer.save()
+        invalidate_employee_lists(serializer.instance.user_id)
+
+
+def delete_employee(employee):
+    with tenant_atomic(employee.user_id):
+        employee.delete()
+        adjust_employee_count(employee.user_id,-1)
+        invalidate_employee_lists(employee.user_id)
+
+
+def cached_employee_list(user,payload):
+    cache_key = employee_list_cache_key(user,payload) if settings.EMPLOYEE_LIST_CACHE else None
+    return cache_key,(get_result_cache().get(cache_key) if cache_key else None)
+
+
+class AsyncEmployeeView(AsyncAPIView):
+    authentication_classes = [CachedJWTAuthentication]
+
+
+class AsyncEmployeeCreate(AsyncEmployeeView):
+    query_budget = 10
+
+    async def post(self,request):
+        try:
+            serializer = EmployeeWriteSerializer(data=request.data,context={"user":request.user})
+            if not serializer.is_valid():
+                return self.respond(invalid_inputs(serializer.errors),status.HTTP_400_BAD_REQUEST)
+
+            await sync_to_async(create_employee)(serializer,request.user)
+            return self.respond(employee_create_success(serializer.data),status.HTTP_200_OK)
+
+        except TenantMoving:
+            return self.respond(employee_tenant_moving(),status.HTTP_503_SERVICE_UNAVAILABLE,tenant_moving_headers())
+
+        except Exception as e:
+            return self.respond(internal_server_error_response(e),status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncEmployeeUpdate(AsyncEmployeeView):
+    query_budget = 5
+
+    async def patch(self,request):
+        try:
+            employee_id = request.GET.get('id')
+
+            instance = await Employee.objects.aget(id=employee_id,user=request.user)
+            serializer = EmployeeWriteSerializer(instance=instance,data=request.data)
+            if not serializer.is_valid():
+                return self.respond(invalid_inputs(serializer.errors),status.HTTP_400_BAD_REQUEST)
+
+            await sync_to_async(update_employee)(serializer)
+            return self.respond(employee_update_success(),status.HTTP_200_OK)
+
+        except Employee.DoesNotExist:
+            return self.respond(employee_not_found(),status.HTTP_404_NOT_FOUND)
+
+        except TenantMoving:
+            return self.respond(employee_tenant_moving(),status.HTTP_503_SERVICE_UNAVAILABLE,tenant_moving_headers())
+
+        except Exception as e:
+            return self.respond(internal_server_error_response(e),status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncEmployeeDelete(AsyncEmployeeView):
+    query_budget = 6
+
+    async def delete(self,request):
+        try:
+            employee_id = request.GET.get('id')
+            employee = await Employee.objects.aget(id=employee_id,user=request.user)
+            await sync_to_async(delete_employee)(employee)
+            return self.respond(employee_delete_success(),status.HTTP_200_OK)
+
+        except Employee.DoesNotExist:
+            return self.respond(employee_not_found(),status.HTTP_404_NOT_FOUND)
+
+        except TenantMoving:
+            return self.respond(employee_tenant_moving(),status.HTTP_503_SERVICE_UNAVAILABLE,tenant_moving_headers())
+
+        except Exception as e:
+            return self.respond(internal_server_error_response(e),status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncEmployeeList(AsyncEmployeeView):
+    query_budget = 8
+
+    async def post(self,request):
+        try:
+            payload = EmployeeListSerializer(data=request.data)
+            if not payload.is_valid():
+                return self.respond(invalid_inputs(payload.errors),status.HTTP_400_BAD_REQUEST)
+
+            cache_key,cached = await sync_to_async(cached_employee_list)(request.user,request.data)
+            if cached is not None:
+                response = self.respond(cached,status.HTTP_200_OK)
+                response["X-Cache"] = "HIT"
+                return response
+
+            pagination_data = payload.validated_data.get("pagination")
+            include_count = payload.validated_data["include_count"]
+            employees,filtered,cursor_mode = employee_list_query(request.user,request.data)
+
+            employees_count = None
+            if include_count:
+                employees_count = await employees.acount() if filtered else await aget_employee_count(request.user)
+
+            fast_serialization = settings.EMPLOYEE_FAST_SERIALIZATION
+            if fast_serialization:
+                employees = employees.values(*EMPLOYEE_READ_FIELDS)
+
+            if cursor_mode:
+                paged_employees = await acursor_pagination_processing(pagination_data,employees)
+            else:
+                paged_employees = await apagination_processing(pagination_data,employees,count=employees_count)
+
+            if paged_employees["status"] == status.HTTP_200_OK:
+                if fast_serialization:
+                    row_data = serialize_employee_rows(paged_employees["data"])
+                else:
+                    row_data = EmployeeReadSerializer(paged_employees["data"],many=True).data
+                data = {"row_data":row_data,"count":employees_count}
+                if "next_cursor" in paged_employees:
+                    data["next_cursor"] = paged_employees["next_cursor"]
+                    data["prev_cursor"] = paged_employees["prev_cursor"]
+                response_data = employee_success_list(data)
+                if cache_key:
+                    await sync_to_async(get_result_cache().set)(cache_key,response_data)
+                response = self.respond(response_data,status.HTTP_200_OK)
+                response["X-Cache"] = "MISS" if cache_key else "BYPASS"
+                return response
+            return self.respond(paged_employees,paged_employees["status"])
+
+        except InvalidFiltration as e:
+            return self.respond(invalid_inputs(str(e)),status.HTTP_400_BAD_REQUEST)
+
+        except TenantMoving:
+            return self.respond(employee_tenant_moving(),status.HTTP_503_SERVICE_UNAVAILABLE,tenant_moving_headers())
+
+        except Exception as e:
+            return self.respond(internal_server_error_response(e),status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncSingleEmployeeOverview(AsyncEmployeeView):
+    query_budget = 2
+
+    async def get(self,request):
+        try:
+            employee_id = request.GET.get('id')
+            updated_at = await Employee.objects.filter(id=employee_id,user=request.user).values_list('updated_at',flat=True).afirst()
+            if updated_at is None:
+                raise Employee.DoesNotExist
+
+            etag,last_modified = employee_validators(employee_id,updated_at)
+            not_modified = get_conditional_response(request,etag=etag,last_modified=int(updated_at.timestamp()))
+            if not_modified is not None:
+                return self.with_validators(not_modified,etag,last_modified)
+
+            body = await sync_to_async(get_cached_detail)(employee_id,updated_at)
+            if body is None:
+                employee = await Employee.objects.aget(id=employee_id,user=request.user)
+                body = self.renderer.render(employee_detail_success(EmployeeReadSerializer(employee).data))
+                await sync_to_async(set_cached_detail)(employee_id,updated_at,body)
+
+            response = HttpResponse(body,content_type=self.renderer.media_type,status=status.HTTP_200_OK)
+            return self.with_validators(response,etag,last_modified)
+
+        except Employee.DoesNotExist:
+            return self.respond(employee_not_found(),status.HTTP_404_NOT_FOUND)
+
+        except Exception as e:
+            return self.respond(internal_server_error_response(e),status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def with_validators(self,response,etag,last_modified):
+        response["ETag"] = etag
+        response["Last-Modified"] = last_modified
+        response["Cache-Control"] = "private, no-cache"
+        return response
@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import http_date, quote_etag
+
+from utils.metrics import record_cache_lookup
+from utils.result_cache import get_result_cache
+from .sharding import employee_db
+
+
+def employee_version(updated_at):
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def employee_validators(employee_id,updated_at):
+    """
+    (ETag, Last-Modified) for one employee. Every write moves updated_at,
+    so the pair changes whenever the representation does.
+    """
+    return quote_etag(f"{employee_id}-{employee_version(updated_at)}"),http_date(updated_at.timestamp())
+
+
+def detail_cache_key(employee_id,updated_at):
+    return f"employee-detail:{employee_id}:{employee_version(updated_at)}"
+
+
+def get_cached_detail(employee_id,updated_at):
+    body = cache.get(detail_cache_key(employee_id,updated_at))
+    record_cache_lookup("employee_detail",body is not None)
+    return body
+
+
+def set_cached_detail(employee_id,updated_at,body):
+    # Old versions are never read again and simply expire
+    cache.set(detail_cache_key(employee_id,updated_at),body,settings.EMPLOYEE_DETAIL_CACHE_TIMEOUT)
+
+
+def employee_list_scope(user):
+    return f"employee-list:{getattr(user,'pk',user)}"
+
+
+def employee_list_fingerprint(payload):
+    """
+    Stable digest of the parts of an EmployeeList payload that shape the
+    response, with defaults filled in so equivalent requests share an entry.
+    """
+    filtration_data = {
+        key:value for key,value in (payload.get("filtration_data") or {}).items() if value not in ("",None)
+    }
+    pagination = {"page":1,"row_count":30,**(payload.get("pagination") or {})}
+    normalized = {
+        "filtration_data":filtration_data,
+        "pagination":pagination,
+        "include_count":bool(payload.get("include_count",True)),
+        "ordering":payload.get("ordering") or None,
+    }
+    encoded = json.dumps(normalized,sort_keys=True,separators=(",",":"),default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def employee_list_cache_key(user,payload):
+    return get_result_cache().key(employee_list_scope(user),employee_list_fingerprint(payload))
+
+
+def invalidate_employee_lists(user):
+    """
+    Retire every cached list page of `user`. Deferred to the commit of its
+    shard so a reader can't cache pre-commit rows under the new version.
+    """
+    scope = employee_list_scope(user)
+    transaction.on_commit(lambda: get_result_cache().invalidate(scope),using=employee_db(user))
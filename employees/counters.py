@@ -0,0 +1,38 @@
+from django.db.models import F
+
+from .models import Employee, EmployeeCount
+
+
+def adjust_employee_count(user,delta):
+    """
+    Apply a create/delete delta to the user's denormalized employee count.
+    Call it inside the same transaction as the write it accounts for.
+    """
+    if not delta:
+        return
+    user_id = getattr(user,"pk",user)
+    updated = EmployeeCount.objects.filter(user_id=user_id).update(count=F('count') + delta)
+    if not updated:
+        # First write for this user: seed from the table, which already includes this write
+        EmployeeCount.objects.get_or_create(
+            user_id=user_id,
+            defaults={"count":Employee.objects.filter(user_id=user_id).count()}
+        )
+
+
+def get_employee_count(user):
+    user_id = getattr(user,"pk",user)
+    counter = EmployeeCount.objects.filter(user_id=user_id).values_list('count',flat=True).first()
+    if counter is None:
+        counter = Employee.objects.filter(user_id=user_id).count()
+        EmployeeCount.objects.get_or_create(user_id=user_id,defaults={"count":counter})
+    return counter
+
+
+async def aget_employee_count(user):
+    user_id = getattr(user,"pk",user)
+    counter = await EmployeeCount.objects.filter(user_id=user_id).values_list('count',flat=True).afirst()
+    if counter is None:
+        counter = await Employee.objects.filter(user_id=user_id).acount()
+        await EmployeeCount.objects.aget_or_create(user_id=user_id,defaults={"count":counter})
+    return counter
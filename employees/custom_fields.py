@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import connections
+
+from utils import validate_json_key
+from .models import CustomFieldIndex
+from .sharding import employee_db
+
+
+INDEX_PREFIX,INDEX_SUFFIX = "employee_cf_","_idx"
+
+
+def custom_field_index_name(key):
+    return f"{INDEX_PREFIX}{validate_json_key(key)}{INDEX_SUFFIX}"
+
+
+def existing_custom_field_indexes(using="default"):
+    """Keys of the custom field indexes present on the `using` shard."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return set()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'employees_employee' "
+            "AND name LIKE %s",[f"{INDEX_PREFIX}%{INDEX_SUFFIX}"]
+        )
+        return {name[len(INDEX_PREFIX):-len(INDEX_SUFFIX)] for name, in cursor.fetchall()}
+
+
+def create_custom_field_index(key,using="default"):
+    """
+    Index (user_id, custom_fields->key, created_at, id). The expression is the
+    one JSONKeyValue emits, so tenant-scoped filters and orderings on the key
+    are answered from the index instead of parsing JSON row by row.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {custom_field_index_name(key)} ON employees_employee "
+            f"(user_id, JSON_EXTRACT(custom_fields, '$.\"{key}\"'), created_at, id)"
+        )
+
+
+def drop_custom_field_index(key,using="default"):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {custom_field_index_name(key)}")
+
+
+def declare_hot_key(user,key):
+    """
+    Record the declaration only. Building an index scans and locks the shared
+    table, so sync_custom_field_indexes does it outside requests.
+    """
+    validate_json_key(key)
+    return CustomFieldIndex.objects.get_or_create(user=user,key=key)
+
+
+def withdraw_hot_key(user,key):
+    deleted,_ = CustomFieldIndex.objects.filter(user=user,key=key).delete()
+    return deleted
+
+
+def hot_key_limit_reached(user):
+    return CustomFieldIndex.objects.filter(user=user).count() >= settings.CUSTOM_FIELD_INDEX_LIMIT
+
+
+def hot_key_total_limit_reached(user,key):
+    # Indexes are shared by every tenant of a shard, so the cap is per shard
+    declared = CustomFieldIndex.objects.using(employee_db(user)).values_list('key',flat=True).distinct()
+    keys = set(declared)
+    return key not in keys and len(keys) >= settings.CUSTOM_FIELD_INDEX_TOTAL_LIMIT
+
+
+def sync_custom_field_indexes(using="default"):
+    """
+    Create the index of every key declared on the `using` shard and drop the
+    ones no tenant declares anymore. Returns (declared keys, dropped keys).
+    """
+    keys = sorted(set(CustomFieldIndex.objects.using(using).values_list('key',flat=True)))
+    for key in keys:
+        create_custom_field_index(key,using=using)
+    dropped = sorted(existing_custom_field_indexes(using) - set(keys))
+    for key in dropped:
+        drop_custom_field_index(key,using=using)
+    return keys,dropped
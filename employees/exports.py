@@ -0,0 +1,82 @@
+import csv
+import json
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+EXPORT_COLUMNS = ['id','name','email','position','created_at','updated_at']
+CUSTOM_FIELD_PREFIX = "custom_fields."
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_value(value):
+    if value is None:
+        return ""
+    if hasattr(value,"tzinfo"):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value,str):
+        return value
+    if isinstance(value,(dict,list,bool)):
+        return json.dumps(value)
+    return str(value)
+
+
+def custom_field_keys(queryset):
+    """
+    Distinct top-level custom_fields keys of the selected employees, used as
+    CSV columns. SQLite collects them with json_each without loading rows.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "sqlite":
+        keys = set()
+        for custom_fields in queryset.values_list('custom_fields',flat=True).iterator(chunk_size=settings.EMPLOYEE_EXPORT_CHUNK_SIZE):
+            if isinstance(custom_fields,dict):
+                keys.update(custom_fields)
+        return sorted(keys)
+
+    sql,params = queryset.order_by().values('custom_fields').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT fields.key FROM ({sql}) AS employees, json_each(employees.custom_fields) AS fields "
+            f"WHERE json_type(employees.custom_fields) = 'object' ORDER BY fields.key",
+            params
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def export_rows(queryset):
+    return queryset.values_list(*EXPORT_COLUMNS,'custom_fields').iterator(
+        chunk_size=settings.EMPLOYEE_EXPORT_CHUNK_SIZE
+    )
+
+
+def stream_csv(queryset):
+    keys = custom_field_keys(queryset)
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS + [f"{CUSTOM_FIELD_PREFIX}{key}" for key in keys])
+    for *row,custom_fields in export_rows(queryset):
+        if not isinstance(custom_fields,dict):
+            custom_fields = {}
+        yield writer.writerow(
+            [export_value(value) for value in row] + [export_value(custom_fields.get(key)) for key in keys]
+        )
+
+
+def stream_ndjson(queryset):
+    for *row,custom_fields in export_rows(queryset):
+        record = {column:export_value(value) for column,value in zip(EXPORT_COLUMNS,row)}
+        record["custom_fields"] = custom_fields
+        yield json.dumps(record) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv":(stream_csv,"text/csv"),
+    "ndjson":(stream_ndjson,"application/x-ndjson"),
+}
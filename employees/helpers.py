@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import status
 
 from utils import custom_response
@@ -40,3 +41,116 @@ def employee_detail_success(data):
         status=status.HTTP_200_OK,
         data=data
     )
+
+def custom_field_index_list(data):
+    return custom_response(
+        message="Indexed Custom Fields",
+        status=status.HTTP_200_OK,
+        data=data
+    )
+
+def custom_field_index_created(data):
+    return custom_response(
+        message="Custom Field Key Declared, Indexed On The Next Sync",
+        status=status.HTTP_201_CREATED,
+        data=data
+    )
+
+def custom_field_index_deleted():
+    return custom_response(
+        message="Custom Field Index Removed",
+        status=status.HTTP_200_OK
+    )
+
+def custom_field_index_not_found():
+    return custom_response(
+        message="Custom Field Index Not Found",
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+def custom_field_index_limit_reached():
+    return custom_response(
+        message="Custom Field Index Limit Reached",
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+def custom_field_index_total_limit_reached():
+    return custom_response(
+        message="No More Custom Field Keys Can Be Indexed",
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+def employee_bulk_create_success(data):
+    return custom_response(
+        message="Employees Created Successfully",
+        status=status.HTTP_200_OK,
+        data=data
+    )
+
+def employee_bulk_limit_exceeded(limit):
+    return custom_response(
+        message=f"A single request may contain at most {limit} employees",
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+def employee_bulk_update_success(data):
+    return custom_response(
+        message="Employees Updated Successfully",
+        status=status.HTTP_200_OK,
+        data=data
+    )
+
+def employee_bulk_delete_success(data):
+    return custom_response(
+        message="Employees Deleted Successfully",
+        status=status.HTTP_200_OK,
+        data=data
+    )
+
+def employee_import_success(data):
+    return custom_response(
+        message="Employee Import Finished",
+        status=status.HTTP_200_OK,
+        data=data
+    )
+
+def employee_import_status(data):
+    return custom_response(
+        message="Employee Import Status",
+        status=status.HTTP_200_OK,
+        data=data
+    )
+
+def employee_import_not_found():
+    return custom_response(
+        message="Employee Import Not Found",
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+def employee_import_unknown_format():
+    return custom_response(
+        message="Could not detect the file format, send format as csv or ndjson",
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+def employee_import_already_completed():
+    return custom_response(
+        message="Employee Import Already Completed",
+        status=status.HTTP_409_CONFLICT
+    )
+
+def employee_import_in_progress():
+    return custom_response(
+        message="Employee Import Already Running",
+        status=status.HTTP_409_CONFLICT
+    )
+
+def employee_tenant_moving():
+    return custom_response(
+        message="Employees Are Being Moved To Another Database, Retry Shortly",
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+def tenant_moving_headers():
+    # Writes resume once the move's grace period has passed
+    return {"Retry-After":str(settings.EMPLOYEE_SHARD_CACHE_TIMEOUT)}
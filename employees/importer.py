@@ -0,0 +1,172 @@
+import csv
+import io
+import itertools
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import invalidate_employee_lists
+from .counters import adjust_employee_count
+from .exports import CUSTOM_FIELD_PREFIX
+from .models import Employee, EmployeeImport
+from .serializers import validate_employee_records
+from .sharding import tenant_atomic, tenant_context
+
+IMPORT_FORMATS = ("csv","ndjson")
+
+
+def detect_format(file_name,default=None):
+    extension = os.path.splitext(file_name or "")[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson",".jsonl"):
+        return "ndjson"
+    return default
+
+
+def csv_records(stream):
+    """
+    Yield (record, parse_error) per CSV row. custom_fields come either from a
+    JSON `custom_fields` column or from flattened custom_fields.<key> columns,
+    the layout /employees/export/ writes.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream,encoding="utf-8-sig",newline=""))
+    for row in reader:
+        record = {"custom_fields":{}}
+        try:
+            for column,value in row.items():
+                if column is None:
+                    raise ValueError("Row has more cells than the header")
+                if column.startswith(CUSTOM_FIELD_PREFIX):
+                    if value not in (None,""):
+                        record["custom_fields"][column[len(CUSTOM_FIELD_PREFIX):]] = value
+                elif column == "custom_fields":
+                    if value not in (None,""):
+                        record["custom_fields"] = json.loads(value)
+                else:
+                    record[column] = value
+        except ValueError as e:
+            yield row,str(e)
+            continue
+        yield record,None
+
+
+def ndjson_records(stream):
+    for line in io.TextIOWrapper(stream,encoding="utf-8-sig"):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line),None
+        except ValueError as e:
+            yield line.rstrip("\n"),f"Invalid JSON: {e}"
+
+
+def claim_import(job):
+    """
+    Atomically mark a failed import, or a running one that has not committed a
+    chunk for EMPLOYEE_IMPORT_STALE_AFTER seconds, as running for the caller.
+    Returns False when the import completed or another run is still at it, so
+    two resumes never import the same chunks.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.EMPLOYEE_IMPORT_STALE_AFTER)
+    with tenant_context(job.user_id):
+        claimed = EmployeeImport.objects.filter(
+            Q(status=EmployeeImport.FAILED) | Q(status=EmployeeImport.RUNNING,updated_at__lt=stale),
+            id=job.id
+        ).update(status=EmployeeImport.RUNNING,error="",updated_at=timezone.now())
+        job.refresh_from_db()
+    return bool(claimed)
+
+
+def error_file_path(job):
+    return os.path.join(settings.EMPLOYEE_IMPORT_DIR,f"{job.id}.errors.ndjson")
+
+
+class EmployeeImporter:
+    """
+    Streams records from a binary file object into the job's user's employees.
+
+    Rows are parsed one at a time and committed in chunks of job.chunk_size;
+    each chunk's rows, counters and job progress share one transaction, so an
+    interrupted import resumes after the last committed chunk. Rejected rows
+    are appended to an NDJSON error file whose committed length is tracked on
+    the job, letting a resume discard errors from an uncommitted chunk.
+    """
+
+    def __init__(self,job,stream,on_chunk=None):
+        self.job = job
+        self.stream = stream
+        self.on_chunk = on_chunk
+
+    def records(self):
+        parse = csv_records if self.job.format == "csv" else ndjson_records
+        # Row numbers are 1-based positions among data rows
+        numbered = enumerate(parse(self.stream),start=1)
+        return itertools.islice(numbered,self.job.rows_processed,None)
+
+    def run(self):
+        # Route to the job's shard also when not serving a request
+        with tenant_context(self.job.user_id):
+            return self.import_records()
+
+    def import_records(self):
+        job = self.job
+        os.makedirs(settings.EMPLOYEE_IMPORT_DIR,exist_ok=True)
+        with open(error_file_path(job),"ab") as errors:
+            errors.truncate(job.error_file_size)
+            errors.seek(job.error_file_size)
+            try:
+                chunk = []
+                for item in self.records():
+                    chunk.append(item)
+                    if len(chunk) >= job.chunk_size:
+                        self.commit(chunk,errors)
+                        chunk = []
+                if chunk:
+                    self.commit(chunk,errors)
+            except Exception as e:
+                job.status = EmployeeImport.FAILED
+                job.error = str(e)
+                job.save(update_fields=['status','error','updated_at'])
+                raise
+        job.status = EmployeeImport.COMPLETED
+        job.error = ""
+        job.save(update_fields=['status','error','updated_at'])
+        return job
+
+    def commit(self,chunk,errors):
+        job = self.job
+        parsed = [(row,record) for row,(record,parse_error) in chunk if parse_error is None]
+        rejected = [
+            {"row":row,"record":record,"errors":parse_error}
+            for row,(record,parse_error) in chunk if parse_error is not None
+        ]
+        valid,invalid = validate_employee_records([record for _,record in parsed])
+        for index,detail in invalid.items():
+            row,record = parsed[index]
+            rejected.append({"row":row,"record":record,"errors":detail})
+
+        for entry in sorted(rejected,key=lambda entry: entry["row"]):
+            errors.write(json.dumps(entry,default=str).encode() + b"\n")
+        errors.flush()
+
+        employees = [Employee(user_id=job.user_id,**data) for _,data in valid]
+        with tenant_atomic(job.user_id):
+            Employee.objects.bulk_create(employees,batch_size=settings.EMPLOYEE_BULK_BATCH_SIZE)
+            adjust_employee_count(job.user_id,len(employees))
+            invalidate_employee_lists(job.user_id)
+            job.rows_processed += len(chunk)
+            job.rows_created += len(employees)
+            job.rows_rejected += len(rejected)
+            job.chunks_committed += 1
+            job.error_file_size = errors.tell()
+            job.save(update_fields=[
+                'rows_processed','rows_created','rows_rejected',
+                'chunks_committed','error_file_size','updated_at'
+            ])
+        if self.on_chunk:
+            self.on_chunk(job)
@@ -0,0 +1,162 @@
+import asyncio
+import io
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import CustomUser
+from employees.models import Employee
+
+LIST_PAYLOAD = {"pagination":{"page":1,"row_count":30},"include_count":True}
+
+
+class SlowInput:
+    """wsgi.input that trickles the body in like a slow client, blocking the reading thread."""
+
+    def __init__(self,body,chunks,delay):
+        self.body = io.BytesIO(body)
+        self.chunk_size = max(1,-(-len(body) // chunks))
+        self.delay = delay
+
+    def read(self,size=-1):
+        # Like a server's input stream, block until `size` bytes (or the end) arrived
+        data = b""
+        while size < 0 or len(data) < size:
+            time.sleep(self.delay)
+            wanted = self.chunk_size if size < 0 else min(self.chunk_size,size - len(data))
+            chunk = self.body.read(wanted)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def readline(self,size=-1):
+        return self.body.readline(size)
+
+
+class Command(BaseCommand):
+    help = (
+        'In-process load test of the employee list: WSGI with a fixed thread pool against one ASGI '
+        'event loop, for the sync and async views, with clients that send their body slowly'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--client-delay', type=float, default=50.0, help='ms between body chunks')
+        parser.add_argument('--chunks', type=int, default=4)
+        parser.add_argument('--rows', type=int, default=200)
+
+    def handle(self, *args, **options):
+        self.options = options
+        stamp = time.time_ns()
+        user = CustomUser.objects.create_user(f"loadtest-{stamp}",f"loadtest{stamp}@example.com",None,"loadtest")
+        try:
+            Employee.objects.bulk_create(
+                Employee(name=f"Employee {index}",email=f"employee{index}@example.com",position="Engineer",
+                         custom_fields={"department":"R&D","level":index % 7},user=user)
+                for index in range(options['rows'])
+            )
+            self.token = str(RefreshToken.for_user(user).access_token)
+            self.body = json.dumps(LIST_PAYLOAD).encode()
+
+            self.stdout.write(
+                f"{options['requests']} requests, {options['concurrency']} concurrent clients, "
+                f"{options['chunks']} body chunks {options['client_delay']:.0f} ms apart"
+            )
+            self.report("WSGI, sync view",self.run_wsgi("/employees/list/"))
+            self.report("ASGI, sync view",asyncio.run(self.run_asgi("/employees/list/")))
+            self.report("ASGI, async view",asyncio.run(self.run_asgi("/employees/async/list/")))
+        finally:
+            user.delete()
+
+    def run_wsgi(self, path):
+        application = get_wsgi_application()
+        delay = self.options['client_delay'] / 1000
+
+        def call(queued):
+            environ = {
+                "REQUEST_METHOD":"POST","PATH_INFO":path,"SERVER_NAME":"localhost","SERVER_PORT":"80",
+                "wsgi.url_scheme":"http","wsgi.input":SlowInput(self.body,self.options['chunks'],delay),
+                "wsgi.errors":sys.stderr,"CONTENT_TYPE":"application/json","CONTENT_LENGTH":str(len(self.body)),
+                "HTTP_AUTHORIZATION":f"Bearer {self.token}",
+            }
+            statuses = []
+            b"".join(application(environ,lambda status,headers: statuses.append(status)))
+            return statuses[0].startswith("200"),time.perf_counter() - queued
+
+        # Clients beyond the thread pool wait in the queue like they would on a saturated
+        # worker; latency counts from when a client got its turn among `concurrency`
+        started = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(self.options['threads']) as executor:
+            pending = []
+            for index in range(self.options['requests']):
+                if len(pending) >= self.options['concurrency']:
+                    results.append(pending.pop(0).result())
+                pending.append(executor.submit(call,time.perf_counter()))
+            results.extend(future.result() for future in pending)
+        return results,time.perf_counter() - started
+
+    async def run_asgi(self, path):
+        application = get_asgi_application()
+        delay = self.options['client_delay'] / 1000
+        chunks = self.options['chunks']
+        size = max(1,-(-len(self.body) // chunks))
+        semaphore = asyncio.Semaphore(self.options['concurrency'])
+
+        async def call():
+            async with semaphore:
+                parts = [self.body[index:index + size] for index in range(0,len(self.body),size)]
+                messages = [
+                    {"type":"http.request","body":part,"more_body":index < len(parts) - 1}
+                    for index,part in enumerate(parts)
+                ]
+                status_codes = []
+
+                async def receive():
+                    if messages:
+                        await asyncio.sleep(delay)
+                        return messages.pop(0)
+                    # Body fully sent: park until the server is done with the request
+                    await asyncio.Event().wait()
+
+                async def send(message):
+                    if message["type"] == "http.response.start":
+                        status_codes.append(message["status"])
+
+                scope = {
+                    "type":"http","asgi":{"version":"3.0"},"http_version":"1.1","method":"POST","scheme":"http",
+                    "path":path,"raw_path":path.encode(),"query_string":b"","root_path":"",
+                    "server":("localhost",80),"client":("127.0.0.1",0),
+                    "headers":[
+                        (b"host",b"localhost"),(b"content-type",b"application/json"),
+                        (b"content-length",str(len(self.body)).encode()),
+                        (b"authorization",f"Bearer {self.token}".encode()),
+                    ],
+                }
+                started = time.perf_counter()
+                await application(scope,receive,send)
+                return status_codes == [200],time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call() for _ in range(self.options['requests'])))
+        return results,time.perf_counter() - started
+
+    def report(self, title, outcome):
+        results,elapsed = outcome
+        latencies = sorted(latency for _,latency in results)
+        failures = sum(1 for ok,_ in results if not ok)
+        p95 = latencies[min(len(latencies) - 1,int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"{title:<18} {len(results) / elapsed:8.1f} req/s  p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p95 {p95 * 1000:7.1f} ms  failures {failures}"
+        )
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import CustomUser
+from employees.models import Employee
+from employees.serializers import EMPLOYEE_READ_FIELDS, EmployeeReadSerializer, serialize_employee_rows
+
+
+class Command(BaseCommand):
+    help = 'Compare EmployeeReadSerializer with the values() fast path on one list page (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(f"bench-{time.time_ns()}", f"bench{time.time_ns()}@example.com", None, "bench")
+            Employee.objects.bulk_create(
+                Employee(
+                    name=f"Employee {index}",
+                    email=f"employee{index}@example.com",
+                    position="Engineer",
+                    custom_fields={"department": "R&D", "level": index % 7, "skills": ["python", "sql"]},
+                    user=user,
+                )
+                for index in range(rows)
+            )
+            page = Employee.objects.filter(user=user).order_by('-created_at', '-id')
+
+            def serializer_path():
+                return renderer.render(EmployeeReadSerializer(list(page), many=True).data)
+
+            def fast_path():
+                return renderer.render(serialize_employee_rows(page.values(*EMPLOYEE_READ_FIELDS)))
+
+            if serializer_path() != fast_path():
+                transaction.set_rollback(True)
+                self.stderr.write(self.style.ERROR("Outputs differ"))
+                return
+
+            results = {name: self.measure(path, repeat) for name, path in (("serializer", serializer_path), ("values fast path", fast_path))}
+            transaction.set_rollback(True)
+
+        baseline = results["serializer"]
+        for name, seconds in results.items():
+            self.stdout.write(
+                f"{name:<18} {seconds * 1000:8.2f} ms/page  {rows / seconds:10.0f} rows/s  x{baseline / seconds:.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS("Outputs are byte-for-byte identical"))
+
+    def measure(self, path, repeat):
+        path()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            path()
+        return (time.perf_counter() - started) / repeat
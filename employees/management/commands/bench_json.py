@@ -0,0 +1,108 @@
+import gc
+import io
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from employees.helpers import employee_success_list
+from utils.json_renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def employee_page(rows):
+    now = timezone.now()
+    return employee_success_list({
+        "data":[
+            {
+                "id":uuid.uuid4(),
+                "name":f"Employee {index}",
+                "email":f"employee{index}@example.com",
+                "position":"Senior Engineer",
+                "custom_fields":{
+                    "department":"R&D",
+                    "level":index % 7,
+                    "salary":Decimal("5400.50"),
+                    "skills":["python","sql","django"],
+                    "address":{"city":"Kochi","zip":"682001"},
+                },
+                "created_at":now - timedelta(minutes=index),
+                "updated_at":now,
+            }
+            for index in range(rows)
+        ],
+        "total_count":rows,
+        "current_page":1,
+        "total_pages":1,
+    })
+
+
+def bulk_create_body(rows):
+    return JSONRenderer().render({
+        "employees":[
+            {
+                "name":f"Employee {index}",
+                "email":f"employee{index}@example.com",
+                "position":"Engineer",
+                "custom_fields":{"department":"R&D","level":index % 7,"remote":index % 2 == 0},
+            }
+            for index in range(rows)
+        ],
+    })
+
+
+class Command(BaseCommand):
+    help = 'Compare the stdlib and orjson renderer/parser on employee list pages and bulk payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if orjson is None:
+            self.stderr.write(self.style.WARNING("orjson is not installed; both paths use the stdlib"))
+
+        page = employee_page(rows)
+        body = bulk_create_body(rows)
+
+        rendered = JSONRenderer().render(page), FastJSONRenderer().render(page)
+        parsed = JSONParser().parse(io.BytesIO(body)), FastJSONParser().parse(io.BytesIO(body))
+        if rendered[0] != rendered[1] or parsed[0] != parsed[1]:
+            self.stderr.write(self.style.ERROR("Outputs differ"))
+            return
+
+        self.report(f"render {rows}-row page", repeat, (
+            ("stdlib", lambda: JSONRenderer().render(page)),
+            ("orjson", lambda: FastJSONRenderer().render(page)),
+        ))
+        self.report(f"parse {rows}-row bulk body", repeat, (
+            ("stdlib", lambda: JSONParser().parse(io.BytesIO(body))),
+            ("orjson", lambda: FastJSONParser().parse(io.BytesIO(body))),
+        ))
+        self.stdout.write(self.style.SUCCESS("Rendered bytes and parsed data are identical"))
+
+    def report(self, title, repeat, paths):
+        self.stdout.write(title)
+        baseline = None
+        for name, path in paths:
+            seconds = self.measure(path, repeat)
+            baseline = baseline or seconds
+            self.stdout.write(f"  {name:<8} {seconds * 1000:8.2f} ms  x{baseline / seconds:.2f}")
+
+    def measure(self, path, repeat):
+        path()
+        # Like timeit: keep collections triggered by the previous path out of the timing
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                path()
+            return (time.perf_counter() - started) / repeat
+        finally:
+            gc.enable()
@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from employee_management.database import SQLITE_PROFILES, sqlite_database
+
+ALIAS = "sqlite_bench"
+
+
+def use_database(settings_dict):
+    if ALIAS in connections.settings:
+        connections[ALIAS].close()
+        del connections[ALIAS]
+    configured = connections.configure_settings({"default": connections.settings["default"], ALIAS: settings_dict})
+    connections.settings[ALIAS] = configured[ALIAS]
+
+
+def worker(settings_dict, seconds, write_ratio, seed, results):
+    # Runs in a forked process, like one gunicorn worker serving requests
+    use_database(settings_dict)
+    connection = connections[ALIAS]
+    rng = random.Random(seed)
+    latencies, writes, reads, errors = [], 0, 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                # Read-then-write in one transaction, like a request that checks and saves
+                with transaction.atomic(using=ALIAS):
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM bench WHERE worker = %s", [seed])
+                        cursor.fetchone()
+                        cursor.execute("INSERT INTO bench (worker, payload) VALUES (%s, %s)", [seed, "x" * 200])
+                writes += 1
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT id, payload FROM bench ORDER BY id DESC LIMIT 30")
+                    cursor.fetchall()
+                reads += 1
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            errors += 1
+        # Per-request connection handling: closes unless CONN_MAX_AGE keeps it
+        connection.close_if_unusable_or_obsolete()
+    connection.close()
+    results.put((reads, writes, errors, latencies))
+
+
+class Command(BaseCommand):
+    help = 'Concurrent read/write stress test of each SQLite profile on a scratch database file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--profile', action='append', choices=sorted(SQLITE_PROFILES))
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context("fork")
+        for profile in options['profile'] or list(SQLITE_PROFILES):
+            with tempfile.TemporaryDirectory() as directory:
+                settings_dict = sqlite_database(os.path.join(directory, "bench.sqlite3"), profile=profile)
+                use_database(settings_dict)
+                with connections[ALIAS].cursor() as cursor:
+                    cursor.execute(
+                        "CREATE TABLE bench (id INTEGER PRIMARY KEY AUTOINCREMENT, worker INTEGER, payload TEXT)"
+                    )
+                connections[ALIAS].close()
+
+                results = context.Queue()
+                processes = [
+                    context.Process(
+                        target=worker,
+                        args=(settings_dict, options['seconds'], options['write_ratio'], seed, results),
+                    )
+                    for seed in range(options['workers'])
+                ]
+                for process in processes:
+                    process.start()
+                outcomes = [results.get() for _ in processes]
+                for process in processes:
+                    process.join()
+            self.report(profile, outcomes, options['seconds'])
+
+    def report(self, profile, outcomes, seconds):
+        reads = sum(outcome[0] for outcome in outcomes)
+        writes = sum(outcome[1] for outcome in outcomes)
+        errors = sum(outcome[2] for outcome in outcomes)
+        latencies = sorted(latency for outcome in outcomes for latency in outcome[3])
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0
+        self.stdout.write(
+            f"{profile:<12} reads {reads / seconds:8.0f}/s  writes {writes / seconds:7.0f}/s  "
+            f"'database is locked' {errors:5d}  p50 {statistics.median(latencies or [0]) * 1000:6.2f} ms  "
+            f"p99 {p99 * 1000:7.2f} ms"
+        )
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from employees.importer import IMPORT_FORMATS, EmployeeImporter, claim_import, detect_format, error_file_path
+from employees.models import EmployeeImport
+from employees.sharding import tenant_context
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or NDJSON file into a user\'s employees, committing in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', help='Username that will own the employees')
+        parser.add_argument('--format', choices=IMPORT_FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=settings.EMPLOYEE_IMPORT_CHUNK_SIZE)
+        parser.add_argument('--resume', metavar='IMPORT_ID', help='Continue an interrupted import of the same file')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                job = self.find_import(options['resume'])
+            except (EmployeeImport.DoesNotExist, ValidationError, ValueError):
+                raise CommandError(f"Import {options['resume']} not found")
+            if not claim_import(job):
+                if job.status == EmployeeImport.COMPLETED:
+                    raise CommandError(f"Import {job.id} already completed")
+                raise CommandError(f"Import {job.id} is still running (last progress at {job.updated_at})")
+        else:
+            try:
+                user = CustomUser.objects.get(username=options['user'])
+            except CustomUser.DoesNotExist:
+                raise CommandError("--user must name an existing user")
+            import_format = options['format'] or detect_format(options['path'])
+            if import_format is None:
+                raise CommandError("Could not detect the file format, pass --format")
+            with tenant_context(user):
+                job = EmployeeImport.objects.create(
+                    user=user,
+                    source_name=options['path'],
+                    format=import_format,
+                    chunk_size=options['chunk_size']
+                )
+
+        self.stdout.write(f"Import {job.id}: resuming after row {job.rows_processed}")
+        with open(options['path'], 'rb') as stream:
+            EmployeeImporter(job, stream, on_chunk=self.report).run()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import {job.id} completed: {job.rows_created} created, {job.rows_rejected} rejected"
+        ))
+        if job.rows_rejected:
+            self.stdout.write(f"Rejected rows: {error_file_path(job)}")
+
+    def find_import(self, import_id):
+        # Imports live on their tenant's shard: find the owner on any of them,
+        # then load the job where the owner's requests would
+        for alias in settings.EMPLOYEE_SHARD_ALIASES:
+            user_id = EmployeeImport.objects.using(alias).filter(id=import_id).values_list('user_id', flat=True).first()
+            if user_id is not None:
+                with tenant_context(user_id):
+                    return EmployeeImport.objects.get(id=import_id)
+        raise EmployeeImport.DoesNotExist
+
+    def report(self, job):
+        self.stdout.write(
+            f"chunk {job.chunks_committed}: {job.rows_processed} rows processed, "
+            f"{job.rows_created} created, {job.rows_rejected} rejected"
+        )
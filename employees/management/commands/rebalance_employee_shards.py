@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from employees.custom_fields import create_custom_field_index
+from employees.models import CustomFieldIndex, Employee, EmployeeCount, EmployeeImport, TenantShard
+from employees.sharding import copy_employees, copy_rows, hash_shard, purge_tenant, set_placement, tenant_rows
+
+DELETE_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Move tenants between employee shards while they keep working: one tenant with --user and --to, '
+        'or every tenant whose hashed shard differs from its current one with --rebalance'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Id of the tenant to move')
+        parser.add_argument('--to', help='Shard alias to move --user to')
+        parser.add_argument('--rebalance', action='store_true')
+        parser.add_argument('--dry-run', action='store_true', help='Only print the planned moves')
+        parser.add_argument('--grace', type=float,
+                            help='Seconds to wait for cached placements to expire (default: EMPLOYEE_SHARD_CACHE_TIMEOUT)')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        aliases = settings.EMPLOYEE_SHARD_ALIASES
+        if options['rebalance'] == bool(options['user']):
+            raise CommandError("Pass either --user with --to, or --rebalance")
+        placements = dict(TenantShard.objects.using(DEFAULT_DB_ALIAS).values_list('user_id', 'database'))
+
+        if options['user']:
+            if options['to'] not in aliases:
+                raise CommandError(f"--to must be one of {', '.join(aliases)}")
+            try:
+                user_id = CustomUser.objects.using(DEFAULT_DB_ALIAS).values_list('pk', flat=True).get(pk=options['user'])
+            except (CustomUser.DoesNotExist, ValidationError):
+                raise CommandError(f"Unknown user {options['user']}")
+            targets = [(user_id, options['to'])]
+        else:
+            users = CustomUser.objects.using(DEFAULT_DB_ALIAS).values_list('pk', flat=True)
+            targets = [(user_id, hash_shard(user_id)) for user_id in users.iterator()]
+
+        moves = [
+            (user_id, placements.get(user_id, DEFAULT_DB_ALIAS), target)
+            for user_id, target in targets if placements.get(user_id, DEFAULT_DB_ALIAS) != target
+        ]
+        grace = settings.EMPLOYEE_SHARD_CACHE_TIMEOUT if options['grace'] is None else options['grace']
+        for user_id, source, target in moves:
+            self.stdout.write(f"{user_id}: {source} -> {target}")
+            if not options['dry_run']:
+                self.move(user_id, source, target, grace, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(moves)} tenant(s) {'to move' if options['dry_run'] else 'moved'}"
+        ))
+
+    def move(self, user_id, source, target, grace, chunk_size):
+        # 1. Copy the bulk of the employees while the tenant keeps reading and writing
+        started = timezone.now()
+        copied = copy_employees(user_id, source, target, chunk_size)
+
+        # 2. Refuse the tenant's writes, then wait out cached placements and in-flight writes
+        set_placement(user_id, source, moving=True)
+        time.sleep(grace)
+
+        # 3. Catch up: rows changed since the copy started, deletions, and the small tables
+        try:
+            with transaction.atomic(using=target):
+                caught_up = copy_employees(user_id, source, target, chunk_size, since=started)
+                kept = set(Employee._base_manager.using(source).filter(user_id=user_id).values_list('pk', flat=True))
+                stale = [
+                    pk for pk in Employee._base_manager.using(target).filter(user_id=user_id).values_list('pk', flat=True)
+                    if pk not in kept
+                ]
+                for index in range(0, len(stale), DELETE_BATCH_SIZE):
+                    Employee._base_manager.using(target).filter(pk__in=stale[index:index + DELETE_BATCH_SIZE]).delete()
+                for model in (EmployeeCount, CustomFieldIndex, EmployeeImport):
+                    model._base_manager.using(target).filter(user_id=user_id).delete()
+                    copy_rows(model, target, list(tenant_rows(model, source, user_id)))
+                keys = set(CustomFieldIndex._base_manager.using(target).filter(user_id=user_id).values_list('key', flat=True))
+            for key in keys:
+                create_custom_field_index(key, using=target)
+        except Exception:
+            set_placement(user_id, source, moving=False)
+            raise
+
+        # 4. Switch the tenant over; readers still holding the old placement finish on the source
+        set_placement(user_id, target, moving=False)
+        time.sleep(grace)
+
+        # 5. Drop the source copy
+        purge_tenant(user_id, source)
+        self.stdout.write(f"  copied {copied} employees, caught up {caught_up}, removed {len(stale)}")
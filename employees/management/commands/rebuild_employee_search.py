@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from employees.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the employee full-text search table, its triggers and its contents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with transaction.atomic(using=options['database']):
+            install_search_index(connection)
+        self.stdout.write(self.style.SUCCESS("Employee search index rebuilt"))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employees.custom_fields import sync_custom_field_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the expression indexes for every custom field key a tenant declared as hot and drop '
+        'the ones no longer declared; run after deploys and periodically'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', help='Shard to index (default: every employee shard)')
+
+    def handle(self, *args, **options):
+        for database in [options['database']] if options['database'] else settings.EMPLOYEE_SHARD_ALIASES:
+            keys, dropped = sync_custom_field_indexes(using=database)
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed custom field keys on {database}: {', '.join(keys) or 'none'}; "
+                f"dropped: {', '.join(dropped) or 'none'}"
+            ))
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    Employee = apps.get_model('employees', 'Employee')
+    EmployeeCount = apps.get_model('employees', 'EmployeeCount')
+    db_alias = schema_editor.connection.alias
+    totals = Employee.objects.using(db_alias).values('user').annotate(total=Count('id'))
+    EmployeeCount.objects.using(db_alias).bulk_create(
+        EmployeeCount(user_id=row['user'], count=row['total']) for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_customuser_is_staff_and_more'),
+        ('employees', '0003_employee_created_at_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeCount',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
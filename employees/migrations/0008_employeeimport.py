@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:12
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_customfieldindex'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeImport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source_name', models.CharField(max_length=255)),
+                ('format', models.CharField(max_length=10)),
+                ('chunk_size', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('rows_processed', models.PositiveBigIntegerField(default=0)),
+                ('rows_created', models.PositiveBigIntegerField(default=0)),
+                ('rows_rejected', models.PositiveBigIntegerField(default=0)),
+                ('chunks_committed', models.PositiveIntegerField(default=0)),
+                ('error_file_size', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from employees.custom_fields import create_custom_field_index
+from employees.search import install_search_index
+
+
+def restore_indexes(apps, schema_editor):
+    # Dropping the FK constraints rebuilt employees_employee, taking the search
+    # triggers and the custom field expression indexes with it
+    CustomFieldIndex = apps.get_model('employees', 'CustomFieldIndex')
+    install_search_index(schema_editor.connection)
+    alias = schema_editor.connection.alias
+    for key in CustomFieldIndex.objects.using(alias).values_list('key', flat=True).distinct():
+        create_custom_field_index(key, using=alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_revokedtoken'),
+        ('employees', '0008_employeeimport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantShard',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('database', models.CharField(max_length=63)),
+                ('moving', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='customfieldindex',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='employeecount',
+            name='user',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='employeeimport',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(restore_indexes, migrations.RunPython.noop),
+    ]
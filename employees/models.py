@@ -10,9 +10,78 @@ class Employee(models.Model):
     email = models.EmailField()
     position = models.CharField(max_length=100)
     custom_fields = models.JSONField()  # Custom fields storage
-    user = models.ForeignKey(CustomUser,on_delete=models.CASCADE)
+    # Covered by the leading column of employee_user_created_idx. No FK
+    # constraint on any employees table: shards don't hold the users table.
+    user = models.ForeignKey(CustomUser,on_delete=models.CASCADE,db_index=False,db_constraint=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Tenant-scoped lists ordered newest first (page, cursor and count queries)
+            models.Index(fields=['user','-created_at','-id'],name='employee_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class EmployeeCount(models.Model):
+    # Denormalized per-user employee total so unfiltered lists skip COUNT(*)
+    user = models.OneToOneField(CustomUser,on_delete=models.CASCADE,primary_key=True,db_constraint=False)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user} ({self.count})'
+
+
+class CustomFieldIndex(models.Model):
+    # custom_fields key a tenant declared as hot; backed by an expression index
+    user = models.ForeignKey(CustomUser,on_delete=models.CASCADE,db_constraint=False)
+    key = models.CharField(max_length=63)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user','key'],name='custom_field_index_user_key_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.key}'
+
+
+class EmployeeImport(models.Model):
+    # Progress of a streamed CSV/NDJSON import; committed chunks are never replayed on resume
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(RUNNING,'Running'),(COMPLETED,'Completed'),(FAILED,'Failed')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser,on_delete=models.CASCADE,db_constraint=False)
+    source_name = models.CharField(max_length=255)
+    format = models.CharField(max_length=10)
+    chunk_size = models.PositiveIntegerField()
+    status = models.CharField(max_length=10,choices=STATUS_CHOICES,default=RUNNING)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    rows_created = models.PositiveBigIntegerField(default=0)
+    rows_rejected = models.PositiveBigIntegerField(default=0)
+    chunks_committed = models.PositiveIntegerField(default=0)
+    error_file_size = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source_name} ({self.status})'
+
+
+class TenantShard(models.Model):
+    # Directory of which EMPLOYEE_SHARD_ALIASES database holds a tenant's employees tables; lives on default
+    user = models.OneToOneField(CustomUser,on_delete=models.CASCADE,primary_key=True)
+    database = models.CharField(max_length=63)
+    # Set while rebalance_employee_shards copies the tenant; its writes are refused meanwhile
+    moving = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f'{self.user} ({self.database})'
@@ -0,0 +1,56 @@
+from utils import InvalidFiltration, filtration_processing, ordering_processing
+
+from .models import Employee
+from .search import search_employees
+
+
+def filtered_employees(user,filtration_data,rank=False):
+    """
+    The user's employees narrowed by an EmployeeList style `filtration_data`
+    payload, including full-text search. Returns (queryset, filtered).
+    """
+    q_object = filtration_processing(filtration_data)
+    employees = Employee.objects.filter(*q_object,user=user)
+    search = (filtration_data or {}).get("search","")
+    if search:
+        employees = search_employees(employees,search,rank=rank)
+    return employees,bool(q_object) or bool(search)
+
+
+def selected_employees(user,ids=None,filtration_data=None):
+    """
+    Employees targeted by a bulk operation: an explicit id list or a filter.
+    A filter that narrows nothing (only empty values) raises InvalidFiltration
+    rather than selecting every employee.
+    """
+    if ids:
+        return Employee.objects.filter(user=user,id__in=ids)
+    employees,filtered = filtered_employees(user,filtration_data)
+    if not filtered:
+        raise InvalidFiltration("filtration_data selects every employee; send ids to target them explicitly")
+    return employees
+
+
+def employee_list_query(user,payload):
+    """
+    The ordered queryset behind an EmployeeList payload.
+    Returns (queryset, filtered, cursor_mode); raises InvalidFiltration.
+    """
+    filtration_data = payload.get("filtration_data",None)
+    pagination_data = payload.get("pagination",None)
+
+    search = (filtration_data or {}).get("search","")
+    cursor_mode = bool(pagination_data) and pagination_data.get("mode") == "cursor"
+
+    ordering = ordering_processing(payload.get("ordering",None))
+    if ordering and cursor_mode:
+        raise InvalidFiltration("Cursor pagination only supports the default ordering")
+
+    employees,filtered = filtered_employees(user,filtration_data,rank=bool(search))
+    employees = employees.order_by('-created_at','-id')
+    if search:
+        # Ranked in page mode; cursor mode keeps its (created_at, id) order
+        employees = employees.order_by('search_rank','-created_at','-id')
+    if ordering:
+        employees = employees.order_by(*ordering)
+    return employees,filtered,cursor_mode
@@ -0,0 +1,114 @@
+import re
+
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "employees_employee_fts"
+
+# The FTS rows share the employee rowid, so triggers and rank lookups are rowid seeks.
+# String values anywhere inside custom_fields are indexed as one text column.
+SEARCH_INDEX_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, email, position, custom_fields,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS employees_employee_fts_insert
+    AFTER INSERT ON employees_employee BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, email, position, custom_fields)
+        VALUES (
+            NEW.rowid, NEW.name, NEW.email, NEW.position,
+            (SELECT group_concat(value, ' ') FROM json_tree(NEW.custom_fields) WHERE type = 'text')
+        );
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employees_employee_fts_update
+    AFTER UPDATE OF name, email, position, custom_fields ON employees_employee BEGIN
+        UPDATE {FTS_TABLE} SET
+            name = NEW.name,
+            email = NEW.email,
+            position = NEW.position,
+            custom_fields = (SELECT group_concat(value, ' ') FROM json_tree(NEW.custom_fields) WHERE type = 'text')
+        WHERE rowid = NEW.rowid;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS employees_employee_fts_delete
+    AFTER DELETE ON employees_employee BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = OLD.rowid;
+    END""",
+]
+
+DROP_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS employees_employee_fts_insert",
+    "DROP TRIGGER IF EXISTS employees_employee_fts_update",
+    "DROP TRIGGER IF EXISTS employees_employee_fts_delete",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POPULATE_SEARCH_INDEX_SQL = f"""
+    INSERT INTO {FTS_TABLE}(rowid, name, email, position, custom_fields)
+    SELECT
+        e.rowid, e.name, e.email, e.position,
+        (SELECT group_concat(value, ' ') FROM json_tree(e.custom_fields) WHERE type = 'text')
+    FROM employees_employee AS e
+"""
+
+
+def install_search_index(connection):
+    """
+    (Re)create the FTS table and its sync triggers and reindex every employee.
+    Migrations that rebuild employees_employee drop the triggers and renumber
+    rowids, so they must call this again afterwards.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SEARCH_INDEX_SQL + SEARCH_INDEX_SQL:
+            cursor.execute(statement)
+        cursor.execute(POPULATE_SEARCH_INDEX_SQL)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SEARCH_INDEX_SQL:
+            cursor.execute(statement)
+
+
+def build_match_query(term):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+    Words are quoted so FTS operators in user input are taken literally.
+    """
+    words = re.findall(r"\w+",term or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_employees(queryset,term,rank=True):
+    """
+    Restrict the queryset to employees matching `term`. With `rank`, annotate
+    the FTS5 bm25 rank as `search_rank` (lower is more relevant); leave it off
+    for querysets that are updated or deleted rather than listed.
+    """
+    match = build_match_query(term)
+    if not match:
+        return queryset.none()
+
+    if connections[queryset.db].vendor != "sqlite":
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(email__icontains=term) | Q(position__icontains=term)
+        )
+        return queryset.annotate(search_rank=Value(0)) if rank else queryset
+
+    matched_ids = RawSQL(
+        f"SELECT id FROM employees_employee WHERE rowid IN "
+        f"(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+        (match,)
+    )
+    queryset = queryset.filter(id__in=matched_ids)
+    if not rank:
+        return queryset
+    return queryset.annotate(search_rank=RawSQL(
+        f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+        f"AND {FTS_TABLE}.rowid = employees_employee.rowid",
+        (match,)
+    ))
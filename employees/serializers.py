@@ -1,8 +1,14 @@
-from rest_framework import serializers
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
-from .models import Employee
+from utils import FILTRATION_KEYS, decode_cursor
+from utils.request_timing import TimedSerializerMixin, timed
 
-class EmployeeWriteSerializer(serializers.ModelSerializer):
+from .models import Employee, EmployeeImport
+
+class EmployeeWriteSerializer(TimedSerializerMixin,serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id','name','email','position','custom_fields']
@@ -13,8 +19,155 @@ class EmployeeWriteSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class EmployeeReadSerializer(serializers.ModelSerializer):
+class EmployeeReadSerializer(TimedSerializerMixin,serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id','name','email','position','custom_fields','created_at','updated_at']
 
+
+class EmployeeBulkCreateSerializer(serializers.Serializer):
+    employees = serializers.ListField(child=serializers.JSONField(),allow_empty=False)
+    batch_size = serializers.IntegerField(required=False,min_value=1)
+
+
+def validate_employee_records(records):
+    """
+    Validate records with EmployeeWriteSerializer rules in one pass.
+
+    A single serializer instance is reused, so field construction happens once
+    instead of once per record. Returns ([(index, validated_data)], {index: errors}).
+    """
+    serializer = EmployeeWriteSerializer()
+    valid = []
+    errors = {}
+    for index,record in enumerate(records):
+        try:
+            valid.append((index,serializer.run_validation(record)))
+        except serializers.ValidationError as e:
+            errors[index] = e.detail
+    return valid,errors
+
+
+class EmployeeBulkSelectionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(),required=False,allow_empty=False)
+    filtration_data = serializers.DictField(required=False,allow_empty=False)
+
+    def validate_filtration_data(self, value):
+        # An ignored key would widen the selection to every employee
+        unknown = sorted(set(value) - set(FILTRATION_KEYS))
+        if unknown:
+            raise serializers.ValidationError(f"Unsupported filter keys: {', '.join(unknown)}")
+        return value
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filtration_data" in attrs):
+            raise serializers.ValidationError("Send either ids or filtration_data")
+        return attrs
+
+
+class EmployeeBulkUpdateSerializer(EmployeeBulkSelectionSerializer):
+    data = serializers.DictField(allow_empty=False)
+
+    def validate_data(self, value):
+        serializer = EmployeeWriteSerializer(data=value,partial=True)
+        serializer.is_valid(raise_exception=True)
+        if not serializer.validated_data:
+            raise serializers.ValidationError("Nothing to update")
+        return serializer.validated_data
+
+
+class EmployeePaginationSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(choices=["page","cursor"],default="page")
+    page = serializers.IntegerField(min_value=1,default=1)
+    row_count = serializers.IntegerField(min_value=1,default=30)
+    cursor = serializers.CharField(required=False,allow_null=True,allow_blank=True)
+
+    def validate_cursor(self, value):
+        if value and decode_cursor(value) is None:
+            raise serializers.ValidationError("Invalid cursor")
+        return value
+
+
+class EmployeeListSerializer(serializers.Serializer):
+    pagination = EmployeePaginationSerializer(required=False,allow_null=True)
+    include_count = serializers.BooleanField(default=True)
+
+
+class EmployeeExportSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=["csv","ndjson"],default="csv")
+    filtration_data = serializers.DictField(required=False)
+
+
+class EmployeeImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=["csv","ndjson"],required=False)
+    chunk_size = serializers.IntegerField(required=False,min_value=1)
+    import_id = serializers.UUIDField(required=False)
+
+
+class EmployeeImportReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EmployeeImport
+        fields = [
+            'id','source_name','format','chunk_size','status','rows_processed','rows_created',
+            'rows_rejected','chunks_committed','error','created_at','updated_at'
+        ]
+
+
+def datetime_converter(field):
+    """
+    Precompiled DateTimeField.to_representation for ISO 8601 output: convert
+    to the active time zone, then isoformat with 'Z' for UTC.
+    """
+    if getattr(field,'format',api_settings.DATETIME_FORMAT) != ISO_8601 or not settings.USE_TZ:
+        return field.to_representation
+    field_timezone = getattr(field,'timezone',None) or timezone.get_current_timezone()
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat() if timezone.is_aware(value) else field.to_representation(value)
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def read_row_converters(serializer_class=None):
+    """
+    (field name, converter) pairs equivalent to the serializer's per-field
+    to_representation, built once per page instead of once per value.
+    """
+    serializer = (serializer_class or EmployeeReadSerializer)()
+    converters = []
+    for name,field in serializer.fields.items():
+        if isinstance(field,serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+            converter = str
+        elif isinstance(field,serializers.DateTimeField):
+            converter = datetime_converter(field)
+        elif isinstance(field,serializers.JSONField) and not field.binary:
+            converter = None
+        elif type(field) in (serializers.CharField,serializers.EmailField):
+            converter = str
+        else:
+            converter = field.to_representation
+        converters.append((field.source,name,converter))
+    return converters
+
+
+def serialize_employee_rows(rows):
+    """
+    Fast path for EmployeeReadSerializer(rows, many=True).data over values()
+    dicts holding EMPLOYEE_READ_FIELDS; the rendered JSON is identical.
+    """
+    with timed("serialize"):
+        converters = read_row_converters()
+        output = []
+        for row in rows:
+            item = {}
+            for source,name,converter in converters:
+                value = row[source]
+                item[name] = None if value is None else (converter(value) if converter else value)
+            output.append(item)
+        return output
+
+
+EMPLOYEE_READ_FIELDS = EmployeeReadSerializer.Meta.fields
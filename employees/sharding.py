@@ -0,0 +1,236 @@
+"""
+Per-tenant sharding of the employees tables.
+
+A tenant's Employee, EmployeeCount, CustomFieldIndex and EmployeeImport rows
+live together on one EMPLOYEE_SHARD_ALIASES database. TenantShard, on
+default, is the directory: tenants are placed by rendezvous hashing when they
+sign up and stay where the directory says until rebalance_employee_shards
+moves them, so adding a shard never moves anyone implicitly. Tenants without
+a directory row predate sharding and live on default.
+
+TenantShardRouter sends each query to its tenant's shard: the user_id of the
+instance being saved or deleted, or else the user the current request
+authenticated as. Work outside requests runs in tenant_context(). Without
+EMPLOYEE_SHARDS configured the router steps aside and everything stays on
+default.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+from employee_management.routers import routing_context, routing_state
+from .models import CustomFieldIndex, Employee, EmployeeCount, EmployeeImport, TenantShard
+
+SHARDED_MODELS = (Employee,EmployeeCount,CustomFieldIndex,EmployeeImport)
+SHARDED_MODEL_NAMES = frozenset(model._meta.model_name for model in SHARDED_MODELS)
+
+
+class TenantMoving(DatabaseError):
+    """A write to a tenant that rebalance_employee_shards is moving."""
+
+
+def sharding_enabled():
+    return len(settings.EMPLOYEE_SHARD_ALIASES) > 1
+
+
+def is_sharded(model):
+    # By name, so historical models in migrations are routed too
+    return model._meta.app_label == "employees" and model._meta.model_name in SHARDED_MODEL_NAMES
+
+
+def hash_shard(user_id,aliases=None):
+    """
+    Rendezvous hash of a tenant over the shards: each tenant goes to the shard
+    with the highest score, so a new shard only claims the tenants it now wins.
+    """
+    aliases = aliases or settings.EMPLOYEE_SHARD_ALIASES
+    return max(aliases,key=lambda alias: hashlib.blake2b(f"{alias}:{user_id}".encode(),digest_size=8).digest())
+
+
+def placement_cache_key(user_id):
+    return f"tenant-shard:{user_id}"
+
+
+def tenant_placement(user_id):
+    """(database, moving) of a tenant, cached for EMPLOYEE_SHARD_CACHE_TIMEOUT seconds."""
+    key = placement_cache_key(user_id)
+    placement = cache.get(key)
+    if placement is None:
+        # The directory is read from the primary, never a lagging replica
+        row = TenantShard.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id).values_list('database','moving').first()
+        placement = tuple(row) if row else (DEFAULT_DB_ALIAS,False)
+        cache.set(key,placement,settings.EMPLOYEE_SHARD_CACHE_TIMEOUT)
+    return placement
+
+
+def resolve_tenant(user_id):
+    # Memoized per request, so routing its queries costs one cache read
+    user_id = str(user_id)
+    state = routing_state()
+    if state is None:
+        return tenant_placement(user_id)
+    if user_id not in state.shards:
+        state.shards[user_id] = tenant_placement(user_id)
+    return state.shards[user_id]
+
+
+def employee_db(user):
+    """Alias of the database holding the employees of `user` (a user or its pk)."""
+    if not sharding_enabled():
+        return DEFAULT_DB_ALIAS
+    return resolve_tenant(getattr(user,"pk",user))[0]
+
+
+def tenant_atomic(user):
+    """transaction.atomic() on the shard of `user`, for writes to its employees."""
+    return transaction.atomic(using=employee_db(user))
+
+
+def tenant_context(user):
+    """Route queries as a request of `user` would be, for work outside requests."""
+    return routing_context(getattr(user,"pk",user))
+
+
+class TenantShardRouter:
+    """
+    Routes the sharded employees models to their tenant's shard and refuses
+    writes to tenants being moved. Everything else, and queries that can't be
+    tied to a tenant, falls through to the next router.
+    """
+
+    def tenant(self,hints):
+        instance = hints.get("instance")
+        if instance is not None:
+            if instance._meta.label == settings.AUTH_USER_MODEL:
+                return instance.pk
+            if getattr(instance,"user_id",None) is not None:
+                return instance.user_id
+        state = routing_state()
+        return state.user_id if state is not None else None
+
+    def db_for_read(self,model,**hints):
+        if not sharding_enabled() or not is_sharded(model):
+            return None
+        user_id = self.tenant(hints)
+        return None if user_id is None else resolve_tenant(user_id)[0]
+
+    def db_for_write(self,model,**hints):
+        if not sharding_enabled() or not is_sharded(model):
+            return None
+        user_id = self.tenant(hints)
+        if user_id is None:
+            return None
+        database,moving = resolve_tenant(user_id)
+        if moving:
+            raise TenantMoving(f"Employees of {user_id} are being moved to another database, retry shortly")
+        state = routing_state()
+        if state is not None:
+            state.record_write()
+        return database
+
+    def allow_relation(self,obj1,obj2,**hints):
+        if sharding_enabled() and (is_sharded(obj1) or is_sharded(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self,db,app_label,model_name=None,**hints):
+        if db == DEFAULT_DB_ALIAS or db not in settings.EMPLOYEE_SHARD_ALIASES:
+            return None
+        # Shards hold the sharded tables only; RunPython steps of employees
+        # migrations (search index, counters) run on every shard
+        if app_label != "employees":
+            return False
+        return model_name is None or model_name in SHARDED_MODEL_NAMES
+
+
+def place_new_tenant(sender,instance,created,raw=False,**kwargs):
+    """post_save of users: record the hashed shard of every tenant that signs up."""
+    if created and not raw and sharding_enabled():
+        TenantShard.objects.using(DEFAULT_DB_ALIAS).get_or_create(
+            user_id=instance.pk,defaults={"database":hash_shard(instance.pk)}
+        )
+
+
+def delete_tenant_rows(sender,instance,using=DEFAULT_DB_ALIAS,**kwargs):
+    """
+    pre_delete of users: the deletion cascade only reaches the employees
+    tables on default, so a tenant's rows on another shard go after commit.
+    """
+    database = employee_db(instance)
+    if database != DEFAULT_DB_ALIAS:
+        user_id = instance.pk
+        transaction.on_commit(lambda: purge_tenant(user_id,database),using=using)
+
+
+def purge_tenant(user_id,database):
+    """Delete every sharded row of a tenant from `database`."""
+    with transaction.atomic(using=database):
+        for model in SHARDED_MODELS:
+            model._base_manager.using(database).filter(user_id=user_id).delete()
+    cache.delete(placement_cache_key(user_id))
+
+
+def portable_fields(model):
+    # Auto-increment keys are per database, so those rows get new ones on the target
+    return [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and field.get_internal_type() in ("AutoField","BigAutoField","SmallAutoField"))
+    ]
+
+
+def tenant_rows(model,database,user_id):
+    fields = [field.attname for field in portable_fields(model)]
+    return model._base_manager.using(database).filter(user_id=user_id).values_list(*fields)
+
+
+def copy_rows(model,database,rows,upsert=False):
+    """
+    Insert tenant_rows() of `model` into `database` as they are. Unlike
+    bulk_create this keeps auto_now/auto_now_add values; with `upsert`
+    existing primary keys are overwritten.
+    """
+    if not rows:
+        return
+    fields = portable_fields(model)
+    connection = connections[database]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+    if upsert:
+        updates = ", ".join(
+            f"{quote(field.column)} = excluded.{quote(field.column)}" for field in fields if not field.primary_key
+        )
+        sql += f" ON CONFLICT ({quote(model._meta.pk.column)}) DO UPDATE SET {updates}"
+    params = [[field.get_db_prep_save(value,connection) for field,value in zip(fields,row)] for row in rows]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql,params)
+
+
+def copy_employees(user_id,source,target,chunk_size,since=None):
+    """
+    Upsert the tenant's employees (changed at or after `since`, if given) from
+    `source` into `target` in primary key order, one transaction per chunk.
+    Returns the number of rows copied.
+    """
+    rows = tenant_rows(Employee,source,user_id).order_by('pk')
+    if since is not None:
+        rows = rows.filter(updated_at__gte=since)
+    copied,last = 0,None
+    while True:
+        chunk = list((rows if last is None else rows.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            return copied
+        with transaction.atomic(using=target):
+            copy_rows(Employee,target,chunk,upsert=True)
+        copied += len(chunk)
+        last = chunk[-1][0]
+
+
+def set_placement(user_id,database,moving):
+    TenantShard.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        user_id=user_id,defaults={"database":database,"moving":moving}
+    )
+    cache.delete(placement_cache_key(user_id))
@@ -1,3 +1,1002 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import CustomUser
+from employee_management.database import sqlite_database
+from employee_management.routers import pin_key
+from utils.json_renderers import FastJSONParser, FastJSONRenderer
+from utils.metrics import MetricsRegistry, registry
+from utils.result_cache import LocalResultCache, ResultCache, get_result_cache
+from utils.testing import enforce_query_budgets
+from .custom_fields import existing_custom_field_indexes
+from .models import CustomFieldIndex, Employee, EmployeeCount, EmployeeImport, TenantShard
+from .serializers import EMPLOYEE_READ_FIELDS, EmployeeReadSerializer, serialize_employee_rows
+from .sharding import hash_shard, set_placement
+
+
+@enforce_query_budgets
+class EmployeeAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("owner","owner@example.com",9000000001,"secret1")
+        cls.other = CustomUser.objects.create_user("other","other@example.com",9000000002,"secret2")
+        for index in range(12):
+            Employee.objects.create(
+                name=f"Employee {index}",
+                email=f"employee{index}@example.com",
+                position="Engineer" if index % 2 else "Designer",
+                custom_fields={"department":"R&D","level":index},
+                user=cls.user if index < 10 else cls.other
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def employee_list(self,payload):
+        return self.client.post("/employees/list/",payload,format="json")
+
+
+class EmployeeQueryPlanTests(EmployeeAPITestCase):
+    """
+    Runs the SQL each employee endpoint really issues through EXPLAIN QUERY PLAN
+    and fails on full table scans or temp B-tree sorts.
+    """
+
+    def assertIndexBacked(self,captured_queries):
+        explained = 0
+        details = []
+        with connection.cursor() as cursor:
+            for query in captured_queries:
+                sql = query["sql"]
+                if not sql.startswith(("SELECT","UPDATE","DELETE")):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = [row[-1] for row in cursor.fetchall()]
+                explained += 1
+                details.extend(plan)
+                for detail in plan:
+                    full_scan = detail.startswith("SCAN ") and "VIRTUAL TABLE" not in detail
+                    self.assertFalse(full_scan,f"Full scan in {sql!r}: {plan}")
+                    self.assertNotIn("TEMP B-TREE",detail,f"Sort without index in {sql!r}: {plan}")
+        self.assertGreater(explained,0)
+        return details
+
+    def capture(self,request):
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        self.assertLess(response.status_code,300,response.content)
+        return context.captured_queries
+
+    def test_list_page_mode(self):
+        self.assertIndexBacked(self.capture(lambda: self.employee_list({"pagination":{"page":2,"row_count":3}})))
+
+    def test_list_without_count(self):
+        self.assertIndexBacked(self.capture(lambda: self.employee_list({"include_count":False})))
+
+    def test_list_filtered_by_name(self):
+        self.assertIndexBacked(self.capture(lambda: self.employee_list({"filtration_data":{"name":"Employee 1"}})))
+
+    def test_list_filtered_by_created_date(self):
+        day = Employee.objects.first().created_at.astimezone().date().isoformat()
+        self.assertIndexBacked(self.capture(lambda: self.employee_list({"filtration_data":{"created_at":day}})))
+
+    def test_list_cursor_mode(self):
+        first = self.employee_list({"pagination":{"mode":"cursor","row_count":4}}).json()
+        cursor = first["data"]["next_cursor"]
+        self.assertIndexBacked(self.capture(
+            lambda: self.employee_list({"pagination":{"mode":"cursor","cursor":cursor,"row_count":4}})
+        ))
+
+    def test_single_update_delete(self):
+        employee = Employee.objects.filter(user=self.user).first()
+        self.assertIndexBacked(self.capture(lambda: self.client.get(f"/employees/single-employee/?id={employee.id}")))
+        self.assertIndexBacked(self.capture(lambda: self.client.patch(
+            f"/employees/update/?id={employee.id}",
+            {"name":"Renamed","email":employee.email,"position":"Lead","custom_fields":{}},
+            format="json"
+        )))
+        self.assertIndexBacked(self.capture(lambda: self.client.delete(f"/employees/delete/?id={employee.id}")))
+
+    def test_hot_custom_field_filter_and_ordering(self):
+        response = self.client.post("/employees/custom-field-indexes/",{"key":"level"},format="json")
+        self.assertEqual(response.status_code,201)
+        call_command("sync_custom_field_indexes",stdout=io.StringIO())
+        plan = self.assertIndexBacked(self.capture(lambda: self.employee_list({
+            "filtration_data":{"custom_fields":{"level":{"gte":4}}},
+            "ordering":"-custom_fields.level"
+        })))
+        self.assertTrue(any("employee_cf_level_idx" in detail for detail in plan),plan)
+
+
+@override_settings(EMPLOYEE_LIST_CACHE=False)
+class EmployeePaginationTests(EmployeeAPITestCase):
+    def cursor_page(self,cursor=None):
+        response = self.employee_list({"pagination":{"mode":"cursor","cursor":cursor,"row_count":4}})
+        self.assertEqual(response.status_code,200,response.content)
+        return response.json()["data"]
+
+    def test_cursor_walk_forward_and_back(self):
+        expected = [str(pk) for pk in Employee.objects.filter(user=self.user).order_by('-created_at','-id').values_list('id',flat=True)]
+        first = self.cursor_page()
+        second = self.cursor_page(first["next_cursor"])
+        third = self.cursor_page(second["next_cursor"])
+        self.assertEqual([row["id"] for row in first["row_data"] + second["row_data"] + third["row_data"]],expected)
+        self.assertIsNone(first["prev_cursor"])
+        self.assertIsNone(third["next_cursor"])
+        back = self.cursor_page(third["prev_cursor"])
+        self.assertEqual(back["row_data"],second["row_data"])
+        self.assertEqual(self.cursor_page(back["prev_cursor"])["row_data"],first["row_data"])
+
+    def test_invalid_pagination_is_rejected(self):
+        for pagination in (
+            {"mode":"cursor","row_count":"abc"},
+            {"mode":"cursor","row_count":0},
+            {"mode":"cursor","cursor":"not-a-cursor"},
+            {"page":"two"},
+            {"page":0},
+            {"mode":"offset"},
+        ):
+            for url in ("/employees/list/","/employees/async/list/"):
+                response = self.client.post(url,{"pagination":pagination},format="json")
+                self.assertEqual(response.status_code,400,(url,pagination))
+                self.assertIn("pagination",response.json()["error"])
+
+
+class EmployeeCountTests(EmployeeAPITestCase):
+    def assertCounted(self):
+        actual = Employee.objects.filter(user=self.user).count()
+        self.assertEqual(self.employee_list({}).json()["data"]["count"],actual)
+        self.assertEqual(EmployeeCount.objects.get(user=self.user).count,actual)
+
+    def test_counter_follows_writes(self):
+        record = {"name":"Counted","email":"counted@example.com","position":"Ops","custom_fields":{}}
+        self.assertCounted()
+        created = self.client.post("/employees/create/",record,format="json").json()["data"]
+        self.assertCounted()
+        async_created = self.client.post("/employees/async/create/",record,format="json").json()["data"]
+        self.assertCounted()
+        self.client.post("/employees/bulk-create/",{"employees":[record,{**record,"email":"bad"},record]},format="json")
+        self.assertCounted()
+        self.client.delete(f"/employees/delete/?id={created['id']}")
+        self.client.delete(f"/employees/async/delete/?id={async_created['id']}")
+        self.assertCounted()
+        # Deleting another tenant's employee or an already deleted one changes nothing
+        foreign = Employee.objects.filter(user=self.other).first()
+        self.assertEqual(self.client.delete(f"/employees/delete/?id={foreign.id}").status_code,404)
+        self.assertEqual(self.client.patch(f"/employees/update/?id={foreign.id}",record,format="json").status_code,404)
+        self.client.delete(f"/employees/delete/?id={created['id']}")
+        self.assertCounted()
+        self.client.delete("/employees/bulk-delete/",{"filtration_data":{"name":"Counted"}},format="json")
+        self.assertCounted()
+        self.assertEqual(Employee.objects.filter(user=self.user).count(),10)
+        self.assertEqual(Employee.objects.filter(user=self.other).count(),2)
+
+    def test_include_count_is_a_boolean(self):
+        for include_count in (False,"false",0):
+            response = self.employee_list({"include_count":include_count})
+            self.assertEqual(response.status_code,200)
+            self.assertIsNone(response.json()["data"]["count"])
+        self.assertEqual(self.employee_list({"include_count":"true"}).json()["data"]["count"],10)
+        self.assertEqual(self.employee_list({"include_count":"maybe"}).status_code,400)
+
+
+@override_settings(EMPLOYEE_LIST_CACHE=False)
+class EmployeeSearchTests(EmployeeAPITestCase):
+    def search(self,term,**payload):
+        response = self.employee_list({"filtration_data":{"search":term},**payload})
+        self.assertEqual(response.status_code,200,response.content)
+        return response.json()["data"]
+
+    def test_prefix_match_across_columns_and_custom_fields(self):
+        self.assertEqual(self.search("employee1")["count"],1)
+        self.assertEqual(self.search("engin")["count"],5)
+        self.assertEqual(self.search("R&D")["count"],10)
+
+    def test_index_follows_updates_and_deletes(self):
+        employee = Employee.objects.filter(user=self.user).first()
+        employee.custom_fields = {"team":"Zeppelin"}
+        employee.save()
+        self.assertEqual([row["id"] for row in self.search("zepp")["row_data"]],[str(employee.id)])
+        employee.delete()
+        self.assertEqual(self.search("zepp")["count"],0)
+
+    def test_results_are_scoped_to_user(self):
+        self.assertEqual(self.search("employee11")["count"],0)
+
+    def test_ranked_best_match_first(self):
+        Employee.objects.create(
+            name="Zed Zed",email="zed@example.com",position="Zed",custom_fields={},user=self.user
+        )
+        Employee.objects.create(
+            name="Zed",email="other@example.com",position="Manager",custom_fields={},user=self.user
+        )
+        self.assertEqual(self.search("zed")["row_data"][0]["name"],"Zed Zed")
+
+
+class EmployeeCustomFieldTests(EmployeeAPITestCase):
+    def names(self,payload):
+        response = self.employee_list(payload)
+        self.assertEqual(response.status_code,200,response.content)
+        return [row["name"] for row in response.json()["data"]["row_data"]]
+
+    def test_equality_range_and_in(self):
+        self.assertEqual(self.names({"filtration_data":{"custom_fields":{"level":3}}}),["Employee 3"])
+        self.assertEqual(
+            self.names({"filtration_data":{"custom_fields":{"level":{"gt":6,"lte":8}}},"ordering":"custom_fields.level"}),
+            ["Employee 7","Employee 8"]
+        )
+        self.assertEqual(
+            sorted(self.names({"filtration_data":{"custom_fields":{"level":{"in":[1,11]},"department":"R&D"}}})),
+            ["Employee 1"]
+        )
+
+    def test_null_matches_missing_and_null_values(self):
+        Employee.objects.filter(name="Employee 2").update(custom_fields={"department":"R&D","level":None})
+        Employee.objects.filter(name="Employee 3").update(custom_fields={"department":"R&D"})
+        self.assertEqual(sorted(self.names({"filtration_data":{"custom_fields":{"level":None}}})),["Employee 2","Employee 3"])
+        self.assertEqual(sorted(self.names({"filtration_data":{"custom_fields":{"level":{"eq":None}}}})),["Employee 2","Employee 3"])
+        self.assertEqual(self.employee_list({"filtration_data":{"custom_fields":{"level":{"gt":None}}}}).status_code,400)
+        self.assertEqual(self.employee_list({"filtration_data":{"custom_fields":{"level":{"in":[1,None]}}}}).status_code,400)
+
+    def test_ordering_by_key(self):
+        self.assertEqual(self.names({"ordering":"-custom_fields.level","pagination":{"row_count":3}}),
+                         ["Employee 9","Employee 8","Employee 7"])
+
+    def test_invalid_key_and_operator(self):
+        self.assertEqual(self.employee_list({"filtration_data":{"custom_fields":{"a'b":1}}}).status_code,400)
+        self.assertEqual(self.employee_list({"filtration_data":{"custom_fields":{"level":{"like":1}}}}).status_code,400)
+        self.assertEqual(self.employee_list({
+            "ordering":"custom_fields.level","pagination":{"mode":"cursor"}
+        }).status_code,400)
+
+    def test_hot_key_declarations(self):
+        self.assertEqual(self.client.post("/employees/custom-field-indexes/",{"key":"level"},format="json").status_code,201)
+        self.assertEqual(self.client.get("/employees/custom-field-indexes/").json()["data"],["level"])
+        # Indexes are built by the sync command, never inside the request
+        self.assertNotIn("level",existing_custom_field_indexes())
+        call_command("sync_custom_field_indexes",stdout=io.StringIO())
+        self.assertIn("level",existing_custom_field_indexes())
+
+        self.assertEqual(self.client.delete("/employees/custom-field-indexes/?key=level").status_code,200)
+        self.assertEqual(self.client.delete("/employees/custom-field-indexes/?key=level").status_code,404)
+        call_command("sync_custom_field_indexes",stdout=io.StringIO())
+        self.assertNotIn("level",existing_custom_field_indexes())
+
+    @override_settings(CUSTOM_FIELD_INDEX_TOTAL_LIMIT=1)
+    def test_distinct_hot_keys_are_capped_across_tenants(self):
+        CustomFieldIndex.objects.create(user=self.other,key="team")
+        self.assertEqual(self.client.post("/employees/custom-field-indexes/",{"key":"level"},format="json").status_code,400)
+        self.assertEqual(self.client.post("/employees/custom-field-indexes/",{"key":"team"},format="json").status_code,201)
+
+
+class EmployeeBulkCreateTests(EmployeeAPITestCase):
+    def test_valid_rows_created_in_input_order(self):
+        records = [
+            {"name":"Bulk 0","email":"bulk0@example.com","position":"Ops","custom_fields":{}},
+            {"name":"Bulk 1","email":"not-an-email","position":"Ops","custom_fields":{}},
+            "not an object",
+            {"name":"Bulk 3","email":"bulk3@example.com","position":"Ops","custom_fields":{"k":"v"}},
+        ]
+        response = self.client.post("/employees/bulk-create/",{"employees":records,"batch_size":1},format="json")
+        self.assertEqual(response.status_code,200,response.content)
+        data = response.json()["data"]
+        self.assertEqual(data["created_count"],2)
+        self.assertEqual(sorted(data["errors"]),["1","2"])
+        self.assertIsNone(data["created_ids"][1])
+        for index in (0,3):
+            self.assertEqual(Employee.objects.get(id=data["created_ids"][index]).name,f"Bulk {index}")
+        self.assertEqual(self.employee_list({}).json()["data"]["count"],12)
+
+    def test_all_invalid_is_rejected(self):
+        response = self.client.post("/employees/bulk-create/",{"employees":[{"name":"x"}]},format="json")
+        self.assertEqual(response.status_code,400)
+        self.assertEqual(Employee.objects.filter(user=self.user).count(),10)
+
+
+class EmployeeBulkUpdateDeleteTests(EmployeeAPITestCase):
+    def test_update_by_ids(self):
+        ids = [str(pk) for pk in Employee.objects.filter(user=self.user).values_list("id",flat=True)[:3]]
+        other_id = str(Employee.objects.filter(user=self.other).first().id)
+        with self.assertNumQueries(2):
+            response = self.client.patch(
+                "/employees/bulk-update/",{"ids":ids + [other_id],"data":{"position":"Lead"}},format="json"
+            )
+        self.assertEqual(response.json()["data"]["affected"],3)
+        self.assertEqual(Employee.objects.filter(position="Lead").count(),3)
+
+    def test_update_by_filter_validates_data(self):
+        response = self.client.patch(
+            "/employees/bulk-update/",
+            {"filtration_data":{"custom_fields":{"level":{"lt":2}}},"data":{"email":"broken"}},
+            format="json"
+        )
+        self.assertEqual(response.status_code,400)
+        response = self.client.patch(
+            "/employees/bulk-update/",
+            {"filtration_data":{"custom_fields":{"level":{"lt":2}}},"data":{"position":"Intern"}},
+            format="json"
+        )
+        self.assertEqual(response.json()["data"]["affected"],2)
+
+    def test_delete_by_filter_updates_count(self):
+        response = self.client.delete(
+            "/employees/bulk-delete/",{"filtration_data":{"search":"designer"}},format="json"
+        )
+        self.assertEqual(response.json()["data"]["affected"],5)
+        self.assertEqual(self.employee_list({}).json()["data"]["count"],5)
+        self.assertEqual(Employee.objects.filter(user=self.other).count(),2)
+
+    def test_selector_required(self):
+        self.assertEqual(self.client.delete("/employees/bulk-delete/",{},format="json").status_code,400)
+        self.assertEqual(self.client.delete(
+            "/employees/bulk-delete/",{"ids":[],"filtration_data":{"name":"x"}},format="json"
+        ).status_code,400)
+
+    def test_filters_that_narrow_nothing_are_rejected(self):
+        for filtration_data in ({"position":"nomatch"},{"name":""},{"name":"","search":""}):
+            response = self.client.delete("/employees/bulk-delete/",{"filtration_data":filtration_data},format="json")
+            self.assertEqual(response.status_code,400)
+            response = self.client.patch(
+                "/employees/bulk-update/",{"filtration_data":filtration_data,"data":{"position":"Lead"}},format="json"
+            )
+            self.assertEqual(response.status_code,400)
+        self.assertEqual(Employee.objects.filter(user=self.user).count(),10)
+        self.assertFalse(Employee.objects.filter(position="Lead").exists())
+
+
+class EmployeeExportTests(EmployeeAPITestCase):
+    def export(self,payload):
+        response = self.client.post("/employees/export/",payload,format="json")
+        self.assertEqual(response.status_code,200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_flattens_custom_fields(self):
+        Employee.objects.create(
+            name="Nested",email="nested@example.com",position="Ops",
+            custom_fields={"skills":["sql"],"level":99},user=self.user
+        )
+        rows = list(csv.DictReader(io.StringIO(self.export({"format":"csv"}))))
+        self.assertEqual(len(rows),11)
+        self.assertEqual(rows[0]["name"],"Nested")
+        self.assertEqual(rows[0]["custom_fields.skills"],'["sql"]')
+        self.assertEqual(rows[0]["custom_fields.department"],"")
+        self.assertEqual(rows[1]["custom_fields.department"],"R&D")
+
+    def test_ndjson_respects_filters(self):
+        lines = self.export({"format":"ndjson","filtration_data":{"custom_fields":{"level":{"gte":8}}}}).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record["name"] for record in records],["Employee 9","Employee 8"])
+        self.assertEqual(records[0]["custom_fields"],{"department":"R&D","level":9})
+
+
+class EmployeeImportTests(EmployeeAPITestCase):
+    CSV = (
+        "name,email,position,custom_fields.team\n"
+        "Imported 1,imported1@example.com,Ops,Blue\n"
+        "Imported 2,broken,Ops,\n"
+        "Imported 3,imported3@example.com,Ops,Red\n"
+        "Imported 4,imported4@example.com,Ops,\n"
+    )
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(EMPLOYEE_IMPORT_DIR=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_upload_commits_chunks_and_reports_errors(self):
+        upload = SimpleUploadedFile("people.csv",self.CSV.encode())
+        response = self.client.post("/employees/import/",{"file":upload,"chunk_size":2},format="multipart")
+        self.assertEqual(response.status_code,200,response.content)
+        job = response.json()["data"]
+        self.assertEqual(
+            (job["status"],job["rows_processed"],job["rows_created"],job["rows_rejected"],job["chunks_committed"]),
+            ("completed",4,3,1,2)
+        )
+        self.assertEqual(Employee.objects.get(email="imported1@example.com").custom_fields,{"team":"Blue"})
+        self.assertEqual(self.employee_list({}).json()["data"]["count"],13)
+
+        errors = self.client.get(f"/employees/import/errors/?id={job['id']}")
+        rejected = [json.loads(line) for line in b"".join(errors.streaming_content).splitlines()]
+        self.assertEqual([entry["row"] for entry in rejected],[2])
+
+    def test_command_resumes_after_last_committed_chunk(self):
+        path = tempfile.NamedTemporaryFile("w",suffix=".ndjson")
+        self.addCleanup(path.close)
+        for index in range(5):
+            path.write(json.dumps({"name":f"Line {index}","email":f"line{index}@example.com","position":"Ops","custom_fields":{}}) + "\n")
+        path.write("{not json}\n")
+        path.flush()
+
+        job = EmployeeImport.objects.create(
+            user=self.user,source_name=path.name,format="ndjson",chunk_size=2,rows_processed=2,chunks_committed=1,
+            status=EmployeeImport.FAILED,error="interrupted"
+        )
+        call_command("import_employees",path.name,resume=str(job.id),stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status,job.rows_processed,job.rows_created,job.rows_rejected),("completed",6,3,1))
+        self.assertEqual(job.error,"")
+        self.assertFalse(Employee.objects.filter(name__in=["Line 0","Line 1"]).exists())
+        self.assertEqual(Employee.objects.filter(name__startswith="Line").count(),3)
+
+
+    def test_running_import_cannot_be_resumed_twice(self):
+        job = EmployeeImport.objects.create(user=self.user,source_name="people.csv",format="csv",chunk_size=2)
+        upload = SimpleUploadedFile("people.csv",self.CSV.encode())
+        response = self.client.post("/employees/import/",{"file":upload,"import_id":str(job.id)},format="multipart")
+        self.assertEqual(response.status_code,409)
+        self.assertEqual(Employee.objects.filter(position="Ops").count(),0)
+
+        # Once it stops making progress it can be taken over
+        EmployeeImport.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(hours=1))
+        upload = SimpleUploadedFile("people.csv",self.CSV.encode())
+        response = self.client.post("/employees/import/",{"file":upload,"import_id":str(job.id)},format="multipart")
+        self.assertEqual(response.status_code,200,response.content)
+        self.assertEqual(response.json()["data"]["status"],"completed")
+        self.assertEqual(self.client.post(
+            "/employees/import/",{"file":SimpleUploadedFile("people.csv",self.CSV.encode()),"import_id":str(job.id)},
+            format="multipart"
+        ).status_code,409)
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+class SingleEmployeeCachingTests(EmployeeAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = Employee.objects.filter(user=self.user).first()
+        self.url = f"/employees/single-employee/?id={self.employee.id}"
+
+    def test_repeat_reads_use_rendered_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code,200)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content,first.content)
+        self.assertEqual(second.json()["data"]["name"],self.employee.name)
+
+    def test_if_none_match_returns_304_until_updated(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url,HTTP_IF_NONE_MATCH=etag).status_code,304)
+
+        self.employee.name = "Changed"
+        self.employee.save()
+        response = self.client.get(self.url,HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code,200)
+        self.assertNotEqual(response["ETag"],etag)
+        self.assertEqual(response.json()["data"]["name"],"Changed")
+
+    def test_other_users_employee_is_not_found(self):
+        other = Employee.objects.filter(user=self.other).first()
+        self.assertEqual(self.client.get(f"/employees/single-employee/?id={other.id}").status_code,404)
+
+
+@override_settings(EMPLOYEE_LIST_CACHE=True,AUTH_USER_CACHE_TIMEOUT=60)
+class EmployeeListCacheTests(EmployeeAPITestCase):
+    def test_repeat_list_is_served_from_cache(self):
+        payload = {"filtration_data":{"name":"Employee","created_at":""},"pagination":{"page":1}}
+        self.assertEqual(self.employee_list(payload)["X-Cache"],"MISS")
+        hits = get_result_cache().stats.snapshot()["hits"]
+        with self.assertNumQueries(0):
+            response = self.employee_list({"filtration_data":{"name":"Employee"},"pagination":{"row_count":30}})
+        self.assertEqual(response["X-Cache"],"HIT")
+        self.assertEqual(response.json()["data"]["count"],10)
+        self.assertEqual(get_result_cache().stats.snapshot()["hits"],hits + 1)
+
+    def test_writes_bump_the_users_version(self):
+        self.employee_list({})
+        # Invalidation runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/employees/create/",
+                {"name":"Fresh","email":"fresh@example.com","position":"Ops","custom_fields":{}},
+                format="json"
+            )
+        response = self.employee_list({})
+        self.assertEqual(response["X-Cache"],"MISS")
+        self.assertEqual(response.json()["data"]["row_data"][0]["name"],"Fresh")
+
+        employee_id = response.json()["data"]["row_data"][0]["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/employees/bulk-update/",{"ids":[employee_id],"data":{"name":"Renamed"}},format="json")
+        self.assertEqual(self.employee_list({}).json()["data"]["row_data"][0]["name"],"Renamed")
+
+    def test_local_backend_versions(self):
+        cache = ResultCache(LocalResultCache(max_entries=2))
+        key = cache.key("scope","a")
+        cache.set(key,{"value":1})
+        self.assertEqual(cache.get(key),{"value":1})
+        cache.invalidate("scope")
+        self.assertIsNone(cache.get(cache.key("scope","a")))
+        self.assertEqual(cache.stats.snapshot()["misses"],1)
+
+
+class EmployeeFastSerializationTests(EmployeeAPITestCase):
+    def test_fast_rows_render_identically(self):
+        Employee.objects.create(name="Ünïcode ✓",email="u@example.com",position="",custom_fields={"n":None,"x":[1.5,{"y":True}]},user=self.user)
+        employees = Employee.objects.filter(user=self.user).order_by('-created_at','-id')
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(serialize_employee_rows(employees.values(*EMPLOYEE_READ_FIELDS))),
+            renderer.render(EmployeeReadSerializer(employees,many=True).data)
+        )
+
+    def test_list_payload_matches_serializer_path(self):
+        for payload in (
+            {"pagination":{"page":2,"row_count":4}},
+            {"pagination":{"mode":"cursor","row_count":4}},
+            {"filtration_data":{"search":"engineer"}},
+        ):
+            with override_settings(EMPLOYEE_FAST_SERIALIZATION=True,EMPLOYEE_LIST_CACHE=False):
+                fast = self.employee_list(payload).content
+            with override_settings(EMPLOYEE_FAST_SERIALIZATION=False,EMPLOYEE_LIST_CACHE=False):
+                slow = self.employee_list(payload).content
+            self.assertEqual(fast,slow)
+
+
+class FastJSONTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("json","json@example.com",9000000009,"secret9")
+
+    def test_renderer_matches_drf(self):
+        data = {
+            "id":uuid.uuid4(),
+            "created_at":timezone.now(),
+            "offset":datetime(2024,5,1,9,30,tzinfo=timezone.get_fixed_timezone(330)),
+            "day":date(2024,5,1),
+            "salary":Decimal("5400.50"),
+            "label":gettext_lazy("Employee List"),
+            "errors":{0:[ErrorDetail("required",code="required")]},
+            "text":"line\u2028separator\u2029ünïcode",
+        }
+        self.assertEqual(FastJSONRenderer().render(data),JSONRenderer().render(data))
+
+    def test_indented_output_uses_drf(self):
+        data = {"a":[1,2]}
+        media_type = "application/json; indent=4"
+        self.assertEqual(FastJSONRenderer().render(data,media_type),JSONRenderer().render(data,media_type))
+
+    def test_parser(self):
+        body = '{"name":"Ünïcode","custom_fields":{"level":1.5,"tags":["a"]}}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)),json.loads(body))
+        for invalid in (b'{"a":',b'{"a":NaN}'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(invalid))
+
+    def test_values_orjson_gets_wrong_follow_drf(self):
+        huge = 123456789012345678901234567890
+        body = f'{{"custom_fields":{{"serial":{huge}}}}}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body))["custom_fields"]["serial"],huge)
+        data = {"custom_fields":{"serial":huge},"missing":None}
+        self.assertEqual(FastJSONRenderer().render(data),JSONRenderer().render(data))
+        for value in (float("nan"),float("inf")):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({"level":value,"team":None})
+
+    def test_huge_integer_in_stored_custom_fields(self):
+        huge = 123456789012345678901234567890
+        Employee.objects.create(
+            name="Huge",email="huge@example.com",position="Engineer",custom_fields={"serial":huge},user=self.user
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+        response = client.post("/employees/list/",{},format="json")
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(json.loads(response.content)["data"]["row_data"][0]["custom_fields"]["serial"],huge)
+
+    def test_api_uses_fast_renderer(self):
+        self.assertIs(api_settings.DEFAULT_RENDERER_CLASSES[0],FastJSONRenderer)
+        self.assertIs(api_settings.DEFAULT_PARSER_CLASSES[0],FastJSONParser)
+
+
+@override_settings(EMPLOYEE_LIST_CACHE=False)
+class AsyncEmployeeViewTests(EmployeeAPITestCase):
+    def test_list_matches_sync_view(self):
+        for payload in (
+            {"pagination":{"page":2,"row_count":4}},
+            {"pagination":{"page":9,"row_count":4}},
+            {"pagination":{"mode":"cursor","row_count":4}},
+            {"filtration_data":{"search":"engineer"},"include_count":False},
+            {"ordering":"-custom_fields.level"},
+        ):
+            sync = self.employee_list(payload)
+            response = self.client.post("/employees/async/list/",payload,format="json")
+            self.assertEqual((response.status_code,response.json()),(sync.status_code,sync.json()))
+
+    def test_single_employee_matches_sync_view(self):
+        employee = Employee.objects.filter(user=self.user).first()
+        sync = self.client.get(f"/employees/single-employee/?id={employee.id}")
+        response = self.client.get(f"/employees/async/single-employee/?id={employee.id}")
+        self.assertEqual(response.content,sync.content)
+        self.assertEqual(response["ETag"],sync["ETag"])
+        self.assertEqual(self.client.get(f"/employees/async/single-employee/?id={employee.id}",HTTP_IF_NONE_MATCH=sync["ETag"]).status_code,304)
+
+    def test_create_update_delete(self):
+        payload = {"name":"Async","email":"async@example.com","position":"Engineer","custom_fields":{}}
+        response = self.client.post("/employees/async/create/",payload,format="json")
+        self.assertEqual(response.status_code,200)
+        employee_id = response.json()["data"]["id"]
+        self.assertEqual(self.employee_list({}).json()["data"]["count"],11)
+
+        response = self.client.patch(f"/employees/async/update/?id={employee_id}",{**payload,"name":"Renamed"},format="json")
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(Employee.objects.get(id=employee_id).name,"Renamed")
+
+        self.assertEqual(self.client.delete(f"/employees/async/delete/?id={employee_id}").status_code,200)
+        self.assertEqual(self.employee_list({}).json()["data"]["count"],10)
+
+    def test_invalid_input_and_other_users_employee(self):
+        response = self.client.post("/employees/async/create/",{"name":"Missing fields"},format="json")
+        self.assertEqual(response.status_code,400)
+        other = Employee.objects.filter(user=self.other).first()
+        self.assertEqual(self.client.delete(f"/employees/async/delete/?id={other.id}").status_code,404)
+        self.assertTrue(Employee.objects.filter(id=other.id).exists())
+
+    def test_authentication_required(self):
+        response = APIClient().post("/employees/async/list/",{},format="json")
+        self.assertEqual(response.status_code,401)
+        self.assertIn("WWW-Authenticate",response)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        self.assertEqual(client.post("/employees/async/list/",{},format="json").status_code,401)
+
+
+class SQLiteProfileTests(TestCase):
+    def test_profiles(self):
+        self.assertEqual(sqlite_database("db.sqlite3",profile="default"),{"ENGINE":"django.db.backends.sqlite3","NAME":"db.sqlite3","OPTIONS":{}})
+        database = sqlite_database("db.sqlite3",synchronous="FULL",conn_max_age=0)
+        self.assertIn("PRAGMA journal_mode=WAL",database["OPTIONS"]["init_command"])
+        self.assertIn("PRAGMA synchronous=FULL",database["OPTIONS"]["init_command"])
+        self.assertEqual(database["OPTIONS"]["transaction_mode"],"IMMEDIATE")
+        self.assertNotIn("CONN_MAX_AGE",database)
+        with self.assertRaises(ValueError):
+            sqlite_database("db.sqlite3",profile="fastest")
+
+    def test_connection_uses_profile(self):
+        self.assertEqual(connection.transaction_mode,"IMMEDIATE")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            # NORMAL
+            self.assertEqual(cursor.fetchone()[0],1)
+
+
+class ReadReplicaRoutingTests(TransactionTestCase):
+    replica = "replica_test"
+
+    @classmethod
+    def setUpClass(cls):
+        # A second SQLite file stands in for the replica. It is only configured
+        # here, so the test runner neither checks nor creates it.
+        cls.databases = {"default",cls.replica}
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings[cls.replica] = connections.configure_settings({
+            "default":connections.settings["default"],
+            cls.replica:sqlite_database(os.path.join(cls.replica_dir.name,"replica.sqlite3"),conn_max_age=0),
+        })[cls.replica]
+        call_command("migrate",database=cls.replica,verbosity=0)
+        cls.replica_settings = override_settings(DATABASE_REPLICA_ALIASES=[cls.replica])
+        cls.replica_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.replica_settings.disable()
+        connections[cls.replica].close()
+        del connections[cls.replica]
+        del connections.settings[cls.replica]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user("reader","reader@example.com",9000000009,"secret1")
+        self.employee = Employee.objects.create(name="Primary",email="p@example.com",position="Engineer",custom_fields={},user=self.user)
+        # Replication stand-in: the replica holds an older copy of the same rows
+        self.user.save(using=self.replica,force_insert=True)
+        Employee(id=self.employee.id,name="Replica",email="p@example.com",position="Engineer",custom_fields={},user=self.user).save(using=self.replica,force_insert=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def employee_name(self):
+        return self.client.get(f"/employees/single-employee/?id={self.employee.id}").json()["data"]["name"]
+
+    def test_reads_use_replica(self):
+        self.assertEqual(self.employee_name(),"Replica")
+        self.assertEqual(self.client.get("/accounts/profile/").status_code,200)
+        self.assertEqual(Employee.objects.get(pk=self.employee.pk).name,"Replica")
+
+    def test_user_reads_own_writes_within_window(self):
+        payload = {"name":"Updated","email":"p@example.com","position":"Engineer","custom_fields":{}}
+        self.assertEqual(self.client.patch(f"/employees/update/?id={self.employee.id}",payload,format="json").status_code,200)
+        self.assertEqual(self.employee_name(),"Updated")
+
+        cache.delete(pin_key(self.user.id))
+        self.assertEqual(self.employee_name(),"Replica")
+
+    def test_transactions_read_primary(self):
+        with transaction.atomic():
+            self.assertEqual(Employee.objects.get(pk=self.employee.pk).name,"Primary")
+
+    def test_replicas_require_shared_cache(self):
+        env = {**os.environ,"SECRET_KEY":"x","DEBUG":"False","DATABASE_REPLICAS":os.path.join(self.replica_dir.name,"r.sqlite3")}
+        env.pop("CACHE_BACKEND",None)
+        result = subprocess.run(
+            [sys.executable,"-c","import employee_management.settings"],env=env,capture_output=True,text=True
+        )
+        self.assertNotEqual(result.returncode,0)
+        self.assertIn("DATABASE_REPLICAS needs a shared CACHE_BACKEND",result.stderr)
+
+
+class TenantShardingTests(TransactionTestCase):
+    shard = "shard_test"
+
+    @classmethod
+    def setUpClass(cls):
+        # Like the replica tests: a scratch SQLite file configured only here
+        cls.databases = {"default",cls.shard}
+        cls.shard_dir = tempfile.TemporaryDirectory()
+        connections.settings[cls.shard] = connections.configure_settings({
+            "default":connections.settings["default"],
+            cls.shard:sqlite_database(os.path.join(cls.shard_dir.name,"shard.sqlite3"),conn_max_age=0),
+        })[cls.shard]
+        cls.shard_settings = override_settings(EMPLOYEE_SHARD_ALIASES=["default",cls.shard])
+        cls.shard_settings.enable()
+        call_command("migrate",database=cls.shard,verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.shard_settings.disable()
+        connections[cls.shard].close()
+        del connections[cls.shard]
+        del connections.settings[cls.shard]
+        cls.shard_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user("tenant","tenant@example.com",9000000010,"secret1")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def create(self,name):
+        payload = {"name":name,"email":"e@example.com","position":"Engineer","custom_fields":{"level":1}}
+        return self.client.post("/employees/create/",payload,format="json")
+
+    def names(self):
+        response = self.client.post("/employees/list/",{},format="json")
+        return sorted(row["name"] for row in response.json()["data"]["row_data"])
+
+    def test_shard_holds_employees_tables_only(self):
+        tables = connections[self.shard].introspection.table_names()
+        self.assertIn("employees_employee",tables)
+        self.assertNotIn("employees_tenantshard",tables)
+        self.assertNotIn("accounts_customuser",tables)
+
+    def test_new_tenants_are_placed_by_hash(self):
+        self.assertEqual(TenantShard.objects.get(user=self.user).database,hash_shard(self.user.pk))
+
+    def test_views_route_to_tenant_shard(self):
+        set_placement(self.user.pk,self.shard,moving=False)
+        self.assertEqual(self.create("Sharded").status_code,200)
+        employee = Employee.objects.using(self.shard).get(user=self.user)
+        self.assertFalse(Employee.objects.using("default").exists())
+        self.assertEqual(EmployeeCount.objects.using(self.shard).get(user=self.user).count,1)
+
+        self.assertEqual(self.names(),["Sharded"])
+        response = self.client.get(f"/employees/single-employee/?id={employee.id}")
+        self.assertEqual(response.json()["data"]["name"],"Sharded")
+        with override_settings(EMPLOYEE_LIST_CACHE=True):
+            self.assertEqual(self.names(),["Sharded"])
+            for url,name in (("/employees/update/","Renamed"),("/employees/async/update/","Sharded")):
+                payload = {"name":name,"email":"e@example.com","position":"Engineer","custom_fields":{}}
+                self.assertEqual(self.client.patch(f"{url}?id={employee.id}",payload,format="json").status_code,200)
+                self.assertEqual(self.names(),[name])
+        self.assertEqual(self.client.delete(f"/employees/delete/?id={employee.id}").status_code,200)
+        self.assertFalse(Employee.objects.using(self.shard).exists())
+
+    def test_writes_refused_while_moving(self):
+        set_placement(self.user.pk,"default",moving=True)
+        response = self.create("Blocked")
+        self.assertEqual(response.status_code,503)
+        self.assertEqual(response["Retry-After"],str(settings.EMPLOYEE_SHARD_CACHE_TIMEOUT))
+        payload = {"name":"Blocked","email":"e@example.com","position":"Engineer","custom_fields":{}}
+        response = self.client.post("/employees/async/create/",payload,format="json")
+        self.assertEqual(response.status_code,503)
+        self.assertIn("Retry-After",response)
+        self.assertFalse(Employee.objects.exists())
+
+    def test_move_tenant(self):
+        set_placement(self.user.pk,"default",moving=False)
+        for name in ("First","Second"):
+            self.assertEqual(self.create(name).status_code,200)
+        self.assertEqual(self.client.post("/employees/custom-field-indexes/",{"key":"level"},format="json").status_code,201)
+        created = dict(Employee.objects.values_list('name','created_at'))
+
+        out = io.StringIO()
+        call_command("rebalance_employee_shards",user=str(self.user.pk),to=self.shard,grace=0,stdout=out)
+        self.assertIn("1 tenant(s) moved",out.getvalue())
+        self.assertEqual(TenantShard.objects.get(user=self.user).database,self.shard)
+        self.assertFalse(Employee.objects.using("default").exists())
+        self.assertEqual(dict(Employee.objects.using(self.shard).values_list('name','created_at')),created)
+        self.assertTrue(CustomFieldIndex.objects.using(self.shard).filter(user=self.user,key="level").exists())
+
+        self.assertEqual(self.names(),["First","Second"])
+        self.assertEqual(self.create("Third").status_code,200)
+        self.assertEqual(self.client.post("/employees/list/",{},format="json").json()["data"]["count"],3)
+
+    def test_resume_import_on_shard(self):
+        set_placement(self.user.pk,self.shard,moving=False)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name,"people.ndjson")
+        with open(path,"w") as f:
+            for index in range(3):
+                f.write(json.dumps({"name":f"Line {index}","email":f"line{index}@example.com","position":"Ops","custom_fields":{}}) + "\n")
+        job = EmployeeImport.objects.using(self.shard).create(
+            user=self.user,source_name=path,format="ndjson",chunk_size=1,rows_processed=1,chunks_committed=1,
+            status=EmployeeImport.FAILED
+        )
+
+        with override_settings(EMPLOYEE_IMPORT_DIR=directory.name):
+            call_command("import_employees",path,resume=str(job.id),stdout=io.StringIO())
+            job = EmployeeImport.objects.using(self.shard).get(id=job.id)
+            self.assertEqual((job.status,job.rows_processed,job.rows_created),("completed",3,2))
+            self.assertEqual(sorted(Employee.objects.using(self.shard).values_list('name',flat=True)),["Line 1","Line 2"])
+            with self.assertRaisesMessage(CommandError,"not found"):
+                call_command("import_employees",path,resume=str(uuid.uuid4()),stdout=io.StringIO())
+
+            # New imports are recorded on the tenant's shard too, so they can be resumed
+            Employee.objects.using(self.shard).all().delete()
+            call_command("import_employees",path,user=self.user.username,stdout=io.StringIO())
+        self.assertEqual(EmployeeImport.objects.using(self.shard).count(),2)
+        self.assertFalse(EmployeeImport.objects.using("default").exists())
+
+    def test_rebalance_dry_run(self):
+        set_placement(self.user.pk,"default" if hash_shard(self.user.pk) == self.shard else self.shard,moving=False)
+        out = io.StringIO()
+        call_command("rebalance_employee_shards",rebalance=True,dry_run=True,stdout=out)
+        self.assertIn(f"{self.user.pk}:",out.getvalue())
+        self.assertNotEqual(TenantShard.objects.get(user=self.user).database,hash_shard(self.user.pk))
+
+    def test_user_deletion_purges_shard(self):
+        set_placement(self.user.pk,self.shard,moving=False)
+        self.create("Orphan")
+        self.user.delete()
+        self.assertFalse(Employee.objects.using(self.shard).exists())
+
+    def test_new_shard_only_claims_tenants(self):
+        tenants = [uuid.uuid4() for _ in range(200)]
+        before = {tenant:hash_shard(tenant,["default","shard_a"]) for tenant in tenants}
+        after = {tenant:hash_shard(tenant,["default","shard_a","shard_b"]) for tenant in tenants}
+        moved = [tenant for tenant in tenants if before[tenant] != after[tenant]]
+        self.assertTrue(moved)
+        self.assertTrue(all(after[tenant] == "shard_b" for tenant in moved))
+
+
+class ServerTimingTests(EmployeeAPITestCase):
+    def timing(self,response):
+        return dict(
+            (metric.split(";")[0],metric) for metric in response["Server-Timing"].split(", ")
+        )
+
+    def test_off_by_default(self):
+        self.assertFalse(self.employee_list({}).has_header("Server-Timing"))
+
+    @override_settings(SERVER_TIMING=True,EMPLOYEE_LIST_CACHE=False)
+    def test_list_phases_in_header_and_log(self):
+        with self.assertLogs("request_timing","INFO") as logs:
+            response = self.employee_list({"filtration_data":{"position":"Engineer"}})
+        self.assertEqual(response.status_code,200)
+        metrics = self.timing(response)
+        self.assertEqual(list(metrics),["auth","parse","db","serialize","render","total"])
+        self.assertRegex(metrics["db"],r'^db;desc="\d+ queries";dur=\d+\.\d{2}$')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record["method"],record["path"],record["status"]),("POST","/employees/list/",200))
+        self.assertGreater(record["db_queries"],0)
+        self.assertIn(f'desc="{record["db_queries"]} queries"',metrics["db"])
+
+    @override_settings(SERVER_TIMING=True,EMPLOYEE_LIST_CACHE=False)
+    def test_async_views_are_timed(self):
+        with self.assertLogs("request_timing","INFO"):
+            response = self.client.post("/employees/async/list/",{},format="json")
+        self.assertEqual(response.status_code,200)
+        metrics = self.timing(response)
+        self.assertIn("auth",metrics)
+        self.assertIn("render",metrics)
+        # Queries run in sync_to_async threads still count towards the request
+        self.assertNotIn('desc="0 queries"',metrics["db"])
+
+
+class MetricsTests(EmployeeAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS_ENABLED=True,METRICS_TOKEN="scrape-secret",METRICS_DIR=self.directory))
+        registry.reset()
+
+    def scrape(self):
+        response = Client().get("/metrics/",HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code,200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith("#"):
+                series,value = line.rsplit(" ",1)
+                samples[series] = float(value)
+        return samples
+
+    @override_settings(EMPLOYEE_LIST_CACHE=False)
+    def test_requests_latency_and_queries_per_view(self):
+        self.employee_list({})
+        self.employee_list({})
+        self.client.get("/employees/single-employee/",{"id":uuid.uuid4()})
+        samples = self.scrape()
+        self.assertEqual(samples['http_requests_total{method="POST",status="200",view="EmployeeList"}'],2)
+        self.assertEqual(samples['http_requests_total{method="GET",status="404",view="SingleEmployeeOverview"}'],1)
+        self.assertEqual(samples['http_request_duration_seconds_count{view="EmployeeList"}'],2)
+        self.assertEqual(samples['http_request_duration_seconds_bucket{view="EmployeeList",le="+Inf"}'],2)
+        self.assertGreater(samples['http_request_duration_seconds_sum{view="EmployeeList"}'],0)
+        self.assertGreaterEqual(samples['db_queries_total{view="EmployeeList"}'],2)
+
+    def test_cache_hits_and_misses(self):
+        employee = Employee.objects.filter(user=self.user).first()
+        self.client.get("/employees/single-employee/",{"id":employee.id})
+        self.client.get("/employees/single-employee/",{"id":employee.id})
+        samples = self.scrape()
+        self.assertEqual(samples['cache_requests_total{cache="employee_detail",result="miss"}'],1)
+        self.assertEqual(samples['cache_requests_total{cache="employee_detail",result="hit"}'],1)
+
+    def test_workers_are_summed(self):
+        # Same pid as this process, as when a recycled worker reuses an exited one's pid
+        other = MetricsRegistry()
+        other.inc("http_requests_total",view="EmployeeList",method="POST",status=200)
+        other.observe("http_request_duration_seconds",20,view="EmployeeList")
+        other.flush(force=True)
+        self.employee_list({})
+        samples = self.scrape()
+        registry.flush(force=True)
+        self.assertEqual(len(os.listdir(self.directory)),2)
+        self.assertEqual(samples['http_requests_total{method="POST",status="200",view="EmployeeList"}'],2)
+        self.assertEqual(samples['http_request_duration_seconds_count{view="EmployeeList"}'],2)
+        self.assertEqual(samples['http_request_duration_seconds_bucket{view="EmployeeList",le="10"}'],1)
+
+    def test_token(self):
+        self.assertEqual(Client().get("/metrics/").status_code,403)
+        self.assertEqual(Client().get("/metrics/",HTTP_AUTHORIZATION="Bearer wrong").status_code,403)
+
+    def test_disabled_and_misconfigured(self):
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(Client().get("/metrics/").status_code,404)
+        for missing in ({"METRICS_TOKEN":""},{"METRICS_DIR":""}):
+            with override_settings(**missing), self.assertRaises(ImproperlyConfigured):
+                Client().get("/employees/list/")
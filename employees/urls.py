@@ -1,12 +1,32 @@
 from django.urls import path
 from .views import *
+from .async_views import (
+    AsyncEmployeeCreate,
+    AsyncEmployeeUpdate,
+    AsyncEmployeeList,
+    AsyncEmployeeDelete,
+    AsyncSingleEmployeeOverview
+)
 
 urlpatterns = [
     path('create/',EmployeeCreate.as_view()),
+    path('bulk-create/',EmployeeBulkCreate.as_view()),
+    path('import/',EmployeeImportView.as_view()),
+    path('import/errors/',EmployeeImportErrors.as_view()),
     path('update/',EmployeeUpdate.as_view()),
+    path('bulk-update/',EmployeeBulkUpdate.as_view()),
     path('list/',EmployeeList.as_view()),
+    path('export/',EmployeeExport.as_view()),
     path('delete/',EmployeeDelete.as_view()),
-    path('single-employee/',SingleEmployeeOverview.as_view())
+    path('bulk-delete/',EmployeeBulkDelete.as_view()),
+    path('single-employee/',SingleEmployeeOverview.as_view()),
+    path('custom-field-indexes/',CustomFieldIndexes.as_view()),
+    # Async views for ASGI deployments; same payloads and responses as above
+    path('async/create/',AsyncEmployeeCreate.as_view()),
+    path('async/update/',AsyncEmployeeUpdate.as_view()),
+    path('async/list/',AsyncEmployeeList.as_view()),
+    path('async/delete/',AsyncEmployeeDelete.as_view()),
+    path('async/single-employee/',AsyncSingleEmployeeOverview.as_view())
 ]
     
     
\ No newline at end of file
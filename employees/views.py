@@ -1,7 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from  rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import CachedJWTAuthentication
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.utils import timezone
+from django.http import StreamingHttpResponse, FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import MultiPartParser
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from drf_yasg import openapi
@@ -10,11 +16,22 @@ from utils import (
     internal_server_error_response,
     invalid_inputs,
     pagination_processing,
-    filtration_processing
+    cursor_pagination_processing,
+    InvalidFiltration
 )
 from .serializers import (
     EmployeeWriteSerializer,
-    EmployeeReadSerializer
+    EmployeeReadSerializer,
+    EmployeeBulkCreateSerializer,
+    EmployeeBulkSelectionSerializer,
+    EmployeeBulkUpdateSerializer,
+    EmployeeListSerializer,
+    EmployeeExportSerializer,
+    EmployeeImportSerializer,
+    EmployeeImportReadSerializer,
+    EMPLOYEE_READ_FIELDS,
+    serialize_employee_rows,
+    validate_employee_records
 )
 from .helpers import (
     employee_create_success,
@@ -22,13 +39,47 @@ from .helpers import (
     employee_not_found,
     employee_success_list,
     employee_delete_success,
-    employee_detail_success
+    employee_detail_success,
+    custom_field_index_list,
+    custom_field_index_created,
+    custom_field_index_deleted,
+    custom_field_index_not_found,
+    custom_field_index_limit_reached,
+    custom_field_index_total_limit_reached,
+    employee_bulk_create_success,
+    employee_bulk_limit_exceeded,
+    employee_bulk_update_success,
+    employee_bulk_delete_success,
+    employee_import_success,
+    employee_import_status,
+    employee_import_not_found,
+    employee_import_unknown_format,
+    employee_import_already_completed,
+    employee_import_in_progress,
+    employee_tenant_moving,
+    tenant_moving_headers
 )
-from .models import Employee
+from .models import Employee, CustomFieldIndex, EmployeeImport
+from .counters import adjust_employee_count, get_employee_count
+from .sharding import TenantMoving, tenant_atomic
+from .queries import employee_list_query, filtered_employees, selected_employees
+from .exports import EXPORT_FORMATS
+from .caching import (
+    employee_validators,
+    get_cached_detail,
+    set_cached_detail,
+    employee_list_cache_key,
+    invalidate_employee_lists
+)
+from utils.result_cache import get_result_cache
+from .importer import EmployeeImporter, claim_import, detect_format, error_file_path
+from .custom_fields import declare_hot_key, withdraw_hot_key, hot_key_limit_reached, hot_key_total_limit_reached
         
 class EmployeeCreate(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    # Seeding a missing EmployeeCount accounts for five of these
+    query_budget = 10
 
     @swagger_auto_schema(
     operation_description="Create Eemployee",
@@ -41,16 +92,175 @@ class EmployeeCreate(APIView):
             if not serializer.is_valid():
                 return Response(invalid_inputs(serializer.errors),status=status.HTTP_400_BAD_REQUEST)
             
-            serializer.save()        
+            with tenant_atomic(request.user):
+                serializer.save()
+                adjust_employee_count(request.user,1)
+                invalidate_employee_lists(request.user)
             return Response(employee_create_success(serializer.data),status=status.HTTP_200_OK)
         
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EmployeeBulkCreate(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    # Room for 20 INSERT batches, EMPLOYEE_BULK_MAX_ITEMS at the default batch size
+    query_budget = 30
+
+    @swagger_auto_schema(
+    operation_description="Create many employees in one request. Invalid records are reported per index "
+    "and skipped; the valid ones are inserted in batches inside one transaction. created_ids follows "
+    "input order, with null for rejected records.",
+    operation_id="employee bulk create",
+    request_body=EmployeeBulkCreateSerializer
+    )
+    def post(self,request):
+        try:
+            payload = EmployeeBulkCreateSerializer(data=request.data)
+            if not payload.is_valid():
+                return Response(invalid_inputs(payload.errors),status=status.HTTP_400_BAD_REQUEST)
+
+            records = payload.validated_data["employees"]
+            if len(records) > settings.EMPLOYEE_BULK_MAX_ITEMS:
+                return Response(employee_bulk_limit_exceeded(settings.EMPLOYEE_BULK_MAX_ITEMS),status=status.HTTP_400_BAD_REQUEST)
+
+            valid,errors = validate_employee_records(records)
+            if not valid:
+                return Response(invalid_inputs(errors),status=status.HTTP_400_BAD_REQUEST)
+
+            batch_size = payload.validated_data.get("batch_size",settings.EMPLOYEE_BULK_BATCH_SIZE)
+            employees = [Employee(user=request.user,**data) for _,data in valid]
+            with tenant_atomic(request.user):
+                Employee.objects.bulk_create(employees,batch_size=batch_size)
+                adjust_employee_count(request.user,len(employees))
+                invalidate_employee_lists(request.user)
+
+            created_ids = [None] * len(records)
+            for (index,_),employee in zip(valid,employees):
+                created_ids[index] = str(employee.id)
+            data = {"created_ids":created_ids,"created_count":len(employees),"errors":errors}
+            return Response(employee_bulk_create_success(data),status=status.HTTP_200_OK)
+
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EmployeeImportView(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    # Unchecked: grows with the number of chunks in the upload
+    query_budget = None
+
+    @swagger_auto_schema(
+    operation_description="Import a CSV or NDJSON upload, committing every chunk_size rows. "
+    "Send import_id with the same file to resume a failed or stalled import after the last committed chunk.",
+    operation_id="employee import",
+    request_body=EmployeeImportSerializer
+    )
+    def post(self,request):
+        try:
+            serializer = EmployeeImportSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(invalid_inputs(serializer.errors),status=status.HTTP_400_BAD_REQUEST)
+
+            upload = serializer.validated_data["file"]
+            import_id = serializer.validated_data.get("import_id")
+            if import_id:
+                job = EmployeeImport.objects.get(id=import_id,user=request.user)
+                if not claim_import(job):
+                    if job.status == EmployeeImport.COMPLETED:
+                        return Response(employee_import_already_completed(),status=status.HTTP_409_CONFLICT)
+                    return Response(employee_import_in_progress(),status=status.HTTP_409_CONFLICT)
+            else:
+                import_format = serializer.validated_data.get("format") or detect_format(upload.name)
+                if import_format is None:
+                    return Response(employee_import_unknown_format(),status=status.HTTP_400_BAD_REQUEST)
+                job = EmployeeImport.objects.create(
+                    user=request.user,
+                    source_name=upload.name,
+                    format=import_format,
+                    chunk_size=serializer.validated_data.get("chunk_size",settings.EMPLOYEE_IMPORT_CHUNK_SIZE)
+                )
+
+            # Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are already spooled to disk
+            EmployeeImporter(job,upload.file).run()
+            return Response(employee_import_success(EmployeeImportReadSerializer(job).data),status=status.HTTP_200_OK)
+
+        except EmployeeImport.DoesNotExist:
+            return Response(employee_import_not_found(),status=status.HTTP_404_NOT_FOUND)
+
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @swagger_auto_schema(
+    operation_description="Import progress",
+    operation_id="employee import status",
+    manual_parameters=[
+            openapi.Parameter('id',
+            openapi.IN_QUERY,
+            description="Import ID",
+            type=openapi.TYPE_STRING,
+            required=True
+            )
+        ]
+    )
+    def get(self,request):
+        try:
+            job = EmployeeImport.objects.get(id=request.GET.get('id'),user=request.user)
+            return Response(employee_import_status(EmployeeImportReadSerializer(job).data),status=status.HTTP_200_OK)
+
+        except EmployeeImport.DoesNotExist:
+            return Response(employee_import_not_found(),status=status.HTTP_404_NOT_FOUND)
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EmployeeImportErrors(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+
+    @swagger_auto_schema(
+    operation_description="Download the rejected rows of an import as NDJSON",
+    operation_id="employee import errors",
+    manual_parameters=[
+            openapi.Parameter('id',
+            openapi.IN_QUERY,
+            description="Import ID",
+            type=openapi.TYPE_STRING,
+            required=True
+            )
+        ]
+    )
+    def get(self,request):
+        try:
+            job = EmployeeImport.objects.get(id=request.GET.get('id'),user=request.user)
+            errors = open(error_file_path(job),"rb")
+            return FileResponse(errors,content_type="application/x-ndjson",as_attachment=True,filename=f"{job.id}.errors.ndjson")
+
+        except (EmployeeImport.DoesNotExist,FileNotFoundError):
+            return Response(employee_import_not_found(),status=status.HTTP_404_NOT_FOUND)
+
         except Exception as e:
             return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class EmployeeUpdate(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 5
 
     @swagger_auto_schema(
     operation_description="Update Employee",
@@ -69,53 +279,218 @@ class EmployeeUpdate(APIView):
         try:
             employee_id = request.GET.get('id')
             
-            instance = Employee.objects.get(id=employee_id)
+            instance = Employee.objects.get(id=employee_id,user=request.user)
             serializer = EmployeeWriteSerializer(instance=instance,data=request.data) 
             if not serializer.is_valid():
                 return Response(invalid_inputs(serializer.errors),status=status.HTTP_400_BAD_REQUEST)
               
-            serializer.save()
+            with tenant_atomic(instance.user_id):
+                serializer.save()
+                invalidate_employee_lists(instance.user_id)
             return Response(employee_update_success(),status=status.HTTP_200_OK)
         
         except Employee.DoesNotExist:
             return Response(employee_not_found(),status=status.HTTP_404_NOT_FOUND)
         
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
         except Exception as e:
             return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 
+class EmployeeBulkUpdate(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+
+    @swagger_auto_schema(
+    operation_description="Apply the same changes to every employee selected by ids or by an "
+    "EmployeeList filtration_data payload, in one UPDATE statement",
+    operation_id="employee bulk update",
+    request_body=EmployeeBulkUpdateSerializer
+    )
+    def patch(self,request):
+        try:
+            serializer = EmployeeBulkUpdateSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(invalid_inputs(serializer.errors),status=status.HTTP_400_BAD_REQUEST)
+
+            employees = selected_employees(
+                request.user,
+                ids=serializer.validated_data.get("ids"),
+                filtration_data=serializer.validated_data.get("filtration_data")
+            )
+            # QuerySet.update() skips auto_now, so stamp updated_at explicitly
+            affected = employees.update(**serializer.validated_data["data"],updated_at=timezone.now())
+            invalidate_employee_lists(request.user)
+            return Response(employee_bulk_update_success({"affected":affected}),status=status.HTTP_200_OK)
+
+        except InvalidFiltration as e:
+            return Response(invalid_inputs(str(e)),status=status.HTTP_400_BAD_REQUEST)
+
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class EmployeeBulkDelete(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    query_budget = 10
+
+    @swagger_auto_schema(
+    operation_description="Delete every employee selected by ids or by an EmployeeList "
+    "filtration_data payload, in one DELETE statement",
+    operation_id="employee bulk delete",
+    request_body=EmployeeBulkSelectionSerializer
+    )
+    def delete(self,request):
+        try:
+            serializer = EmployeeBulkSelectionSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(invalid_inputs(serializer.errors),status=status.HTTP_400_BAD_REQUEST)
+
+            employees = selected_employees(
+                request.user,
+                ids=serializer.validated_data.get("ids"),
+                filtration_data=serializer.validated_data.get("filtration_data")
+            )
+            with tenant_atomic(request.user):
+                # Employee has no dependants or delete signals, so this is a single fast DELETE
+                affected,_ = employees.delete()
+                adjust_employee_count(request.user,-affected)
+                invalidate_employee_lists(request.user)
+            return Response(employee_bulk_delete_success({"affected":affected}),status=status.HTTP_200_OK)
+
+        except InvalidFiltration as e:
+            return Response(invalid_inputs(str(e)),status=status.HTTP_400_BAD_REQUEST)
+
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class EmployeeList(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 8
 
     @swagger_auto_schema(
-    operation_description="Employee List",
+    operation_description="Employee List. Pagination defaults to page numbers "
+    "({\"page\":1,\"row_count\":30}); send {\"mode\":\"cursor\",\"cursor\":...,\"row_count\":30} "
+    "for keyset pagination using the returned next_cursor/prev_cursor. "
+    "Send \"include_count\": false to skip the total count. filtration_data.search runs a ranked "
+    "prefix full-text search over name, email, position and custom field values. "
+    "filtration_data.custom_fields filters by key ({\"level\":3} or {\"level\":{\"gte\":2,\"in\":[2,3]}}) "
+    "and \"ordering\": \"-custom_fields.level\" sorts by a key (page mode only).",
     operation_id="employee list"
     )     
     def post(self,request):
         try:
-            filtration_data = request.data.get("filtration_data",None)
-            pagination_data = request.data.get("pagination",None)
+            payload = EmployeeListSerializer(data=request.data)
+            if not payload.is_valid():
+                return Response(invalid_inputs(payload.errors),status=status.HTTP_400_BAD_REQUEST)
+
+            # The key embeds the user's list version, read before any rows are
+            cache_key = employee_list_cache_key(request.user,request.data) if settings.EMPLOYEE_LIST_CACHE else None
+            if cache_key:
+                cached = get_result_cache().get(cache_key)
+                if cached is not None:
+                    response = Response(cached,status=status.HTTP_200_OK)
+                    response["X-Cache"] = "HIT"
+                    return response
+
+            pagination_data = payload.validated_data.get("pagination")
+            include_count = payload.validated_data["include_count"]
+            employees,filtered,cursor_mode = employee_list_query(request.user,request.data)
+
+            employees_count = None
+            if include_count:
+                # Unfiltered lists read the denormalized counter instead of COUNT(*)
+                employees_count = employees.count() if filtered else get_employee_count(request.user)
 
-            q_object = filtration_processing(filtration_data)
-            employees = Employee.objects.filter(*q_object,user=request.user).order_by('-created_at')
-            employees_count = employees.count()
-            paged_employees = pagination_processing(pagination_data,employees)
+            fast_serialization = settings.EMPLOYEE_FAST_SERIALIZATION
+            if fast_serialization:
+                # Fetch only the serialized columns as dicts instead of model instances
+                employees = employees.values(*EMPLOYEE_READ_FIELDS)
+
+            if cursor_mode:
+                paged_employees = cursor_pagination_processing(pagination_data,employees)
+            else:
+                paged_employees = pagination_processing(pagination_data,employees,count=employees_count)
 
             if paged_employees["status"] == status.HTTP_200_OK:
-                serializer = EmployeeReadSerializer(paged_employees["data"],many=True)
-                return Response(employee_success_list({"row_data":serializer.data,"count":employees_count}),status=status.HTTP_200_OK)
-            return Response(paged_employees,status=status.HTTP_404_NOT_FOUND)
+                if fast_serialization:
+                    row_data = serialize_employee_rows(paged_employees["data"])
+                else:
+                    row_data = EmployeeReadSerializer(paged_employees["data"],many=True).data
+                data = {"row_data":row_data,"count":employees_count}
+                if "next_cursor" in paged_employees:
+                    data["next_cursor"] = paged_employees["next_cursor"]
+                    data["prev_cursor"] = paged_employees["prev_cursor"]
+                response_data = employee_success_list(data)
+                if cache_key:
+                    get_result_cache().set(cache_key,response_data)
+                response = Response(response_data,status=status.HTTP_200_OK)
+                response["X-Cache"] = "MISS" if cache_key else "BYPASS"
+                return response
+            return Response(paged_employees,status=paged_employees["status"])
+
+        except InvalidFiltration as e:
+            return Response(invalid_inputs(str(e)),status=status.HTTP_400_BAD_REQUEST)
         
         except Employee.DoesNotExist:
             return Response(employee_not_found(),status=status.HTTP_404_NOT_FOUND)
         
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
         except Exception as e:
             return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class EmployeeExport(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    # Rows are streamed after the response starts and aren't counted
+    query_budget = 1
+
+    @swagger_auto_schema(
+    operation_description="Stream the employees matching filtration_data as CSV (custom_fields "
+    "flattened into custom_fields.<key> columns) or NDJSON",
+    operation_id="employee export",
+    request_body=EmployeeExportSerializer
+    )
+    def post(self,request):
+        try:
+            serializer = EmployeeExportSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(invalid_inputs(serializer.errors),status=status.HTTP_400_BAD_REQUEST)
+
+            export_format = serializer.validated_data["format"]
+            employees,_ = filtered_employees(request.user,serializer.validated_data.get("filtration_data"))
+            stream,content_type = EXPORT_FORMATS[export_format]
+            # Bind the shard now: the body is streamed after the request's routing state is gone
+            employees = employees.using(employees.db).order_by('-created_at','-id')
+            response = StreamingHttpResponse(stream(employees),content_type=content_type)
+            response["Content-Disposition"] = f'attachment; filename="employees.{export_format}"'
+            return response
+
+        except InvalidFiltration as e:
+            return Response(invalid_inputs(str(e)),status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class EmployeeDelete(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 11
 
     @swagger_auto_schema(
     operation_description="Employee Delete",
@@ -132,20 +507,27 @@ class EmployeeDelete(APIView):
     def delete(self,request):
         try:
             employee_id = request.GET.get('id')
-            employee = Employee.objects.get(id=employee_id)
-            employee.delete()
+            employee = Employee.objects.get(id=employee_id,user=request.user)
+            with tenant_atomic(employee.user_id):
+                employee.delete()
+                adjust_employee_count(employee.user_id,-1)
+                invalidate_employee_lists(employee.user_id)
             return Response(employee_delete_success(),status=status.HTTP_200_OK)
 
         except Employee.DoesNotExist:
             return Response(employee_not_found(),status=status.HTTP_404_NOT_FOUND)
         
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
         except Exception as e:
             return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 
 class SingleEmployeeOverview(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     @swagger_auto_schema(
     operation_description="Single Employee Record",
@@ -162,12 +544,111 @@ class SingleEmployeeOverview(APIView):
     def get(self,request):
         try:
             employee_id = request.GET.get('id')
-            role = Employee.objects.get(id=employee_id)
-            serializer = EmployeeReadSerializer(role)
-            return Response(employee_detail_success(serializer.data),status=status.HTTP_200_OK)
+            updated_at = Employee.objects.filter(id=employee_id,user=request.user).values_list('updated_at',flat=True).first()
+            if updated_at is None:
+                raise Employee.DoesNotExist
+
+            etag,last_modified = employee_validators(employee_id,updated_at)
+            not_modified = get_conditional_response(request,etag=etag,last_modified=int(updated_at.timestamp()))
+            if not_modified is not None:
+                return self.with_validators(not_modified,etag,last_modified)
+
+            # Rendered bytes are only reusable for the plain JSON representation
+            json_response = isinstance(request.accepted_renderer,JSONRenderer)
+            body = get_cached_detail(employee_id,updated_at) if json_response else None
+            if body is None:
+                employee = Employee.objects.get(id=employee_id,user=request.user)
+                data = employee_detail_success(EmployeeReadSerializer(employee).data)
+                if not json_response:
+                    return self.with_validators(Response(data,status=status.HTTP_200_OK),etag,last_modified)
+                body = request.accepted_renderer.render(data,request.accepted_media_type,self.get_renderer_context())
+                set_cached_detail(employee_id,updated_at,body)
+
+            response = HttpResponse(body,content_type=request.accepted_media_type,status=status.HTTP_200_OK)
+            return self.with_validators(response,etag,last_modified)
         
         except Employee.DoesNotExist:
             return Response(employee_not_found(),status=status.HTTP_404_NOT_FOUND)
         
         except Exception as e:
-            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def with_validators(self,response,etag,last_modified):
+        response["ETag"] = etag
+        response["Last-Modified"] = last_modified
+        # Clients may keep the body but must revalidate it, which is cheap
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class CustomFieldIndexes(APIView):
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    query_budget = 8
+
+    @swagger_auto_schema(
+    operation_description="Custom field keys declared as hot",
+    operation_id="custom field index list"
+    )
+    def get(self,request):
+        try:
+            keys = CustomFieldIndex.objects.filter(user=request.user).order_by('key').values_list('key',flat=True)
+            return Response(custom_field_index_list(list(keys)),status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @swagger_auto_schema(
+    operation_description="Declare a custom field key as hot so filters and ordering on it are index-backed "
+    "once sync_custom_field_indexes has built its index",
+    operation_id="custom field index create",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={"key":openapi.Schema(type=openapi.TYPE_STRING)},
+        required=["key"]
+        )
+    )
+    def post(self,request):
+        try:
+            key = request.data.get("key")
+            if not CustomFieldIndex.objects.filter(user=request.user,key=key).exists():
+                if hot_key_limit_reached(request.user):
+                    return Response(custom_field_index_limit_reached(),status=status.HTTP_400_BAD_REQUEST)
+                if hot_key_total_limit_reached(request.user,key):
+                    return Response(custom_field_index_total_limit_reached(),status=status.HTTP_400_BAD_REQUEST)
+
+            declare_hot_key(request.user,key)
+            return Response(custom_field_index_created({"key":key}),status=status.HTTP_201_CREATED)
+
+        except InvalidFiltration as e:
+            return Response(invalid_inputs(str(e)),status=status.HTTP_400_BAD_REQUEST)
+
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @swagger_auto_schema(
+    operation_description="Withdraw a hot custom field key",
+    operation_id="custom field index delete",
+    manual_parameters=[
+            openapi.Parameter('key',
+            openapi.IN_QUERY,
+            description="Custom field key",
+            type=openapi.TYPE_STRING,
+            required=True
+            )
+        ]
+    )
+    def delete(self,request):
+        try:
+            if not withdraw_hot_key(request.user,request.GET.get('key')):
+                return Response(custom_field_index_not_found(),status=status.HTTP_404_NOT_FOUND)
+            return Response(custom_field_index_deleted(),status=status.HTTP_200_OK)
+
+        except TenantMoving:
+            return Response(employee_tenant_moving(),status=status.HTTP_503_SERVICE_UNAVAILABLE,headers=tenant_moving_headers())
+
+        except Exception as e:
+            return Response(internal_server_error_response(e),status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -5,5 +5,20 @@ from .response_messages import (
     )
 from .filtration_pagination import (
     pagination_processing,
-    filtration_processing
+    apagination_processing,
+    cursor_pagination_processing,
+    acursor_pagination_processing,
+    decode_cursor,
+    filtration_processing,
+    FILTRATION_KEYS,
+    ordering_processing
+)
+from .json_keys import (
+    InvalidFiltration,
+    JSONKeyValue,
+    validate_json_key
+)
+from .json_renderers import (
+    FastJSONParser,
+    FastJSONRenderer
 )
\ No newline at end of file
@@ -0,0 +1,74 @@
+import io
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+
+from .json_renderers import FastJSONParser, FastJSONRenderer
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of APIView for handlers written with Django's async ORM.
+
+    DRF's APIView dispatches synchronously, so this view authenticates, parses
+    and renders itself: authentication classes must implement `aauthenticate`,
+    JSON bodies are exposed as `request.data` and handlers return plain data
+    with `self.respond(data,status)`. Errors raised before the handler runs are
+    rendered the way DRF's exception handler renders them.
+    """
+    authentication_classes = []
+    # Equivalent of permission_classes = [IsAuthenticated]
+    authentication_required = True
+    parser = FastJSONParser()
+    renderer = FastJSONRenderer()
+
+    @classonlymethod
+    def as_view(cls,**initkwargs):
+        # Token authenticated like APIView, so not subject to CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self,request,*args,**kwargs):
+        try:
+            request.user,request.auth = await self.authenticate(request)
+            if self.authentication_required and not request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            request.data = self.parse(request)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request,exc)
+        return await super().dispatch(request,*args,**kwargs)
+
+    async def authenticate(self,request):
+        for authentication_class in self.authentication_classes:
+            authenticated = await authentication_class().aauthenticate(request)
+            if authenticated is not None:
+                return authenticated
+        return AnonymousUser(),None
+
+    def parse(self,request):
+        if not request.body:
+            return {}
+        if request.content_type != self.parser.media_type:
+            raise exceptions.UnsupportedMediaType(request.content_type)
+        return self.parser.parse(io.BytesIO(request.body),parser_context={"encoding":request.encoding or "utf-8"})
+
+    def handle_exception(self,request,exc):
+        headers = {}
+        if isinstance(exc,(exceptions.NotAuthenticated,exceptions.AuthenticationFailed)):
+            if self.authentication_classes:
+                headers["WWW-Authenticate"] = self.authentication_classes[0]().authenticate_header(request)
+            else:
+                exc.status_code = status.HTTP_403_FORBIDDEN
+        data = exc.detail if isinstance(exc.detail,(list,dict)) else {"detail":exc.detail}
+        return self.respond(data,exc.status_code,headers=headers)
+
+    def respond(self,data,status_code,headers=None):
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type=self.renderer.media_type,
+            status=status_code,
+            headers=headers
+        )
@@ -1,22 +1,51 @@
+import base64
+import datetime
+import json
+import uuid
+
 from django.core.paginator import Paginator,EmptyPage
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import status
 
+from .json_keys import InvalidFiltration, json_key_lookups, json_key_ordering
+
+def local_day_bounds(value):
+    day = parse_date(value)
+    if day is None:
+        raise InvalidFiltration(f"Invalid date {value}")
+    start = timezone.make_aware(datetime.datetime.combine(day,datetime.time.min))
+    return start,timezone.make_aware(datetime.datetime.combine(day + datetime.timedelta(days=1),datetime.time.min))
+
+
+# filtration_data keys EmployeeList understands; "search" is applied by the caller
+FILTRATION_KEYS = ("username","created_at","name","custom_fields","search")
+
+
 def filtration_processing(filtration_data):
     if filtration_data:
         filters = {}
+        key_lookups = []
         q_particulars=[]
         for key,value in filtration_data.items():
             if key == "username" and  value != "":
                 filters["username__icontains"] = value
           
             elif key == "created_at" and value != "":
-                filters["created_at__date"] = value
+                # A range keeps the (user, created_at) index usable; __date wraps the column in a function
+                start,end = local_day_bounds(value)
+                filters["created_at__gte"] = start
+                filters["created_at__lt"] = end
 
             elif key == "name" and value != "":
                 filters["name__icontains"] = value
+
+            elif key == "custom_fields" and value:
+                key_lookups.extend(json_key_lookups("custom_fields",value))
            
         q_object = [Q(**{key:value}) for key,value in filters.items()]
+        q_object.extend(key_lookups)
 
         if len(q_particulars)>0:
            q_object.append(q_particulars)
@@ -26,13 +55,38 @@ def filtration_processing(filtration_data):
     return []
 
 
-def pagination_processing(pagination_data,attribute_type):
+def ordering_processing(ordering):
+    """
+    Optional list ordering; only custom field keys are supported for now.
+    Returns None for the default (-created_at, -id) ordering.
+    """
+    if not ordering:
+        return None
+    if not isinstance(ordering,str):
+        raise InvalidFiltration("ordering must be a string")
+    return json_key_ordering("custom_fields",ordering)
+
+
+def page_arguments(pagination_data):
     limit = 30
     offset = 1
     if pagination_data:
         limit = pagination_data.get("row_count",30)
         offset = pagination_data.get("page",1)
+    return limit,offset
+
+
+def pagination_processing(pagination_data,attribute_type,count=None):
+    """
+    Page-number pagination. Pass the already known total as `count` so the
+    Paginator does not run its own COUNT(*); without it the page is sliced
+    directly and no count query is issued at all.
+    """
+    limit,offset = page_arguments(pagination_data)
+    if count is None:
+        return uncounted_pagination_processing(int(limit),int(offset),attribute_type)
     paginator = Paginator(attribute_type,limit)
+    paginator.count = count
     try:
         attribute_type_page = paginator.page(offset)
         return {"data":attribute_type_page,"status":status.HTTP_200_OK}
@@ -40,3 +94,147 @@ def pagination_processing(pagination_data,attribute_type):
         return {"message":"No more pages","status":status.HTTP_404_NOT_FOUND}
 
 
+async def apagination_processing(pagination_data,attribute_type,count=None):
+    """pagination_processing for async views: the page is fetched with async iteration."""
+    limit,offset = page_arguments(pagination_data)
+    if count is None:
+        return await auncounted_pagination_processing(int(limit),int(offset),attribute_type)
+    paginator = Paginator(attribute_type,limit)
+    paginator.count = count
+    try:
+        attribute_type_page = paginator.page(offset)
+    except EmptyPage:
+        return {"message":"No more pages","status":status.HTTP_404_NOT_FOUND}
+    return {"data":[row async for row in attribute_type_page.object_list],"status":status.HTTP_200_OK}
+
+
+def uncounted_page_bounds(limit,offset):
+    if limit < 1 or offset < 1:
+        return None
+    bottom = (offset - 1) * limit
+    return bottom,bottom + limit
+
+
+def uncounted_page_result(rows,offset):
+    if not rows and offset > 1:
+        return {"message":"No more pages","status":status.HTTP_404_NOT_FOUND}
+    return {"data":rows,"status":status.HTTP_200_OK}
+
+
+def uncounted_pagination_processing(limit,offset,attribute_type):
+    bounds = uncounted_page_bounds(limit,offset)
+    if bounds is None:
+        return {"message":"Invalid page","status":status.HTTP_404_NOT_FOUND}
+    return uncounted_page_result(list(attribute_type[bounds[0]:bounds[1]]),offset)
+
+
+async def auncounted_pagination_processing(limit,offset,attribute_type):
+    bounds = uncounted_page_bounds(limit,offset)
+    if bounds is None:
+        return {"message":"Invalid page","status":status.HTTP_404_NOT_FOUND}
+    return uncounted_page_result([row async for row in attribute_type[bounds[0]:bounds[1]]],offset)
+
+
+def cursor_position(row):
+    # Rows are model instances or values() dicts
+    if isinstance(row,dict):
+        return row["created_at"],row["id"]
+    return row.created_at,row.id
+
+
+def encode_cursor(direction,created_at,pk):
+    payload = json.dumps([direction,created_at.isoformat(),str(pk)],separators=(",",":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor into (direction, created_at, id).
+    Returns None when the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction,created_at,pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = parse_datetime(created_at)
+        if direction not in ("next","prev") or created_at is None:
+            return None
+        return direction,created_at,uuid.UUID(pk)
+    except (TypeError,ValueError,AttributeError):
+        return None
+
+
+def cursor_page_query(pagination_data,attribute_type):
+    """
+    Validate a cursor request and build the seek query for its page.
+    Returns (error, None) or (None, (queryset, direction, limit, cursor)).
+    """
+    limit = int(pagination_data.get("row_count",30))
+    cursor = pagination_data.get("cursor")
+    if limit < 1:
+        return {"message":"Invalid row count","status":status.HTTP_400_BAD_REQUEST},None
+
+    direction = "next"
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if decoded is None:
+            return {"message":"Invalid cursor","status":status.HTTP_400_BAD_REQUEST},None
+        direction,created_at,pk = decoded
+        if direction == "next":
+            seek = Q(created_at__lt=created_at) | Q(created_at=created_at,id__lt=pk)
+        else:
+            seek = Q(created_at__gt=created_at) | Q(created_at=created_at,id__gt=pk)
+        attribute_type = attribute_type.filter(seek)
+
+    # One extra row tells whether another page follows
+    if direction == "next":
+        attribute_type = attribute_type.order_by('-created_at','-id')[:limit + 1]
+    else:
+        attribute_type = attribute_type.order_by('created_at','id')[:limit + 1]
+    return None,(attribute_type,direction,limit,cursor)
+
+
+def cursor_page_result(rows,direction,limit,cursor):
+    has_more = len(rows) > limit
+    if direction == "next":
+        rows = rows[:limit]
+        has_next,has_prev = has_more,bool(cursor)
+    else:
+        rows = rows[:limit][::-1]
+        has_next,has_prev = True,has_more
+
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor("next",*cursor_position(rows[-1]))
+    if rows and has_prev:
+        prev_cursor = encode_cursor("prev",*cursor_position(rows[0]))
+
+    return {
+        "data":rows,
+        "next_cursor":next_cursor,
+        "prev_cursor":prev_cursor,
+        "status":status.HTTP_200_OK
+    }
+
+
+def cursor_pagination_processing(pagination_data,attribute_type):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Instead of OFFSET, every page seeks past the row the cursor points at, so
+    page N costs the same as page 1. The queryset must not be sliced or ordered
+    by the caller.
+    """
+    error,page = cursor_page_query(pagination_data,attribute_type)
+    if error:
+        return error
+    query,direction,limit,cursor = page
+    return cursor_page_result(list(query),direction,limit,cursor)
+
+
+async def acursor_pagination_processing(pagination_data,attribute_type):
+    """cursor_pagination_processing for async views."""
+    error,page = cursor_page_query(pagination_data,attribute_type)
+    if error:
+        return error
+    query,direction,limit,cursor = page
+    return cursor_page_result([row async for row in query],direction,limit,cursor)
@@ -0,0 +1,98 @@
+import re
+
+from django.db import models
+from django.db.models import Func
+from django.db.models.lookups import (
+    Exact,
+    GreaterThan,
+    GreaterThanOrEqual,
+    In,
+    IsNull,
+    LessThan,
+    LessThanOrEqual,
+)
+
+KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,62}$")
+
+KEY_LOOKUPS = {
+    "eq":Exact,
+    "gt":GreaterThan,
+    "gte":GreaterThanOrEqual,
+    "lt":LessThan,
+    "lte":LessThanOrEqual,
+    "in":In,
+}
+
+
+class InvalidFiltration(ValueError):
+    pass
+
+
+def validate_json_key(key):
+    if not isinstance(key,str) or not KEY_PATTERN.match(key):
+        raise InvalidFiltration(f"Invalid custom field key {key!r}")
+    return key
+
+
+class JSONKeyValue(Func):
+    """
+    JSON_EXTRACT(<field>, '$."<key>"') with the path written as a literal.
+
+    SQLite only uses an expression index when the query repeats the indexed
+    expression, and Django's own key transforms bind the path as a parameter,
+    so hot-key filters and orderings go through this instead.
+    """
+    function = "JSON_EXTRACT"
+    template = "%(function)s(%(expressions)s, '$.\"%(key)s\"')"
+    # Plain Field: values are compared as-is rather than JSON-encoded
+    output_field = models.Field()
+
+    def __init__(self,field_name,key,**extra):
+        super().__init__(field_name,key=validate_json_key(key),**extra)
+
+
+def json_key_lookups(field_name,conditions):
+    """
+    Build filter lookups from {"key": value} (equality) or
+    {"key": {"gte": 1, "lt": 5, "in": [...]}} conditions. {"key": null}
+    matches rows without the key or with a JSON null.
+    """
+    if not isinstance(conditions,dict):
+        raise InvalidFiltration(f"{field_name} filters must be an object")
+    lookups = []
+    for key,condition in conditions.items():
+        lhs = JSONKeyValue(field_name,key)
+        if not isinstance(condition,dict):
+            condition = {"eq":condition}
+        for operator,value in condition.items():
+            lookup = KEY_LOOKUPS.get(operator)
+            if lookup is None:
+                raise InvalidFiltration(f"Unsupported operator {operator!r} for {key!r}")
+            if operator == "in" and not isinstance(value,list):
+                raise InvalidFiltration(f"'in' for {key!r} needs a list")
+            if isinstance(value,(dict,list)) and operator != "in":
+                raise InvalidFiltration(f"{key!r} can only be compared with scalar values")
+            if value is None or (operator == "in" and None in value):
+                # "= NULL" matches no row; null means a missing key or a JSON null
+                if operator != "eq":
+                    raise InvalidFiltration(f"{key!r} can only be compared with null for equality")
+                lookups.append(IsNull(lhs,True))
+                continue
+            lookups.append(lookup(lhs,value))
+    return lookups
+
+
+def json_key_ordering(field_name,ordering):
+    """
+    Translate "<field_name>.<key>" / "-<field_name>.<key>" into order_by terms.
+    Ties fall back to created_at and id in the same direction, so one
+    (user, key, created_at, id) index serves both directions.
+    """
+    descending = ordering.startswith("-")
+    prefix,_,key = ordering.lstrip("-").partition(".")
+    if prefix != field_name:
+        raise InvalidFiltration(f"Unsupported ordering {ordering!r}")
+    value = JSONKeyValue(field_name,key)
+    if descending:
+        return [value.desc(),"-created_at","-id"]
+    return [value.asc(),"created_at","id"]
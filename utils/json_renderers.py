@@ -0,0 +1,116 @@
+import io
+import json
+import math
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+from rest_framework.utils.json import strict_constant
+
+from .request_timing import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+# UUIDs, dates/datetimes and str/dict/list subclasses (ErrorDetail, ReturnDict)
+# are encoded natively; anything else goes through DRF's encoder
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+_drf_encoder = encoders.JSONEncoder()
+
+# orjson parses integers beyond the 64-bit range as floats; bodies with a
+# 20-digit run (possibly inside a string) are parsed by the stdlib instead
+LONG_DIGIT_RUN = re.compile(rb"[0-9]{20}")
+
+
+def orjson_default(obj):
+    # Decimal, lazy strings, timedelta, querysets, ... rendered exactly as DRF would
+    return _drf_encoder.default(obj)
+
+
+def has_non_finite_float(data):
+    if isinstance(data,float):
+        return not math.isfinite(data)
+    if isinstance(data,dict):
+        return any(has_non_finite_float(value) for value in data.values())
+    if isinstance(data,(list,tuple)):
+        return any(has_non_finite_float(value) for value in data)
+    return False
+
+
+def dumps(data):
+    """
+    Compact UTF-8 JSON bytes, as FastJSONRenderer writes them. Equal in value
+    to DRF's output, not always in bytes (orjson writes 1e16, DRF 1e+16).
+    Integers beyond 64 bits and NaN/Infinity take DRF's path, which renders
+    the former and raises ValueError for the latter like DRF does.
+    """
+    if orjson is None:
+        return JSONRenderer().render(data)
+    try:
+        body = orjson.dumps(data,default=orjson_default,option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return JSONRenderer().render(data)
+    # orjson writes NaN and Infinity as null; only then is the data searched for them
+    if b"null" in body and has_non_finite_float(data):
+        return JSONRenderer().render(data)
+    # Same as DRF: keep the output a strict JavaScript subset
+    if b"\xe2\x80\xa8" in body or b"\xe2\x80\xa9" in body:
+        body = body.replace(b"\xe2\x80\xa8",b"\\u2028").replace(b"\xe2\x80\xa9",b"\\u2029")
+    return body
+
+
+def loads(body):
+    if isinstance(body,str):
+        body = body.encode()
+    if orjson is None or LONG_DIGIT_RUN.search(body):
+        return json.loads(body,parse_constant=strict_constant)
+    return orjson.loads(body)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson. Produces the same compact JSON values as
+    DRF's renderer (see dumps); indented output (browsable API, `; indent=` media type
+    parameters) or UNICODE_JSON=False use the stdlib path, as does a missing
+    orjson install.
+    """
+
+    def render(self,data,accepted_media_type=None,renderer_context=None):
+        with timed("render"):
+            if orjson is None or self.ensure_ascii or not self.compact:
+                return super().render(data,accepted_media_type,renderer_context)
+            if data is None:
+                return b''
+            if self.get_indent(accepted_media_type,renderer_context or {}) is not None:
+                return super().render(data,accepted_media_type,renderer_context)
+            return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson. Falls back to the stdlib parser without
+    orjson, for request bodies that aren't UTF-8, with STRICT_JSON=False
+    (orjson never accepts NaN/Infinity), or when the body may hold an integer
+    orjson would turn into a float.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self,stream,media_type=None,parser_context=None):
+        with timed("parse"):
+            parser_context = parser_context or {}
+            encoding = parser_context.get('encoding',settings.DEFAULT_CHARSET)
+            if orjson is None or not self.strict or encoding.lower().replace("-","") != "utf8":
+                return super().parse(stream,media_type,parser_context)
+            body = stream.read()
+            if LONG_DIGIT_RUN.search(body):
+                return super().parse(io.BytesIO(body),media_type,parser_context)
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError as exc:
+                raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,267 @@
+"""
+Prometheus metrics for requests, queries and caches.
+
+Each process counts into its own MetricsRegistry and writes its totals to
+metrics-<pid>-<nonce>.json in METRICS_DIR (at most every
+METRICS_FLUSH_INTERVAL seconds, and at exit). /metrics/ sums the files of
+all workers, so any worker answers a scrape for the whole server. The nonce
+keeps a worker that reuses an exited worker's pid from overwriting its file.
+Files of exited workers are kept: their counts stay part of the totals, as
+counters must never go down. Empty the directory when the server starts.
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .request_timing import install_execute_wrapper
+
+LATENCY_BUCKETS = (0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0)
+
+METRICS = {
+    "http_requests_total":("counter","Requests served, by view, method and status code."),
+    "http_request_duration_seconds":("histogram","Time to produce the response, by view."),
+    "db_queries_total":("counter","Database queries run while serving requests, by view."),
+    "db_query_duration_seconds_total":("counter","Time spent in database queries, by view."),
+    "cache_requests_total":("counter","Cache lookups, by cache and result (hit or miss)."),
+}
+
+_request_queries = ContextVar("metrics_request_queries",default=None)
+
+
+def escape_label(value):
+    return str(value).replace("\\","\\\\").replace("\n","\\n").replace('"','\\"')
+
+
+def format_labels(labels,**extra):
+    pairs = [*labels,*extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name,value in pairs) + "}"
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value,float) and not value.is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Counters and fixed-bucket histograms of one process, keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.nonce = uuid.uuid4().hex[:12]
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.flushed_at = 0.0
+
+    def check_fork(self):
+        # A forked worker starts from zero instead of recounting its parent's totals
+        if os.getpid() != self.pid:
+            self.reset()
+
+    def inc(self,name,amount=1,**labels):
+        with self._lock:
+            self.check_fork()
+            self.counters[(name,tuple(sorted(labels.items())))] += amount
+        self.flush()
+
+    def observe(self,name,value,**labels):
+        key = (name,tuple(sorted(labels.items())))
+        with self._lock:
+            self.check_fork()
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (the last one is +Inf), then sum and count
+                histogram = self.histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0,0]
+            for index,bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    break
+            else:
+                index = len(LATENCY_BUCKETS)
+            histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+        self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            self.check_fork()
+            return {
+                "counters":[[name,list(map(list,labels)),value] for (name,labels),value in self.counters.items()],
+                "histograms":[[name,list(map(list,labels)),list(values)] for (name,labels),values in self.histograms.items()],
+            }
+
+    def file_path(self):
+        return os.path.join(settings.METRICS_DIR,f"metrics-{self.pid}-{self.nonce}.json")
+
+    def flush(self,force=False):
+        if not settings.METRICS_DIR:
+            return
+        if not force and time.monotonic() - self.flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        # One writer per process; other threads skip rather than wait
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            self.flushed_at = time.monotonic()
+            os.makedirs(settings.METRICS_DIR,exist_ok=True)
+            snapshot = self.snapshot()
+            path = self.file_path()
+            # Written aside and renamed, so readers never see a partial file
+            with open(f"{path}.tmp","w") as f:
+                json.dump(snapshot,f)
+            os.replace(f"{path}.tmp",path)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        """Totals of this process plus every other worker's latest file."""
+        snapshots = [self.snapshot()]
+        if settings.METRICS_DIR and os.path.isdir(settings.METRICS_DIR):
+            own = os.path.basename(self.file_path())
+            for name in sorted(os.listdir(settings.METRICS_DIR)):
+                if name.startswith("metrics-") and name.endswith(".json") and name != own:
+                    try:
+                        with open(os.path.join(settings.METRICS_DIR,name)) as f:
+                            snapshots.append(json.load(f))
+                    except (OSError,ValueError):
+                        continue
+
+        counters = defaultdict(float)
+        histograms = {}
+        for snapshot in snapshots:
+            for name,labels,value in snapshot["counters"]:
+                counters[(name,tuple(map(tuple,labels)))] += value
+            for name,labels,values in snapshot["histograms"]:
+                key = (name,tuple(map(tuple,labels)))
+                merged = histograms.setdefault(key,[0] * len(values))
+                for index,value in enumerate(values):
+                    merged[index] += value
+        return counters,histograms
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        counters,histograms = self.collect()
+        series = defaultdict(list)
+        for (name,labels),value in sorted(counters.items()):
+            series[name].append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for (name,labels),values in sorted(histograms.items()):
+            cumulative = 0
+            for bound,count in zip((*LATENCY_BUCKETS,math.inf),values):
+                cumulative += count
+                series[name].append(f"{name}_bucket{format_labels(labels,le=format_value(bound))} {cumulative}")
+            series[name].append(f"{name}_sum{format_labels(labels)} {format_value(values[-2])}")
+            series[name].append(f"{name}_count{format_labels(labels)} {values[-1]}")
+
+        lines = []
+        for name,(kind,description) in METRICS.items():
+            if series.get(name):
+                lines += [f"# HELP {name} {description}",f"# TYPE {name} {kind}",*series[name]]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+atexit.register(lambda: registry.flush(force=True))
+
+
+def record_cache_lookup(cache,hit):
+    if settings.METRICS_ENABLED:
+        registry.inc("cache_requests_total",cache=cache,result="hit" if hit else "miss")
+
+
+def count_query(execute,sql,params,many,context):
+    queries = _request_queries.get()
+    if queries is None:
+        return execute(sql,params,many,context)
+    started = time.perf_counter()
+    try:
+        return execute(sql,params,many,context)
+    finally:
+        queries[0] += 1
+        queries[1] += time.perf_counter() - started
+
+
+def view_label(request):
+    # View class names keep the label set small; unresolved paths share one label
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+    view_class = getattr(match.func,"view_class",None)
+    return view_class.__name__ if view_class else (match.url_name or match._func_path)
+
+
+class MetricsMiddleware:
+    """Counts requests, latency and queries per view into the metrics registry."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self,get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        if not settings.DEBUG and not (settings.METRICS_TOKEN and settings.METRICS_DIR):
+            # Without a shared directory a scrape sees one worker; without a token anyone sees the traffic
+            raise ImproperlyConfigured("METRICS_ENABLED needs METRICS_TOKEN and METRICS_DIR outside DEBUG")
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_execute_wrapper(count_query)
+
+    def __call__(self,request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started,queries = time.perf_counter(),[0,0.0]
+        token = _request_queries.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request,response,time.perf_counter() - started,queries)
+        return response
+
+    async def __acall__(self,request):
+        started,queries = time.perf_counter(),[0,0.0]
+        token = _request_queries.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request,response,time.perf_counter() - started,queries)
+        return response
+
+    def record(self,request,response,duration,queries):
+        view = view_label(request)
+        registry.inc("http_requests_total",view=view,method=request.method,status=response.status_code)
+        registry.observe("http_request_duration_seconds",duration,view=view)
+        if queries[0]:
+            registry.inc("db_queries_total",queries[0],view=view)
+            registry.inc("db_query_duration_seconds_total",queries[1],view=view)
+
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN:
+        header = request.headers.get("Authorization","")
+        if not constant_time_compare(header,f"Bearer {settings.METRICS_TOKEN}"):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(),content_type="text/plain; version=0.0.4; charset=utf-8")
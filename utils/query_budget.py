@@ -0,0 +1,101 @@
+import logging
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .request_timing import install_execute_wrapper
+
+logger = logging.getLogger("query_budget")
+
+QUERY_BUDGET_MODES = ("off","log","raise")
+
+_statements = ContextVar("query_budget_statements",default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its view's query_budget, or a likely N+1."""
+
+
+def record_query(execute,sql,params,many,context):
+    statements = _statements.get()
+    if statements is not None:
+        statements.append(sql)
+    return execute(sql,params,many,context)
+
+
+def repeated_queries(statements,limit=None):
+    """
+    SELECTs run more than `limit` times with identical SQL (parameters aside),
+    the signature of a query issued once per row of an earlier result.
+    """
+    limit = settings.QUERY_REPEAT_LIMIT if limit is None else limit
+    counts = Counter(sql for sql in statements if sql.lstrip()[:6].upper() == "SELECT")
+    return {sql:count for sql,count in counts.items() if count > limit}
+
+
+def query_budget_problems(view_class,statements):
+    problems = []
+    budget = getattr(view_class,"query_budget",None)
+    if budget is not None and len(statements) > budget:
+        problems.append(f"{len(statements)} queries over a budget of {budget}")
+    for sql,count in repeated_queries(statements).items():
+        problems.append(f"likely N+1, {count} times: {sql[:300]}")
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """
+    Checks every request against the query_budget its view class declares
+    and for repeated identical SELECTs. QUERY_BUDGET_MODE "log" reports
+    problems on the query_budget logger, "raise" raises QueryBudgetExceeded
+    (development and tests), "off" removes the middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self,get_response):
+        if settings.QUERY_BUDGET_MODE not in QUERY_BUDGET_MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE must be one of {', '.join(QUERY_BUDGET_MODES)}")
+        if settings.QUERY_BUDGET_MODE == "off":
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_execute_wrapper(record_query)
+
+    def __call__(self,request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        statements = []
+        token = _statements.set(statements)
+        try:
+            response = self.get_response(request)
+        finally:
+            _statements.reset(token)
+        self.check(request,statements)
+        return response
+
+    async def __acall__(self,request):
+        statements = []
+        token = _statements.set(statements)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _statements.reset(token)
+        self.check(request,statements)
+        return response
+
+    def check(self,request,statements):
+        match = request.resolver_match
+        view_class = getattr(match.func,"view_class",None) if match else None
+        problems = query_budget_problems(view_class,statements)
+        if not problems:
+            return
+        view_name = view_class.__name__ if view_class else "no view"
+        message = f"{request.method} {request.path} ({view_name}): {'; '.join(problems)}"
+        if settings.QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
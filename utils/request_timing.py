@@ -0,0 +1,170 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("request_timing")
+
+# Order of the phases in the Server-Timing header and the log line
+PHASES = ("auth","parse","db","serialize","render")
+
+_timings = ContextVar("request_timings",default=None)
+
+
+class RequestTimings:
+    """
+    Time spent per phase of one request. Phases can overlap: the queries run
+    while authenticating count towards both auth and db.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(PHASES,0.0)
+        self.queries = 0
+        self.active = set()
+
+    def add_query(self,duration):
+        self.queries += 1
+        self.durations["db"] += duration
+
+    def header(self,total):
+        metrics = []
+        for phase in PHASES:
+            if phase == "db":
+                metrics.append(f'db;desc="{self.queries} queries";dur={self.durations["db"] * 1000:.2f}')
+            elif self.durations[phase]:
+                metrics.append(f"{phase};dur={self.durations[phase] * 1000:.2f}")
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def record(self,request,response,total):
+        return {
+            "method":request.method,
+            "path":request.path,
+            "status":response.status_code,
+            "total_ms":round(total * 1000,2),
+            "db_queries":self.queries,
+            **{f"{phase}_ms":round(self.durations[phase] * 1000,2) for phase in PHASES},
+        }
+
+
+def current_timings():
+    return _timings.get()
+
+
+class timed:
+    """
+    Context manager adding the time spent in its block to `phase` of the
+    current request. A no-op outside timed requests; nested blocks of the same
+    phase count once.
+    """
+    __slots__ = ("phase","timings","started")
+
+    def __init__(self,phase):
+        self.phase = phase
+        self.timings = None
+
+    def __enter__(self):
+        timings = _timings.get()
+        if timings is not None and self.phase not in timings.active:
+            timings.active.add(self.phase)
+            self.timings = timings
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self,*exc_info):
+        if self.timings is not None:
+            self.timings.durations[self.phase] += time.perf_counter() - self.started
+            self.timings.active.discard(self.phase)
+            self.timings = None
+
+
+class TimedSerializerMixin:
+    """Counts a serializer's validation and representation towards the serialize phase."""
+
+    def run_validation(self,*args,**kwargs):
+        with timed("serialize"):
+            return super().run_validation(*args,**kwargs)
+
+    def to_representation(self,instance):
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+def time_query(execute,sql,params,many,context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql,params,many,context)
+    started = time.perf_counter()
+    try:
+        return execute(sql,params,many,context)
+    finally:
+        timings.add_query(time.perf_counter() - started)
+
+
+def install_execute_wrapper(wrapper):
+    """
+    Run `wrapper` around every query on every database connection, including
+    the ones threads open later.
+    """
+    def install(sender=None,connection=None,**kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(install,weak=False,dispatch_uid=f"{wrapper.__module__}.{wrapper.__qualname__}")
+    for connection in connections.all(initialized_only=True):
+        install(connection=connection)
+
+
+class ServerTimingMiddleware:
+    """
+    With SERVER_TIMING on, times auth, parsing, queries, serialization and
+    rendering of every request and reports them in a Server-Timing header and
+    one JSON line on the request_timing logger. With it off the middleware
+    removes itself and the hooks find no timings, so they cost one context
+    variable lookup.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self,get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_execute_wrapper(time_query)
+
+    def __call__(self,request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request,response,timings)
+
+    async def __acall__(self,request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request,response,timings)
+
+    def report(self,request,response,timings):
+        # Streamed bodies are produced after this point and aren't included
+        total = time.perf_counter() - timings.started
+        response["Server-Timing"] = timings.header(total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(timings.record(request,response,total)))
+        return response
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .metrics import record_cache_lookup
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self,hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits":self.hits,"misses":self.misses,"hit_rate":self.hits / total if total else 0.0}
+
+
+def initial_version():
+    # A version that vanished (eviction, restart) restarts at a value never used
+    # before, so entries cached under an older version can't be served again
+    return time.time_ns()
+
+
+class LocalResultCache:
+    """
+    In-process LRU. Correct on its own for a single process; also the stand-in
+    backend for tests. Other workers never see its version bumps.
+    """
+
+    def __init__(self,max_entries=1024,**options):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self,key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self,key,value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self,scope):
+        with self._lock:
+            return self._versions.setdefault(scope,initial_version())
+
+    def bump_version(self,scope):
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope,initial_version()) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class SharedResultCache:
+    """Entries and versions in a Django cache alias shared by every worker."""
+
+    def __init__(self,cache_alias="default",timeout=300,**options):
+        self.cache = caches[cache_alias]
+        self.timeout = timeout
+
+    def get(self,key):
+        return self.cache.get(f"result:{key}")
+
+    def set(self,key,value):
+        self.cache.set(f"result:{key}",value,self.timeout)
+
+    def get_version(self,scope):
+        key = f"result-version:{scope}"
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key,initial_version(),None)
+            version = self.cache.get(key)
+        return version
+
+    def bump_version(self,scope):
+        key = f"result-version:{scope}"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key,initial_version(),None)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class TieredResultCache(SharedResultCache):
+    """
+    Local LRU in front of the shared cache. Versions are always read from the
+    shared cache, so a bump in any worker retires the local copies too; only
+    entry payloads are served from process memory.
+    """
+
+    def __init__(self,max_entries=1024,**options):
+        super().__init__(**options)
+        self.local = LocalResultCache(max_entries=max_entries)
+
+    def get(self,key):
+        value = self.local.get(key)
+        if value is None:
+            value = super().get(key)
+            if value is not None:
+                self.local.set(key,value)
+        return value
+
+    def set(self,key,value):
+        self.local.set(key,value)
+        super().set(key,value)
+
+    def clear(self):
+        self.local.clear()
+        super().clear()
+
+
+class ResultCache:
+    """
+    Versioned result cache: keys embed the scope's current version, so bumping
+    the version invalidates every entry of that scope without scanning keys.
+    """
+
+    def __init__(self,backend):
+        self.backend = backend
+        self.stats = CacheStats()
+
+    def key(self,scope,fingerprint):
+        return f"{scope}:{self.backend.get_version(scope)}:{fingerprint}"
+
+    def get(self,key):
+        value = self.backend.get(key)
+        self.stats.record(value is not None)
+        record_cache_lookup("result",value is not None)
+        return value
+
+    def set(self,key,value):
+        self.backend.set(key,value)
+
+    def invalidate(self,scope):
+        self.backend.bump_version(scope)
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        config = settings.RESULT_CACHE
+        backend = import_string(config["BACKEND"])(**config.get("OPTIONS",{}))
+        _result_cache = ResultCache(backend)
+    return _result_cache
+
+
+@receiver(setting_changed)
+def reset_result_cache(setting,**kwargs):
+    global _result_cache
+    if setting in ("RESULT_CACHE","CACHES"):
+        _result_cache = None
@@ -0,0 +1,7 @@
+"""Helpers for the test suites; production code must not import this module."""
+from django.test import override_settings
+
+
+def enforce_query_budgets(test):
+    """Test class or method decorator: requests over budget raise QueryBudgetExceeded."""
+    return override_settings(QUERY_BUDGET_MODE="raise")(test)